@@ -0,0 +1,188 @@
+import asyncio
+import heapq
+import itertools
+import json
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from metrics import Counter, Gauge, Histogram
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "nema_admission_in_flight",
+    "Admitted requests being served, by endpoint class.",
+    ["endpoint_class"],
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "nema_admission_queue_depth",
+    "Requests waiting for an admission slot, by endpoint class.",
+    ["endpoint_class"],
+)
+ADMISSION_SHED = Counter(
+    "nema_admission_shed_total",
+    "Requests rejected with 503, by endpoint class and reason (queue_full, queue_timeout).",
+    ["endpoint_class", "reason"],
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "nema_admission_wait_seconds",
+    "Time admitted requests spent queued for a slot, by endpoint class.",
+    ["endpoint_class"],
+)
+
+
+@dataclass(frozen=True)
+class EndpointClass:
+    name: str
+    paths: Tuple[str, ...]          # exact request paths it covers
+    max_concurrent: int
+    max_queue: int                  # waiters beyond this are shed at once
+    priority: int = 1               # lower is admitted first (0 = live-call traffic)
+    queue_timeout_s: float = 10.0   # waiters not admitted by then are shed
+    retry_after_s: int = 5
+
+
+class AdmissionController:
+    """
+    Concurrency limits per endpoint class plus one shared limit across
+    classes, with bounded priority queues: a freed slot goes to the waiting
+    request with the lowest (priority, arrival), skipping classes that are
+    at their own limit. Runs on the event loop; not thread-safe.
+    """
+
+    def __init__(self, classes: Iterable[EndpointClass], max_in_flight: int):
+        self.classes: Dict[str, EndpointClass] = {c.name: c for c in classes}
+        self.max_in_flight = max_in_flight
+        self._by_path = {path: c for c in self.classes.values() for path in c.paths}
+        self._running = {name: 0 for name in self.classes}
+        self._queued = {name: 0 for name in self.classes}
+        self._total = 0
+        # (priority, arrival, class name, future set once admitted)
+        self._waiters: List[Tuple[int, int, str, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+
+    def classify(self, path: str) -> Optional[EndpointClass]:
+        return self._by_path.get(path)
+
+    async def acquire(self, cls: EndpointClass) -> Optional[str]:
+        """None once admitted (call release() when done), else the shed reason."""
+        if self._can_run(cls) and not self._waiting_ahead(cls):
+            self._start(cls)
+            return None
+        if self._queued[cls.name] >= cls.max_queue:
+            ADMISSION_SHED.inc(endpoint_class=cls.name, reason="queue_full")
+            return "queue_full"
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (cls.priority, next(self._arrivals), cls.name, future))
+        self._set_queued(cls, +1)
+        queued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(future, cls.queue_timeout_s)
+        except asyncio.TimeoutError:
+            self._set_queued(cls, -1)
+            ADMISSION_SHED.inc(endpoint_class=cls.name, reason="queue_timeout")
+            return "queue_timeout"
+        except asyncio.CancelledError:
+            # Client went away: give back the slot if it was granted meanwhile.
+            if future.done() and not future.cancelled():
+                self.release(cls)
+            else:
+                future.cancel()
+                self._set_queued(cls, -1)
+            raise
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - queued_at, endpoint_class=cls.name)
+        return None
+
+    def release(self, cls: EndpointClass) -> None:
+        self._running[cls.name] -= 1
+        self._total -= 1
+        ADMISSION_IN_FLIGHT.set(self._running[cls.name], endpoint_class=cls.name)
+        self._dispatch()
+
+    def snapshot(self) -> Dict:
+        return {
+            name: {"in_flight": self._running[name], "queued": self._queued[name]}
+            for name in self.classes
+        }
+
+    def _can_run(self, cls: EndpointClass) -> bool:
+        return self._total < self.max_in_flight and self._running[cls.name] < cls.max_concurrent
+
+    def _waiting_ahead(self, cls: EndpointClass) -> bool:
+        """
+        Whether anyone queued would be served before a new `cls` request:
+        waiters of equal or higher priority whose class is below its own
+        limit. Waiters held only by their class limit don't block others.
+        """
+        return any(
+            self._queued[c.name] and self._running[c.name] < c.max_concurrent
+            for c in self.classes.values()
+            if c.priority <= cls.priority
+        )
+
+    def _start(self, cls: EndpointClass) -> None:
+        self._running[cls.name] += 1
+        self._total += 1
+        ADMISSION_IN_FLIGHT.set(self._running[cls.name], endpoint_class=cls.name)
+
+    def _set_queued(self, cls: EndpointClass, delta: int) -> None:
+        self._queued[cls.name] += delta
+        ADMISSION_QUEUE_DEPTH.set(self._queued[cls.name], endpoint_class=cls.name)
+
+    def _dispatch(self) -> None:
+        blocked = []   # waiters whose class is at its own limit
+        while self._waiters and self._total < self.max_in_flight:
+            entry = heapq.heappop(self._waiters)
+            _, _, name, future = entry
+            if future.done():   # timed out or cancelled; already unqueued
+                continue
+            cls = self.classes[name]
+            if self._running[name] >= cls.max_concurrent:
+                blocked.append(entry)
+                continue
+            self._set_queued(cls, -1)
+            self._start(cls)
+            future.set_result(True)
+        for entry in blocked:
+            heapq.heappush(self._waiters, entry)
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware: requests to a classified path wait for an admission
+    slot; when the class queue is full or the wait times out they get 503
+    with Retry-After instead of piling onto the threadpool.
+    """
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        cls = self.controller.classify(scope.get("path", "")) if scope["type"] == "http" else None
+        if cls is None:
+            await self.app(scope, receive, send)
+            return
+
+        shed = await self.controller.acquire(cls)
+        if shed is not None:
+            await _reject(send, cls, shed)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(cls)
+
+
+async def _reject(send, cls: EndpointClass, reason: str) -> None:
+    body = json.dumps({"detail": f"Server busy ({cls.name}: {reason}); retry later"}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"retry-after", str(cls.retry_after_s).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -1,24 +1,62 @@
 # backend/app.py
+import atexit
 import base64
 import json
 import os
 import tempfile
+import threading
 import time
 from typing import List, Literal, Dict, Optional
 from uuid import uuid4
 
 import httpx
-from fastapi import FastAPI, UploadFile, File
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from openai import OpenAI
-
+from pydantic import BaseModel, Field
+from openai import BadRequestError, OpenAI
+
+from admission import AdmissionController, AdmissionMiddleware, EndpointClass
+from context_pack import ContextPackCache
+from filler import FillerClips, projected_seconds
+from graph_context import GraphContextIndex
+from graph_import import GraphImport, ImportRowsError, format_from_content_type, read_rows
+from graph_payload import GraphPayloadCache, choose_encoding, serialize_items
+from page_cleaning import packed_text
+from prewarm import Prewarmer, RouteCache, TTSCache
+from phrase_rules import load_phrase_tables
+from question_router import parse_router_reply, router_request
 from graph_model import (
     MemoryGraph,
     Edge,
+    graph_file_path,
     load_graph,
     save_graph,
 )
+from graph_gc import GraphCompactor
+from graph_history import GraphHistory, diff_versions, snapshot_items
+from graph_overview import GraphOverviewIndex
+from feedback import FeedbackAccumulator
+from metrics import TimingMiddleware, render_prometheus, stage
+from resilience import (
+    CallPolicy,
+    CircuitBreaker,
+    DeadlineMiddleware,
+    ResilientCaller,
+    UpstreamUnavailable,
+)
+from session_store import SessionStore
+from singleflight import SingleFlight, request_key
+from task_queue import TaskIndex
+from tracing import (
+    ProfileStore,
+    ProfilingToggle,
+    SlowTraceBuffer,
+    TracingMiddleware,
+    trace_to_dict,
+)
 
 # ---------- KEYS (EDIT THESE) ----------
 
@@ -28,20 +66,194 @@ FIRECRAWL_API_KEY = "fc-**"
 DEFAULT_INTENT_ID = "sales-agent"
 TTS_MODEL = "gpt-4o-mini-tts"               # adjust to actual TTS model
 
+# Point these at benchmarks/fake_upstream.py for offline load tests.
+OPENAI_BASE_URL: Optional[str] = os.environ.get("OPENAI_BASE_URL")   # None = api.openai.com
+FIRECRAWL_BASE_URL = os.environ.get("FIRECRAWL_BASE_URL", "https://api.firecrawl.dev")
+
+# Upstream (OpenAI) calls: per-kind time caps in seconds. A caller's
+# X-Request-Deadline-Ms narrows them further. Hedged kinds get a duplicate
+# request fired after their observed p95 latency.
+UPSTREAM_TIMEOUTS_S = {"route": 4.0, "reply": 8.0, "tts": 10.0, "whisper": 15.0, "extract": 120.0}
+UPSTREAM_HEDGED = {"route", "reply", "tts"}
+CIRCUIT_FAILURE_THRESHOLD = 5     # consecutive failures before failing fast
+CIRCUIT_RESET_S = 30.0
+# Lexical routing score needed when the LLM router is unavailable
+ROUTE_FALLBACK_MIN_SCORE = 0.35
+
+# Warm caches: synthesized answer audio and LLM routes per user phrasing.
+# After ingest / answer edits / imports a background pass re-routes the
+# hottest stale routes and synthesizes the most viewed answers, paced to
+# PREWARM_RATE_PER_S upstream calls.
+TTS_CACHE_MAX_BYTES = 64 * 1024 * 1024
+ROUTE_CACHE_MAX_ENTRIES = 5000
+PREWARM_TOP_ANSWERS = 50
+PREWARM_TOP_ROUTES = 100
+PREWARM_RATE_PER_S = 2.0
+
+# Voice QA filler (POST /api/voice/qa-tts?stream=true): when the projected
+# whisper + route + tts time (their p50 stage latencies) exceeds
+# FILLER_MIN_PROJECTED_S, this clip is streamed before the answer. Clips are
+# synthesized on first use (nothing is called at import) once per
+# model/voice and kept in FILLER_DIR.
+FILLER_TEXT = "Let me check that for you..."
+FILLER_VOICE = "alloy"
+FILLER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "filler_audio")
+FILLER_MIN_PROJECTED_S = 1.0
+FILLER_STAGES = ("whisper", "route", "tts")
+FILLER_DEFAULT_STAGE_S = {"whisper": 1.5, "route": 1.0, "tts": 1.5}   # until observed
+
+# Admission control for expensive endpoints: per-class concurrency with a
+# bounded wait queue, plus a shared cap that keeps threadpool room for cheap
+# endpoints (get-graph-context, graph reads). Live-call classes (priority 0)
+# are admitted before owner/admin work; a full queue or a wait past the
+# class timeout gets 503 + Retry-After.
+ADMISSION_MAX_IN_FLIGHT = 16
+ADMISSION_CLASSES = (
+    EndpointClass("voice", ("/api/voice/qa-tts", "/api/graph/qa-tts"), max_concurrent=8, max_queue=16,
+                  priority=0, queue_timeout_s=5.0, retry_after_s=2),
+    EndpointClass("chat", ("/api/nema/chat",), max_concurrent=8, max_queue=32,
+                  priority=0, queue_timeout_s=5.0, retry_after_s=2),
+    EndpointClass("ingest", ("/api/website/ingest", "/api/graph/import"), max_concurrent=2, max_queue=4,
+                  priority=1, queue_timeout_s=60.0, retry_after_s=30),
+)
+
+# Website ingest: crawled text budget for the extraction prompt
+EXTRACT_PROMPT_MAX_CHARS = 12000
+
+# Bulk import (POST /api/graph/import)
+IMPORT_BATCH_SIZE = 1000
+IMPORT_MAX_BYTES = 200 * 1024 * 1024
+IMPORT_SPOOL_MEMORY_BYTES = 8 * 1024 * 1024   # larger uploads spill to a temp file
+
+# Phrase tables for clue derivation and order-intent detection (see
+# phrase_rules.DEFAULT_TABLES); tables named in this JSON file replace the
+# built-in ones, so each business can tune its own vocabulary.
+PHRASE_RULES_FILE = os.environ.get(
+    "NEMA_PHRASE_RULES_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "phrase_rules.json"),
+)
+
+# Build/Update Graph transcripts
+SESSION_MAX_SESSIONS = 1000
+SESSION_MAX_TURNS = 200
+SESSION_TTL_SECONDS = 6 * 3600
+SESSION_SPILL_DIR: Optional[str] = None   # e.g. os.path.join(os.path.dirname(__file__), "sessions")
+
+# Feedback is applied in memory immediately; the graph is written at most this often
+FEEDBACK_FLUSH_INTERVAL_S = 5.0
+
+# Graph compaction (POST /api/graph/compact): a pass removes dangling edges,
+# superseded duplicates and unreachable nodes. Passes are not isolated from
+# ingest/import/build threads mutating the graph, so the schedule is opt-in
+# (seconds between passes); 0 = manual only.
+GRAPH_GC_INTERVAL_S = 0.0
+GRAPH_GC_BATCH_SIZE = 500
+
+# Graph history: a version per persisted change set, on structurally shared
+# maps (GET /api/graph/versions). Oldest versions beyond this are dropped.
+GRAPH_HISTORY_MAX_VERSIONS = 1000
+
+# get-graph-context: Q/As kept per clue neighborhood
+CONTEXT_NEIGHBORHOOD_SIZE = 12
+# context-pack: default prompt budget for the whole knowledge base
+CONTEXT_PACK_MAX_TOKENS = 4000
+
+# Debugging: slowest-request buffer and on-demand profiles (X-Debug-Profile: 1)
+TRACE_BUFFER_SIZE = 50
+TRACE_WINDOW_S = 3600.0
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+
 
 # ---------- FastAPI ----------
 
 app = FastAPI()
+ADMISSION = AdmissionController(ADMISSION_CLASSES, max_in_flight=ADMISSION_MAX_IN_FLIGHT)
+# Inside CORS so shed 503s still carry CORS headers (and Retry-After is readable).
+app.add_middleware(AdmissionMiddleware, controller=ADMISSION)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # dev only
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Next-Cursor", "ETag", "Retry-After"],
 )
+TRACES = SlowTraceBuffer(capacity=TRACE_BUFFER_SIZE, window_s=TRACE_WINDOW_S)
+PROFILES = ProfileStore(PROFILE_DIR)
+PROFILING = ProfilingToggle()
+# Tracing sits inside TimingMiddleware so it can read the request's stage spans.
+app.add_middleware(DeadlineMiddleware)
+app.add_middleware(TracingMiddleware, buffer=TRACES, store=PROFILES, toggle=PROFILING)
+app.add_middleware(TimingMiddleware)
 
 GRAPH: MemoryGraph = load_graph()
-SESSIONS: Dict[str, List[Dict]] = {}
+PHRASES = load_phrase_tables(PHRASE_RULES_FILE)
+HISTORY = GraphHistory(max_versions=GRAPH_HISTORY_MAX_VERSIONS)
+# Graphs saved before edges were keyed by (source, target, type) may carry
+# parallel duplicates; fold them once at startup (seed_core_actions saves).
+GRAPH.compact_duplicate_edges()
+SESSIONS = SessionStore(
+    max_sessions=SESSION_MAX_SESSIONS,
+    max_turns=SESSION_MAX_TURNS,
+    ttl_seconds=SESSION_TTL_SECONDS,
+    spill_dir=SESSION_SPILL_DIR,
+)
 GAPS: Dict[str, Dict] = {}
+FEEDBACK = FeedbackAccumulator(
+    get_graph=lambda: GRAPH,
+    save=lambda g: commit_graph("feedback", g),
+    flush_interval=FEEDBACK_FLUSH_INTERVAL_S,
+)
+FEEDBACK.start()
+atexit.register(FEEDBACK.stop)
+GRAPH_GC = GraphCompactor(
+    get_graph=lambda: GRAPH,
+    save=lambda g: commit_graph("compaction", g),
+    graph_path=graph_file_path,
+    batch_size=GRAPH_GC_BATCH_SIZE,
+)
+GRAPH_GC.start(GRAPH_GC_INTERVAL_S)
+atexit.register(GRAPH_GC.stop)
+TASKS = TaskIndex()
+OVERVIEW = GraphOverviewIndex()
+UPSTREAM_FLIGHTS = SingleFlight()
+UPSTREAM = ResilientCaller(
+    breaker=CircuitBreaker(
+        "openai",
+        failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=CIRCUIT_RESET_S,
+    ),
+    policies={
+        kind: CallPolicy(timeout=t, hedge=kind in UPSTREAM_HEDGED)
+        for kind, t in UPSTREAM_TIMEOUTS_S.items()
+    },
+    # A malformed request is our bug, not a sign the upstream is degraded.
+    counts_as_failure=lambda e: not isinstance(e, BadRequestError),
+)
+TTS_CACHE = TTSCache(max_bytes=TTS_CACHE_MAX_BYTES)
+ROUTES = RouteCache(max_entries=ROUTE_CACHE_MAX_ENTRIES)
+PREWARM = Prewarmer(
+    get_graph=lambda: GRAPH,
+    tts_cache=TTS_CACHE,
+    tts_key=lambda text: tts_request_key(text),
+    synthesize=lambda text: synthesize_speech(text),
+    route_cache=ROUTES,
+    route=lambda text: route_with_llm(text),
+    top_answers=PREWARM_TOP_ANSWERS,
+    top_routes=PREWARM_TOP_ROUTES,
+    rate_per_s=PREWARM_RATE_PER_S,
+    is_outage=lambda e: isinstance(e, UpstreamUnavailable),
+)
+PREWARM.start()
+atexit.register(PREWARM.stop)
+FILLERS = FillerClips(
+    directory=FILLER_DIR,
+    model=TTS_MODEL,
+    text=FILLER_TEXT,
+    synthesize=lambda text, voice: synthesize_speech(text, voice),
+)
+CONTEXT_INDEX = GraphContextIndex(neighborhood_size=CONTEXT_NEIGHBORHOOD_SIZE)
+CONTEXT_PACKS = ContextPackCache()
+GRAPH_PAYLOADS = GraphPayloadCache()
 
 
 # ---------- Models ----------
@@ -56,6 +268,10 @@ class FeedbackIn(BaseModel):
     value: Literal[1, -1]
 
 
+class FeedbackBatchIn(BaseModel):
+    events: List[FeedbackIn]
+
+
 class Task(BaseModel):
     id: str
     kind: Literal["edge_confirmation"]
@@ -118,25 +334,87 @@ class VoiceQATTSResponse(BaseModel):
     reason: Optional[str] = None
 
 
+class ProfilingToggleIn(BaseModel):
+    enabled: bool
+    path_prefix: str = "/api/"
+    remaining: Optional[int] = None
+
+
 # ---------- Helpers ----------
 
 def get_openai_client() -> OpenAI:
     if "REPLACE_ME" in OPENAI_API_KEY or not OPENAI_API_KEY:
         raise RuntimeError("Set OPENAI_API_KEY in backend/app.py")
-    return OpenAI(api_key=OPENAI_API_KEY)
+    return OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+
+
+def upstream_client(timeout: float) -> OpenAI:
+    """OpenAI client for one resilient attempt: bounded, no SDK-level retries."""
+    return get_openai_client().with_options(timeout=timeout, max_retries=0)
+
+
+def chat_completion(kind: str, **params):
+    """
+    client.chat.completions.create(**params) under the `kind` deadline/hedging
+    policy; concurrent identical requests (same model, messages and params)
+    share a single upstream call. Raises UpstreamUnavailable when it gives up.
+    """
+    return UPSTREAM_FLIGHTS.do(
+        request_key("chat", params),
+        lambda: UPSTREAM.call(
+            kind, lambda timeout: upstream_client(timeout).chat.completions.create(**params)
+        ),
+        kind=kind,
+    )
+
+
+def tts_request_key(text: str, voice: str = "alloy") -> str:
+    return request_key("tts", TTS_MODEL, voice, text)
+
+
+def synthesize_speech(text: str, voice: str = "alloy") -> bytes:
+    """
+    TTS to mp3 bytes, served from TTS_CACHE when warm; concurrent identical
+    requests share a single upstream call.
+    """
+    key = tts_request_key(text, voice)
+    cached = TTS_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    def call(timeout: float) -> bytes:
+        speech = upstream_client(timeout).audio.speech.create(
+            model=TTS_MODEL,
+            voice=voice,
+            input=text,
+            response_format="mp3",
+        )
+        if hasattr(speech, "read"):
+            return speech.read()
+        return speech
+
+    audio = UPSTREAM_FLIGHTS.do(key, lambda: UPSTREAM.call("tts", call), kind="tts")
+    TTS_CACHE.put(key, audio)
+    return audio
 
 
 def infer_Clue_from_question(q_text: str) -> str:
-    q = q_text.lower()
-    if "delivery" in q or "ship" in q or "shipping" in q:
-        return "Delivery & shipping"
-    if "price" in q or "cost" in q or "discount" in q:
-        return "Pricing & discounts"
-    if "refund" in q or "return" in q or "warranty" in q:
-        return "Refunds & warranty"
-    if "custom" in q or "bespoke" in q:
-        return "Custom orders"
-    return "General offering"
+    return PHRASES["question_clue"].label(q_text)
+
+
+# One history commit + disk write at a time: request handlers and the
+# background feedback flush / compaction saves would otherwise interleave.
+GRAPH_SAVE_LOCK = threading.RLock()
+
+
+def commit_graph(reason: str, graph: Optional[MemoryGraph] = None) -> None:
+    """Record a history version for the changes since the last commit, then persist."""
+    graph = graph if graph is not None else GRAPH
+    with GRAPH_SAVE_LOCK:
+        with stage("graph_history"):
+            HISTORY.commit(graph, reason)
+        with stage("save_graph"):
+            save_graph(graph)
 
 
 def seed_core_actions():
@@ -155,7 +433,7 @@ def seed_core_actions():
         description="Record an order or update its status in the order ledger.",
         intent_id=DEFAULT_INTENT_ID,
     )
-    save_graph(GRAPH)
+    commit_graph("seed core actions")
 
 
 seed_core_actions()
@@ -183,7 +461,7 @@ def crawl_site_with_firecrawl_v2(
     }
 
     start_resp = httpx.post(
-        "https://api.firecrawl.dev/v2/crawl",
+        f"{FIRECRAWL_BASE_URL}/v2/crawl",
         headers=headers,
         json=payload,
         timeout=30.0,
@@ -195,7 +473,7 @@ def crawl_site_with_firecrawl_v2(
         raise RuntimeError(f"Firecrawl crawl did not return id: {start_data}")
 
     print(f"🔥 Firecrawl v2 crawl started: id={job_id}")
-    status_url = f"https://api.firecrawl.dev/v2/crawl/{job_id}"
+    status_url = f"{FIRECRAWL_BASE_URL}/v2/crawl/{job_id}"
     pages: List[Dict] = []
 
     while True:
@@ -248,31 +526,25 @@ def ensure_graph_has_clues_and_paths(intent_id: str = DEFAULT_INTENT_ID):
     global GRAPH
 
     # If there are already clue->question edges, we're good.
-    has_cq = any(e.type == "describes_context" for e in GRAPH.edges.values())
+    has_cq = bool(GRAPH.query_edges(type="describes_context"))
     if has_cq:
         return
 
     # Collect questions
-    question_nodes = [n for n in GRAPH.nodes.values() if n.type == "question"]
+    question_nodes = GRAPH.query_nodes(type="question")
     if not question_nodes:
         return
 
     # Ensure at least one clue exists
-    clue_nodes = [n for n in GRAPH.nodes.values() if n.type == "clue"]
+    clue_nodes = GRAPH.query_nodes(type="clue")
     if clue_nodes:
         general_clue = clue_nodes[0]
     else:
         general_clue = GRAPH.find_or_create_clue("General", intent_id)
 
     # Connect all questions to the fallback clue (only if not already connected)
-    existing_pairs = set(
-        (e.source, e.target)
-        for e in GRAPH.edges.values()
-        if e.type == "describes_context"
-    )
-
     for q in question_nodes:
-        if (general_clue.id, q.id) in existing_pairs:
+        if GRAPH.get_edge(general_clue.id, q.id, "describes_context"):
             continue
         cq_edge = Edge(
             id=str(uuid4()),
@@ -287,38 +559,25 @@ def ensure_graph_has_clues_and_paths(intent_id: str = DEFAULT_INTENT_ID):
                 "source": "auto_repair",
             },
         )
-        GRAPH.add_edge(cq_edge)
+        GRAPH.upsert_edge(cq_edge)
 
     # Persist repaired graph
     try:
-        save_graph(GRAPH)
+        commit_graph("auto repair")
     except Exception:
         pass
 
 
 def extract_website_knowledge(scraped_pages: dict) -> Dict:
-    client = get_openai_client()
-
     pages = scraped_pages.get("pages", [])
     if not pages:
         raise RuntimeError("No pages scraped from website")
 
-    chunks: List[str] = []
-    for p in pages:
-        title = (p.get("meta_info", {}) or {}).get("page_title") or ""
-        paras = p.get("paragraphs") or []
-        if not isinstance(paras, list):
-            continue
-        body = "\n".join(paras[:20])
-        section = ""
-        if title:
-            section += f"# {title}\n"
-        section += body
-        chunks.append(section.strip())
-
-    full_text = "\n\n---\n\n".join(chunks)
-    if len(full_text) > 12000:
-        full_text = full_text[:12000] + "\n\n...(truncated)..."
+    # Drop crawl-wide boilerplate and near-duplicates, then pack the densest
+    # paragraphs into the prompt budget.
+    with stage("page_cleaning"):
+        full_text, cleaning = packed_text(pages, max_chars=EXTRACT_PROMPT_MAX_CHARS)
+    print(f"🧹 Page cleaning: {cleaning}, prompt chars={len(full_text)}")
 
     system_prompt = """
 You are a sales enablement system that builds a knowledge graph for a business.
@@ -350,7 +609,8 @@ Return STRICTLY valid JSON with this schema:
 
     user_prompt = f"WEBSITE TEXT:\n\n{full_text}"
 
-    resp = client.chat.completions.create(
+    resp = chat_completion(
+        "extract",
         model="gpt-4.1-mini",
         messages=[
             {"role": "system", "content": system_prompt},
@@ -380,70 +640,49 @@ Return STRICTLY valid JSON with this schema:
 
 
 def route_to_graph_question(user_question: str) -> Optional[str]:
-    question_nodes = [n for n in GRAPH.nodes.values() if n.type == "question"]
-    if not question_nodes:
-        return None
-
-    candidates = [
-        {"id": n.id, "question": n.text or n.label or ""} for n in question_nodes
-    ]
-
-    client = get_openai_client()
-
-    system_prompt = """
-You are a router for a knowledge graph of Q&A.
-
-You will be given:
-- user_question: the actual question from the user
-- candidates: a list of known question nodes, each with an id and question text
-
-You MUST choose ONE of the candidate ids that best matches the user question,
-or "NONE" if none are relevant.
-
-Return STRICTLY valid JSON:
-{ "best_id": "...", "confidence": 0.0 }
-    """.strip()
-
-    payload = {
-        "user_question": user_question,
-        "candidates": candidates,
-    }
-
-    resp = client.chat.completions.create(
-        model="gpt-4.1-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": json.dumps(payload, ensure_ascii=False)},
-        ],
-        temperature=0.0,
-        max_tokens=256,
-    )
-
-    content = resp.choices[0].message.content or ""
+    """
+    Question id for `user_question`: a warm ROUTES entry, else the LLM
+    router (cached on success), else lexical matching if the LLM is down.
+    """
+    cached = ROUTES.get(user_question, GRAPH)
+    if cached is not None:
+        return cached
     try:
-        data = json.loads(content)
-    except json.JSONDecodeError:
-        try:
-            start = content.index("{")
-            end = content.rindex("}") + 1
-            snippet = content[start:end]
-            data = json.loads(snippet)
-        except Exception:
-            return None
+        best_id = route_with_llm(user_question)
+    except UpstreamUnavailable as e:
+        print("Router degraded, using lexical match:", repr(e))
+        return route_lexically(user_question)
+    if best_id is not None:
+        ROUTES.put(user_question, best_id)
+    return best_id
+
 
-    best_id = (data.get("best_id") or "").strip()
-    if not best_id or best_id.upper() == "NONE":
+def route_with_llm(user_question: str) -> Optional[str]:
+    """LLM pick among all question nodes; raises UpstreamUnavailable."""
+    question_nodes = GRAPH.query_nodes(type="question")
+    if not question_nodes:
         return None
-    if best_id not in GRAPH.nodes:
+    resp = chat_completion("route", **router_request(user_question, question_nodes))
+    best_id = parse_router_reply(resp.choices[0].message.content or "")
+    if best_id is None or best_id not in GRAPH.nodes:
         return None
     return best_id
 
 
+def route_lexically(user_question: str) -> Optional[str]:
+    """Graph-only routing (token overlap) for when the LLM router is unavailable."""
+    best = CONTEXT_INDEX.top_questions(GRAPH, user_question, 1)
+    if not best or best[0][0] < ROUTE_FALLBACK_MIN_SCORE:
+        return None
+    return best[0][1]
+
+
 def reset_graph_internal():
     global GRAPH, GAPS, SESSIONS
     GRAPH = MemoryGraph()
     GAPS.clear()
     SESSIONS.clear()
+    ROUTES.clear()
     seed_core_actions()
 
 
@@ -454,12 +693,111 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text exposition of stage and request latency histograms."""
+    return PlainTextResponse(
+        render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.get("/api/graph")
-def get_graph():
-    return {
-        "nodes": [vars(n) for n in GRAPH.nodes.values()],
-        "edges": [vars(e) for e in GRAPH.edges.values()],
-    }
+def get_graph(request: Request):
+    """
+    Whole graph as {"nodes": [...], "edges": [...]}. Serialized once per graph
+    version (and compressed once per coding), then served as raw bytes; send
+    the ETag back as If-None-Match to get a 304.
+    """
+    with stage("graph_payload"):
+        payload = GRAPH_PAYLOADS.get(GRAPH)
+    headers = {"ETag": payload.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == payload.etag:
+        return Response(status_code=304, headers=headers)
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=payload.body(encoding),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+@app.get("/api/graph/overview")
+def graph_overview(request: Request, response: Response):
+    """
+    Dashboard summary: node counts plus per-clue aggregates (questions,
+    answered, mean / low answer confidence, action fan-out). Its size
+    follows the number of clues, not QAs; drill into a clue with
+    /api/graph/overview/clues/{clue_id}.
+    """
+    etag = f'"ov-{GRAPH.uid[:12]}-{GRAPH.version}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    with stage("graph_overview"):
+        body = OVERVIEW.overview(GRAPH)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return body
+
+
+@app.get("/api/graph/overview/clues/{clue_id}")
+def graph_overview_clue(
+    clue_id: str,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
+    """
+    One page of a clue's questions (label order) with their answers and
+    next-step actions. Pass the X-Next-Cursor header back as `cursor`.
+    """
+    try:
+        page = OVERVIEW.page(GRAPH, clue_id, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if page is None:
+        raise HTTPException(status_code=404, detail="clue not found")
+    question_ids, next_cursor = page
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    qas = []
+    for question_id in question_ids:
+        q_node = GRAPH.nodes.get(question_id)
+        if q_node is None:
+            continue
+        answers = []
+        for ae in sorted(GRAPH.edges_from(question_id, "answers"), key=lambda e: -e.confidence):
+            a_node = GRAPH.nodes.get(ae.target)
+            if a_node is None:
+                continue
+            actions = [GRAPH.nodes[ne.target] for ne in GRAPH.edges_from(a_node.id, "next_step") if ne.target in GRAPH.nodes]
+            answers.append({"edge_id": ae.id, "confidence": ae.confidence, "answer": a_node, "actions": actions})
+        qas.append({"question": q_node, "answers": answers})
+    return {"clue_id": clue_id, "qas": qas}
+
+
+@app.get("/api/graph/query")
+def graph_query(
+    type: Optional[str] = None,
+    intent_id: Optional[str] = None,
+    source: Optional[str] = None,
+    kind: Literal["nodes", "edges", "all"] = "all",
+):
+    """
+    {"nodes": [...], "edges": [...]} matching every given filter, served
+    from the graph's secondary indexes (cost follows the result size).
+    `type` is a node or edge type; on edges intent_id / source are read
+    from metadata (e.g. source=auto_repair).
+    """
+    if not (type or intent_id or source):
+        raise HTTPException(status_code=400, detail="Pass at least one of type, intent_id, source")
+    with stage("graph_query"):
+        nodes = GRAPH.query_nodes(type, intent_id, source) if kind != "edges" else []
+        edges = GRAPH.query_edges(type, intent_id, source) if kind != "nodes" else []
+        body = serialize_items(nodes, edges)
+    return Response(content=body, media_type="application/json")
 
 
 @app.post("/api/graph/reset")
@@ -467,6 +805,129 @@ def reset_graph():
     reset_graph_internal()
     return {"ok": True}
 
+
+@app.post("/api/graph/compact")
+def compact_graph(dry_run: bool = Query(False)):
+    """
+    Run a compaction pass now (dry_run=true only counts what would go).
+    Reads keep being served while it sweeps; 409 if a pass is in flight.
+    """
+    with stage("graph_gc"):
+        report = GRAPH_GC.run(dry_run=dry_run)
+    if report is None:
+        raise HTTPException(status_code=409, detail="compaction already running")
+    return {"ok": True, "report": report.to_dict()}
+
+
+@app.get("/api/graph/compact")
+def last_compaction():
+    """Report of the most recent compaction pass (manual or scheduled)."""
+    report = GRAPH_GC.last_report
+    return {"report": report.to_dict() if report is not None else None}
+
+
+# ---------- Cache pre-warming ----------
+
+@app.post("/api/prewarm")
+def run_prewarm(invalidate_routes: bool = Query(False)):
+    """Queue a pre-warm pass now (it also runs after ingest, answer edits and imports)."""
+    PREWARM.schedule("manual", invalidate_routes=invalidate_routes)
+    return {"ok": True}
+
+
+@app.get("/api/prewarm")
+def prewarm_status():
+    """Last pre-warm pass plus current TTS / route cache sizes."""
+    report = PREWARM.last
+    return {
+        "report": report.to_dict() if report is not None else None,
+        "tts_cache": TTS_CACHE.stats(),
+        "route_cache": ROUTES.stats(),
+    }
+
+
+# ---------- Graph history ----------
+
+def history_version_or_404(version: int):
+    found = HISTORY.get(version)
+    if found is None:
+        raise HTTPException(status_code=404, detail=f"version {version} not in history")
+    return found
+
+
+@app.get("/api/graph/versions")
+def list_graph_versions():
+    """Retained versions, oldest first (nodes/edges are counts)."""
+    return {"versions": [v.meta() for v in HISTORY.versions()]}
+
+
+@app.get("/api/graph/versions/{version}")
+def get_graph_version(version: int):
+    """The whole graph as of `version`, in the GET /api/graph shape."""
+    found = history_version_or_404(version)
+    with stage("graph_payload"):
+        body = serialize_items(*snapshot_items(found))
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"X-Graph-Version": str(found.version), "Cache-Control": "max-age=31536000, immutable"},
+    )
+
+
+@app.get("/api/graph/versions/{version}/diff")
+def diff_graph_versions(version: int, to: Optional[int] = Query(None, description="default: latest")):
+    """Nodes and edges added, removed or changed from `version` to `to`."""
+    older = history_version_or_404(version)
+    newer = history_version_or_404(to) if to is not None else HISTORY.latest()
+    with stage("graph_diff"):
+        return diff_versions(older, newer)
+
+
+@app.post("/api/graph/versions/{version}/rollback")
+def rollback_graph(version: int):
+    """
+    Restore the graph to `version` by applying only what differs, recorded
+    as a new version (so a rollback can itself be rolled back).
+    """
+    history_version_or_404(version)
+    with GRAPH_SAVE_LOCK:
+        with stage("graph_rollback"):
+            result = HISTORY.rollback(GRAPH, version)
+        if result is None:
+            raise HTTPException(status_code=404, detail=f"version {version} not in history")
+        new_version, counts = result
+        # Content built since `version` is gone: a new identity makes session
+        # cursors (keyed by uid) rebuild their turns into the restored graph.
+        GRAPH.uid = uuid4().hex
+        with stage("save_graph"):
+            save_graph(GRAPH)
+    return {"ok": True, "version": new_version.version, **counts}
+
+
+# ---------- Debug: slow traces & profiles ----------
+
+@app.get("/api/debug/traces")
+def get_traces(limit: int = Query(TRACE_BUFFER_SIZE, ge=1)):
+    """Slowest recent requests (slowest first) with their stage waterfall."""
+    traces = TRACES.snapshot()[:limit]
+    return {"traces": [trace_to_dict(t) for t in traces]}
+
+
+@app.post("/api/debug/profiling")
+def set_profiling(body: ProfilingToggleIn):
+    """Profile requests under path_prefix until disabled, or for the next `remaining`."""
+    PROFILING.set(body.enabled, body.path_prefix, body.remaining)
+    return {"ok": True, "enabled": PROFILING.enabled}
+
+
+@app.get("/api/debug/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(profile_id: str):
+    """Folded stacks (flamegraph.pl / speedscope compatible)."""
+    folded = PROFILES.load(profile_id)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="profile not found")
+    return PlainTextResponse(folded)
+
 # ---------- Nema chat wrapper (for chat + Twilio) ----------
 
 class NemaChatRequest(BaseModel):
@@ -502,20 +963,7 @@ def nema_chat(body: NemaChatRequest):
         reason = ""
 
     # Heuristic: detect explicit order intent from the user's utterance
-    low_msg = body.message.lower()
-    order_intent = any(
-        phrase in low_msg
-        for phrase in [
-            "order flowers",
-            "place an order",
-            "buy flowers",
-            "buy some flowers",
-            "i want to order",
-            "i would like to order",
-            "i would like to place an order",
-            "can i place an order",
-        ]
-    )
+    order_intent = PHRASES["order_intent"].test(body.message)
 
     # Labels of any actions the graph suggested
     action_labels = [a.label for a in actions]
@@ -581,15 +1029,17 @@ Graph internal reason (for you to consider, do NOT repeat literally):
 
     # 3) Call OpenAI to get reply + action as JSON
     try:
-        completion = client.chat.completions.create(
-            model="gpt-4.1-mini",
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.4,
-        )
+        with stage("reply_llm"):
+            completion = chat_completion(
+                "reply",
+                model="gpt-4.1-mini",
+                response_format={"type": "json_object"},
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=0.4,
+            )
         content = completion.choices[0].message.content or "{}"
         obj = json.loads(content)
         reply = obj.get("reply")
@@ -669,8 +1119,10 @@ def ingest_website(body: WebsiteIngestRequest):
             pass
 
         # ---- Crawl + Extract ----
-        crawl_result = crawl_site_with_firecrawl_v2(url, max_depth=5, limit=100)
-        struct = extract_website_knowledge(crawl_result) or {}
+        with stage("crawl"):
+            crawl_result = crawl_site_with_firecrawl_v2(url, max_depth=5, limit=100)
+        with stage("extract_llm"):
+            struct = extract_website_knowledge(crawl_result) or {}
         clues = struct.get("clues") or []
         qas = struct.get("qas") or []
 
@@ -679,50 +1131,13 @@ def ingest_website(body: WebsiteIngestRequest):
             return re.sub(r"\s+", " ", (x or "").strip())
 
         def find_action_node(label: str):
-            want = (label or "").strip().lower()
-            if not want:
+            if not (label or "").strip():
                 return None
-            for n in GRAPH.nodes.values():
-                if getattr(n, "type", None) == "action" and (getattr(n, "label", "") or "").strip().lower() == want:
-                    return n
-            return None
+            return GRAPH.find_node("action", label)
 
         def derive_clue_label(q_text: str, a_text: str) -> str:
-            """
-            Heuristic topicization so we regain multiple clues even when extractor doesn't label.
-            Tune freely; this is deterministic and works well for florist sites.
-            """
-            t = f"{q_text} {a_text}".lower()
-
-            # Delivery / same-day / zip codes / area
-            if any(k in t for k in ["same-day", "same day", "delivery", "deliver", "zip", "zipcode", "area", "seattle", "p.s.t", "pst", "cutoff"]):
-                if "same-day" in t or "same day" in t or "cutoff" in t or "by 12" in t or "12pm" in t:
-                    return "Same-Day Delivery"
-                return "Delivery Area"
-
-            # Ordering / placing order / pickup
-            if any(k in t for k in ["place an order", "order", "buy", "purchase", "pickup", "pick up", "schedule", "book"]):
-                if "pickup" in t or "pick up" in t:
-                    return "Pickup"
-                return "Ordering Process"
-
-            # Store hours
-            if any(k in t for k in ["hours", "open", "close", "closing", "opening"]):
-                return "Store Hours"
-
-            # Contact
-            if any(k in t for k in ["contact", "call", "phone", "email", "hotmail", "reach you"]):
-                return "Contact"
-
-            # Pricing / price ranges
-            if any(k in t for k in ["price", "$", "cost", "range", "budget"]):
-                return "Pricing"
-
-            # Products / arrangements / bouquets
-            if any(k in t for k in ["bouquet", "arrangement", "flowers", "roses", "orchid", "carnation", "chrysanthemum", "designer’s choice", "designer's choice", "teleflora"]):
-                return "Products & Bouquets"
-
-            return ""  # force fallback later
+            """Deterministic topicization, so we regain multiple clues even when the extractor doesn't label."""
+            return PHRASES["website_clue"].label(f"{q_text} {a_text}")
 
         # ---- Build clue nodes ----
         clue_nodes = {}
@@ -795,7 +1210,7 @@ def ingest_website(body: WebsiteIngestRequest):
             a_node = GRAPH.find_or_create_answer(a_text, DEFAULT_INTENT_ID)
 
             # Clue -> Question
-            GRAPH.add_edge(
+            GRAPH.upsert_edge(
                 Edge(
                     id=str(uuid4()),
                     source=clue_node.id,
@@ -813,7 +1228,7 @@ def ingest_website(body: WebsiteIngestRequest):
             )
 
             # Question -> Answer
-            GRAPH.add_edge(
+            GRAPH.upsert_edge(
                 Edge(
                     id=str(uuid4()),
                     source=q_node.id,
@@ -835,7 +1250,7 @@ def ingest_website(body: WebsiteIngestRequest):
             if action_label:
                 act_node = find_action_node(action_label)
                 if act_node:
-                    GRAPH.add_edge(
+                    GRAPH.upsert_edge(
                         Edge(
                             id=str(uuid4()),
                             source=a_node.id,
@@ -856,11 +1271,12 @@ def ingest_website(body: WebsiteIngestRequest):
 
         # Persist
         try:
-            save_graph(GRAPH)
+            commit_graph("website ingest")
         except Exception:
             pass
+        PREWARM.schedule("website ingest", invalidate_routes=True)
 
-        clue_count = len([n for n in GRAPH.nodes.values() if getattr(n, "type", None) == "clue"])
+        clue_count = len(GRAPH.query_nodes(type="clue"))
 
         return {
             "ok": True,
@@ -873,21 +1289,90 @@ def ingest_website(body: WebsiteIngestRequest):
         raise HTTPException(status_code=500, detail=f"Website ingest failed: {str(e)}")
 
 
+# ---------- Bulk import ----------
+
+def import_rows_into_graph(stream, fmt: str) -> Dict:
+    """Parse, upsert in batches (all-or-nothing) and persist once."""
+    with stage("import_parse"):
+        rows = read_rows(stream, fmt)
+    importer = GraphImport(
+        GRAPH,
+        intent_id=DEFAULT_INTENT_ID,
+        derive_clue=infer_Clue_from_question,
+        batch_size=IMPORT_BATCH_SIZE,
+    )
+    with stage("import_apply"):
+        summary = importer.apply(rows)
+    commit_graph("bulk import")
+    PREWARM.schedule("bulk import", invalidate_routes=True)
+    return summary
+
+
+@app.post("/api/graph/import")
+async def import_graph(
+    request: Request,
+    format: Optional[Literal["ndjson", "csv"]] = Query(None),
+):
+    """
+    Bulk-load clue/question/answer/action rows from an NDJSON or CSV body
+    (format from ?format= or the Content-Type). Columns: question, answer,
+    and optionally clue, action, action_description.
+
+    The body is streamed to a spool file, then rows are upserted in indexed
+    batches as one transaction: any invalid row rejects the whole upload
+    (400 with per-line errors) and the graph is saved once at the end.
+    """
+    fmt = format or format_from_content_type(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson",
+        )
+
+    spool = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_MEMORY_BYTES)
+    try:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > IMPORT_MAX_BYTES:
+                raise HTTPException(status_code=413, detail="Import too large")
+            spool.write(chunk)
+        spool.seek(0)
+        try:
+            return await run_in_threadpool(import_rows_into_graph, spool, fmt)
+        except ImportRowsError as e:
+            raise HTTPException(status_code=400, detail={"message": str(e), "errors": e.errors})
+    finally:
+        spool.close()
+
+
 # ---------- Sessions for Build/Update Graph ----------
 
 @app.post("/api/sessions/{session_id}/message")
 def add_session_message(session_id: str, msg: MessageIn):
-    session = SESSIONS.setdefault(session_id, [])
-    session.append({"role": msg.role, "text": msg.text, "at": time.time()})
+    session = SESSIONS.append(
+        session_id, {"role": msg.role, "text": msg.text, "at": time.time()}
+    )
     return {"ok": True, "len": len(session)}
 
 
 @app.post("/api/sessions/{session_id}/build-graph")
 def build_session_graph(session_id: str):
-    transcript = SESSIONS.get(session_id, [])
+    """
+    Incremental: only turns added since the last build are processed. A trailing
+    customer turn without an agent reply is left for the next build.
+    """
+    session = SESSIONS.get(session_id)
+    if session is None:
+        return {"ok": True, "nodes": len(GRAPH.nodes), "edges": len(GRAPH.edges), "processed": 0}
+
+    graph = GRAPH
+    start = session.start(graph.uid)
+    turns = session.pending_turns(graph.uid)
 
     pending_q_node = None
-    for turn in transcript:
+    pending_q_index = None
+    for i, turn in enumerate(turns):
         role = turn.get("role")
         text = (turn.get("text") or "").strip()
         if not text:
@@ -895,6 +1380,7 @@ def build_session_graph(session_id: str):
 
         if role == "customer":
             pending_q_node = GRAPH.find_or_create_question(text, DEFAULT_INTENT_ID)
+            pending_q_index = i
 
         elif role == "agent" and pending_q_node is not None:
             a_node = GRAPH.find_or_create_answer(text, DEFAULT_INTENT_ID)
@@ -912,10 +1398,10 @@ def build_session_graph(session_id: str):
                     "source": "customer_session",
                 },
             )
-            GRAPH.add_edge(qa_edge)
+            GRAPH.upsert_edge(qa_edge)
 
             Clue_label = infer_Clue_from_question(pending_q_node.text)
-            Clue_node = GRAPH.find_or_create_Clue(Clue_label, DEFAULT_INTENT_ID)
+            Clue_node = GRAPH.find_or_create_clue(Clue_label, DEFAULT_INTENT_ID)
 
             cq_edge = Edge(
                 id=str(uuid4()),
@@ -930,12 +1416,22 @@ def build_session_graph(session_id: str):
                     "source": "customer_session",
                 },
             )
-            GRAPH.add_edge(cq_edge)
+            GRAPH.upsert_edge(cq_edge)
 
             pending_q_node = None
+            pending_q_index = None
 
-    save_graph(GRAPH)
-    return {"ok": True, "nodes": len(GRAPH.nodes), "edges": len(GRAPH.edges)}
+    consumed = pending_q_index if pending_q_index is not None else len(turns)
+    SESSIONS.advance_cursor(session_id, start + consumed, graph.uid)
+
+    if consumed:
+        commit_graph("session build")
+    return {
+        "ok": True,
+        "nodes": len(GRAPH.nodes),
+        "edges": len(GRAPH.edges),
+        "processed": consumed,
+    }
 
 
 # ---------- Graph QA (no audio) ----------
@@ -953,7 +1449,8 @@ def qa_answer(body: QARequest):
             reason="Empty question",
         )
 
-    best_qid = route_to_graph_question(user_q)
+    with stage("route"):
+        best_qid = route_to_graph_question(user_q)
     if not best_qid:
         return QAResponse(
             matched_question_id=None,
@@ -964,7 +1461,13 @@ def qa_answer(body: QARequest):
             reason="No matching question in graph",
         )
 
-    q_node = GRAPH.nodes.get(best_qid)
+    with stage("graph"):
+        return answer_for_question(best_qid)
+
+
+def answer_for_question(question_id: str) -> QAResponse:
+    """Follow question --answers--> answer --next_step--> actions in the graph."""
+    q_node = GRAPH.nodes.get(question_id)
     if not q_node:
         return QAResponse(
             matched_question_id=None,
@@ -976,10 +1479,9 @@ def qa_answer(body: QARequest):
         )
 
     answer_edge = None
-    for e in GRAPH.edges.values():
-        if e.type == "answers" and e.source == q_node.id:
-            answer_edge = e
-            break
+    for e in GRAPH.edges_from(q_node.id, "answers"):
+        answer_edge = e
+        break
 
     if not answer_edge:
         return QAResponse(
@@ -1002,19 +1504,23 @@ def qa_answer(body: QARequest):
             reason="Answer node missing",
         )
 
+    # Access counts rank answers for pre-warming. Not a graph change:
+    # no version bump, persisted with the next save.
+    q_node.stats["views"] = q_node.stats.get("views", 0.0) + 1.0
+    a_node.stats["views"] = a_node.stats.get("views", 0.0) + 1.0
+
     actions: List[QAAction] = []
-    for e in GRAPH.edges.values():
-        if e.type == "next_step" and e.source == a_node.id:
-            action_node = GRAPH.nodes.get(e.target)
-            if not action_node:
-                continue
-            actions.append(
-                QAAction(
-                    id=action_node.id,
-                    label=action_node.label or action_node.text,
-                    description=action_node.text,
-                )
+    for e in GRAPH.edges_from(a_node.id, "next_step"):
+        action_node = GRAPH.nodes.get(e.target)
+        if not action_node:
+            continue
+        actions.append(
+            QAAction(
+                id=action_node.id,
+                label=action_node.label or action_node.text,
+                description=action_node.text,
             )
+        )
 
     return QAResponse(
         matched_question_id=q_node.id,
@@ -1029,6 +1535,8 @@ def qa_answer(body: QARequest):
 
 class GraphContextRequest(BaseModel):
     question: str
+    top_k: int = Field(3, ge=0, le=10)
+    max_facts: int = Field(8, ge=1, le=30)
 
 
 class GraphContextAction(BaseModel):
@@ -1037,12 +1545,21 @@ class GraphContextAction(BaseModel):
     description: Optional[str] = None
 
 
+class GraphContextQA(BaseModel):
+    question_id: str
+    question: str
+    answer: str
+    confidence: float
+    clue: Optional[str] = None
+
+
 class GraphContextResponse(BaseModel):
     question: str
     facts: List[str]
     actions: List[GraphContextAction]
     confidence: float
     reason: Optional[str] = None
+    related: List[GraphContextQA] = []
 
 
 
@@ -1051,20 +1568,62 @@ def get_graph_context(body: GraphContextRequest):
     """
     Tool-style endpoint for Realtime agent.
 
-    Given a user's question, return:
-      - facts: list of factual statements from the graph
-      - actions: suggested actions (Take order, Book pickup time, etc.)
-    The model can then use this to answer in its own words.
+    Given a user's question, return a bounded context pack:
+      - facts: the routed answer first, then related Q/As from the graph
+      - related: the same Q/As, structured (top-k lexical matches plus sibling
+        questions under the same clues)
+      - actions: suggested actions reachable from any of them
+    The model can then use this to answer follow-ups without another tool call.
     """
     qa = qa_answer(QARequest(question=body.question))
 
     facts: List[str] = []
     if qa.answer:
-        # you could split into sentences, or just treat as one fact
         facts.append(qa.answer)
 
-    # You might later extend this to pull more context from the graph,
-    # e.g., related questions/answers, Clues, etc.
+    with stage("graph_context"):
+        seeds: List[str] = []
+        if qa.matched_question_id:
+            seeds.append(qa.matched_question_id)
+        for _, qid in CONTEXT_INDEX.top_questions(GRAPH, body.question, body.top_k):
+            if qid not in seeds:
+                seeds.append(qid)
+
+        def clue_label(clue_id: str) -> Optional[str]:
+            node = GRAPH.nodes.get(clue_id)
+            return (node.label or node.text) if node else None
+
+        # 1 hop: the seed questions themselves; 2 hops: siblings under their clues.
+        picked: Dict[str, GraphContextQA] = {}
+        action_ids: List[str] = []
+
+        def pick(entry, clue_id: Optional[str]):
+            if entry is None or not entry.answer or entry.question_id in picked:
+                return
+            if len(picked) >= body.max_facts:
+                return
+            picked[entry.question_id] = GraphContextQA(
+                question_id=entry.question_id,
+                question=entry.question,
+                answer=entry.answer,
+                confidence=entry.confidence,
+                clue=clue_label(clue_id) if clue_id else None,
+            )
+            action_ids.extend(a for a in entry.action_ids if a not in action_ids)
+
+        seed_clues: List[str] = []
+        for qid in seeds:
+            clues = CONTEXT_INDEX.clues_of(GRAPH, qid)
+            pick(CONTEXT_INDEX.entry(GRAPH, qid), clues[0] if clues else None)
+            seed_clues.extend(c for c in clues if c not in seed_clues)
+        for clue_id in seed_clues:
+            for entry in CONTEXT_INDEX.neighborhood(GRAPH, clue_id):
+                pick(entry, clue_id)
+
+    for item in picked.values():
+        if item.question_id == qa.matched_question_id:
+            continue
+        facts.append(f"Q: {item.question} A: {item.answer}")
 
     ctx_actions: List[GraphContextAction] = []
     for act in qa.actions:
@@ -1075,6 +1634,13 @@ def get_graph_context(body: GraphContextRequest):
             description=act.description,
           )
         )
+    for action_id in action_ids:
+        node = GRAPH.nodes.get(action_id)
+        if node is None or any(a.id == action_id for a in ctx_actions):
+            continue
+        ctx_actions.append(
+            GraphContextAction(id=node.id, label=node.label or node.text, description=node.text)
+        )
 
     return GraphContextResponse(
         question=body.question,
@@ -1082,6 +1648,35 @@ def get_graph_context(body: GraphContextRequest):
         actions=ctx_actions,
         confidence=qa.confidence,
         reason=qa.reason,
+        related=list(picked.values()),
+    )
+
+@app.get("/api/graph/context-pack")
+def get_context_pack(
+    request: Request,
+    max_tokens: int = Query(CONTEXT_PACK_MAX_TOKENS, ge=200, le=100_000),
+):
+    """
+    Whole knowledge base as a compact, deterministic prompt block, for
+    orchestrators to inject at session start. Cached per graph version;
+    send the ETag back as If-None-Match to get a 304.
+    """
+    pack = CONTEXT_PACKS.get(GRAPH, max_tokens)
+    headers = {"ETag": pack.etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == pack.etag:
+        return Response(status_code=304, headers=headers)
+    body = {
+        "graph_version": pack.graph_version,
+        "text": pack.text,
+        "token_estimate": pack.token_estimate,
+        "included_qas": pack.included_qas,
+        "total_qas": pack.total_qas,
+        "truncated": pack.truncated,
+    }
+    return Response(
+        content=json.dumps(body, ensure_ascii=False),
+        media_type="application/json",
+        headers=headers,
     )
 
 # ---------- Graph QA + HTTP TTS (text input) ----------
@@ -1097,14 +1692,9 @@ def qa_tts(body: QARequest):
             reason=qa.reason or "No answer in graph",
         )
 
-    client = get_openai_client()
     try:
-        speech = client.audio.speech.create(
-            model=TTS_MODEL,
-            voice="alloy",
-            input=qa.answer,
-            format="mp3",
-        )
+        with stage("tts"):
+            audio_bytes = synthesize_speech(qa.answer)
     except Exception as e:
         print("TTS error:", repr(e))
         return QATTSResponse(
@@ -1114,11 +1704,6 @@ def qa_tts(body: QARequest):
             reason="TTS error; see backend logs.",
         )
 
-    if hasattr(speech, "read"):
-        audio_bytes = speech.read()
-    else:
-        audio_bytes = speech
-
     audio_b64 = base64.b64encode(audio_bytes).decode("utf-8")
     return QATTSResponse(
         answer=qa.answer,
@@ -1130,54 +1715,78 @@ def qa_tts(body: QARequest):
 
 # ---------- Voice QA + HTTP TTS (mic input) ----------
 
-class GraphContextRequest(BaseModel):
-    question: str
-
-
-class GraphContextAction(BaseModel):
-    id: str
-    label: str
-    description: Optional[str] = None
+def transcribe_audio(audio_bytes: bytes) -> str:
+    """Whisper transcription of an uploaded clip (blocking)."""
+    # Whisper wants a named file
+    with tempfile.NamedTemporaryFile(suffix=".webm", delete=False) as tmp:
+        tmp.write(audio_bytes)
+        tmp_path = tmp.name
 
+    def call(timeout: float):
+        with open(tmp_path, "rb") as f:
+            return upstream_client(timeout).audio.transcriptions.create(
+                model="whisper-1",
+                file=f,
+            )
 
-class GraphContextResponse(BaseModel):
-    question: str
-    facts: List[str]
-    actions: List[GraphContextAction]
-    confidence: float
-    reason: Optional[str] = None
+    try:
+        with stage("whisper"):
+            transcribed = UPSTREAM.call("whisper", call)
+        return (transcribed.text or "").strip()
+    finally:
+        try:
+            os.remove(tmp_path)
+        except Exception:
+            pass
 
 
 @app.post("/api/voice/qa-tts", response_model=VoiceQATTSResponse)
-async def voice_qa_tts(file: UploadFile = File(...)):
+async def voice_qa_tts(file: UploadFile = File(...), stream: bool = Query(False)):
     """
     Voice-based QA:
       1) Transcribe audio with Whisper.
       2) Run graph QA on transcript.
       3) TTS the answer with OpenAI.
-    """
-    client = get_openai_client()
 
-    # 1) read audio bytes
+    The blocking steps run in the threadpool so a slow (or coalesced, waiting)
+    upstream call never stalls the event loop.
+
+    With stream=true the reply is NDJSON: a {"type": "filler", ...} line with
+    a cached "let me check" clip right away when the projected latency is
+    above FILLER_MIN_PROJECTED_S, then {"type": "answer", ...} carrying the
+    usual response fields.
+    """
     audio_bytes = await file.read()
+    if not stream:
+        return await voice_qa(audio_bytes)
 
-    # 2) write to tmp file for Whisper
-    with tempfile.NamedTemporaryFile(suffix=".webm", delete=False) as tmp:
-        tmp.write(audio_bytes)
-        tmp_path = tmp.name
+    async def events():
+        if projected_seconds(FILLER_STAGES, FILLER_DEFAULT_STAGE_S) > FILLER_MIN_PROJECTED_S:
+            clip = FILLERS.get(FILLER_VOICE)
+            if clip is not None:
+                yield json.dumps({
+                    "type": "filler",
+                    "text": FILLER_TEXT,
+                    "audio_base64": base64.b64encode(clip).decode("utf-8"),
+                }) + "\n"
+        result = await voice_qa(audio_bytes)
+        yield json.dumps({"type": "answer", **jsonable_encoder(result)}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
 
+
+async def voice_qa(audio_bytes: bytes) -> VoiceQATTSResponse:
     try:
-        with open(tmp_path, "rb") as f:
-            transcribed = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=f,
-            )
-        transcript = (transcribed.text or "").strip()
-    finally:
-        try:
-            os.remove(tmp_path)
-        except Exception:
-            pass
+        transcript = await run_in_threadpool(transcribe_audio, audio_bytes)
+    except UpstreamUnavailable as e:
+        print("Whisper unavailable:", repr(e))
+        return VoiceQATTSResponse(
+            transcript="",
+            answer=None,
+            audio_base64=None,
+            actions=[],
+            reason="Speech recognition is temporarily unavailable",
+        )
 
     if not transcript:
         return VoiceQATTSResponse(
@@ -1188,7 +1797,7 @@ async def voice_qa_tts(file: UploadFile = File(...)):
             reason="Unable to transcribe audio",
         )
 
-    qa = qa_answer(QARequest(question=transcript))
+    qa = await run_in_threadpool(qa_answer, QARequest(question=transcript))
 
     if not qa.answer:
         return VoiceQATTSResponse(
@@ -1200,12 +1809,8 @@ async def voice_qa_tts(file: UploadFile = File(...)):
         )
 
     try:
-        speech = client.audio.speech.create(
-            model=TTS_MODEL,
-            voice="alloy",
-            input=qa.answer,
-            format="mp3",
-        )
+        with stage("tts"):
+            audio_out = await run_in_threadpool(synthesize_speech, qa.answer)
     except Exception as e:
         print("TTS error:", repr(e))
         return VoiceQATTSResponse(
@@ -1216,11 +1821,6 @@ async def voice_qa_tts(file: UploadFile = File(...)):
             reason="TTS error; see backend logs.",
         )
 
-    if hasattr(speech, "read"):
-        audio_out = speech.read()
-    else:
-        audio_out = speech
-
     audio_b64 = base64.b64encode(audio_out).decode("utf-8")
 
     return VoiceQATTSResponse(
@@ -1235,27 +1835,37 @@ async def voice_qa_tts(file: UploadFile = File(...)):
 # ---------- Tasks & feedback for quests ----------
 
 @app.get("/api/graph/tasks", response_model=List[Task])
-def get_tasks():
-    tasks: List[Task] = []
-    describes_edges = [
-        e for e in GRAPH.edges.values() if e.type == "describes_context"
-    ]
+def get_tasks(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+):
+    """
+    Answer edges to review, most valuable first (see task_queue.review_priority).
+    Without `limit` every task is returned; with it, pass the X-Next-Cursor
+    response header back as `cursor` to get the next page.
+    """
+    try:
+        edge_ids, next_cursor = TASKS.page(GRAPH, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
-    for e in GRAPH.edges.values():
-        if e.type != "answers":
-            continue
+    tasks: List[Task] = []
+    for edge_id in edge_ids:
+        e = GRAPH.edges[edge_id]
         q_node = GRAPH.nodes.get(e.source)
         a_node = GRAPH.nodes.get(e.target)
         if not q_node or not a_node:
             continue
 
         Clue_label: Optional[str] = None
-        for de in describes_edges:
-            if de.target == q_node.id:
-                Clue_node = GRAPH.nodes.get(de.source)
-                if Clue_node:
-                    Clue_label = Clue_node.label or Clue_node.text
-                break
+        for de in GRAPH.edges_to(q_node.id, "describes_context"):
+            Clue_node = GRAPH.nodes.get(de.source)
+            if Clue_node:
+                Clue_label = Clue_node.label or Clue_node.text
+            break
 
         tasks.append(
             Task(
@@ -1283,14 +1893,25 @@ def update_answer(body: AnswerUpdateIn):
     new_text = body.new_answer.strip()
     if not new_text:
         return {"ok": False, "error": "empty answer"}
-    answer_node.text = new_text
-    answer_node.label = new_text[:60]
-    save_graph(GRAPH)
+    GRAPH.update_node_text(answer_node.id, new_text)
+    commit_graph("update answer")
+    PREWARM.schedule("update answer")
     return {"ok": True}
 
 
 @app.post("/api/graph/feedback")
 def post_feedback(fb: FeedbackIn):
-    GRAPH.apply_edge_feedback(fb.edge_id, fb.value)
-    save_graph(GRAPH)
+    applied, _ = FEEDBACK.record([(fb.edge_id, fb.value)])
+    if not applied:
+        return {"ok": False, "error": "edge not found"}
     return {"ok": True}
+
+
+@app.post("/api/graph/feedback/batch")
+def post_feedback_batch(body: FeedbackBatchIn):
+    """
+    Bulk thumbs-up/down (CorrectionPanel review, call-outcome feedback).
+    Applied in memory in one pass; persisted by the periodic flush.
+    """
+    applied, unknown = FEEDBACK.record((fb.edge_id, fb.value) for fb in body.events)
+    return {"ok": True, "applied": applied, "unknown_edge_ids": unknown}
@@ -0,0 +1,8 @@
+"""
+Benchmarks for the memory graph and the backend hot paths.
+
+Run from backend/:
+
+    python -m benchmarks.run --sizes 1000,10000 --out before.json
+    python -m benchmarks.compare before.json after.json
+"""
@@ -0,0 +1,48 @@
+"""
+Compare two benchmark result files by median latency.
+
+    python -m benchmarks.compare base.json head.json --threshold 1.25
+
+Exits 1 if any operation got slower than `threshold` x the baseline.
+"""
+import argparse
+import json
+import sys
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    parser.add_argument("--metric", default="median_ms")
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+
+    print(f"base {base['meta'].get('revision')}  ->  head {head['meta'].get('revision')}  ({args.metric})")
+    regressions = 0
+    for size, ops in head["results"].items():
+        base_ops = base["results"].get(size, {})
+        print(f"== {size} nodes")
+        for name, r in ops.items():
+            if name not in base_ops:
+                print(f"   {name:<36} {'new':>10} {r[args.metric]:12.3f}")
+                continue
+            before = base_ops[name][args.metric]
+            after = r[args.metric]
+            ratio = after / before if before > 0 else float("inf")
+            flag = ""
+            if ratio > args.threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"   {name:<36} {before:12.3f} {after:12.3f}  x{ratio:6.2f}{flag}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
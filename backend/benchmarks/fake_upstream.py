@@ -0,0 +1,225 @@
+"""
+Local stand-in for the OpenAI and Firecrawl endpoints app.py calls.
+
+    python -m benchmarks.fake_upstream --port 9100 \
+        --latency chat=lognormal:450:0.6 --latency speech=lognormal:700:0.4
+
+Then start the backend against it:
+
+    OPENAI_BASE_URL=http://127.0.0.1:9100/v1 \
+    FIRECRAWL_BASE_URL=http://127.0.0.1:9100 uvicorn app:app
+
+Latency specs (milliseconds):
+    fixed:MS | uniform:LO:HI | normal:MEAN:STD | lognormal:MEDIAN:SIGMA
+Endpoint names: chat, speech, transcription, crawl.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import re
+import time
+from typing import Callable, Dict, List, Optional
+from uuid import uuid4
+
+from fastapi import FastAPI, Request, Response
+
+DEFAULT_LATENCY = {
+    "chat": "lognormal:450:0.5",
+    "speech": "lognormal:600:0.4",
+    "transcription": "lognormal:350:0.4",
+    "crawl": "fixed:50",
+}
+
+DEFAULT_CANNED = {
+    "transcripts": [
+        "Do you deliver today?",
+        "How much is a dozen roses?",
+        "What time do you close on Sunday?",
+        "I want to order flowers for my mom",
+    ],
+    "pages": [
+        {
+            "url": "https://example-florist.test/",
+            "title": "Example Florist",
+            "markdown": "Same-day delivery in Seattle for orders placed by 12pm PST.\n"
+                        "Bouquets start at $45.\nWe are open 9am-6pm Monday to Saturday.",
+        },
+        {
+            "url": "https://example-florist.test/faq",
+            "title": "FAQ",
+            "markdown": "You can pick up your order in store.\nCall us at 555-0100 to place an order.",
+        },
+    ],
+    "extraction": {
+        "Clues": [{"label": "Same-Day Delivery"}, {"label": "Pricing"}, {"label": "Store Hours"}],
+        "qas": [
+            {"Clue_label": "Same-Day Delivery", "question": "Do you offer same-day delivery?",
+             "answer": "Yes, for orders placed by 12pm PST.", "action": "Take order"},
+            {"Clue_label": "Pricing", "question": "How much do bouquets cost?",
+             "answer": "Bouquets start at $45.", "action": "Take order"},
+            {"Clue_label": "Store Hours", "question": "What are your hours?",
+             "answer": "9am-6pm Monday to Saturday.", "action": ""},
+        ],
+    },
+}
+
+# A single silent MPEG-1 Layer III frame; enough for clients that sniff the payload.
+SILENT_MP3 = bytes.fromhex("fffb9064") + bytes(413)
+
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    """Returns a sampler producing a delay in seconds."""
+    kind, *params = spec.split(":")
+    p = [float(x) for x in params]
+    if kind == "fixed":
+        return lambda: p[0] / 1000.0
+    if kind == "uniform":
+        return lambda: rng.uniform(p[0], p[1]) / 1000.0
+    if kind == "normal":
+        return lambda: max(0.0, rng.gauss(p[0], p[1])) / 1000.0
+    if kind == "lognormal":
+        mu = math.log(p[0])
+        return lambda: rng.lognormvariate(mu, p[1]) / 1000.0
+    raise ValueError(f"Unknown latency distribution: {spec!r}")
+
+
+def _tokens(text: str) -> set:
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def route_by_overlap(payload: Dict, threshold: float = 0.3) -> Dict:
+    """Deterministic router: best token-overlap candidate, or NONE."""
+    want = _tokens(payload.get("user_question") or "")
+    best_id, best_score = "NONE", 0.0
+    for c in payload.get("candidates") or []:
+        have = _tokens(c.get("question") or "")
+        if not want or not have:
+            continue
+        score = len(want & have) / len(want | have)
+        if score > best_score:
+            best_id, best_score = c.get("id"), score
+    if best_score < threshold:
+        return {"best_id": "NONE", "confidence": 0.0}
+    return {"best_id": best_id, "confidence": round(best_score, 3)}
+
+
+def create_app(
+    latency: Optional[Dict[str, str]] = None,
+    canned: Optional[Dict] = None,
+    seed: int = 0,
+) -> FastAPI:
+    rng = random.Random(seed)
+    specs = dict(DEFAULT_LATENCY, **(latency or {}))
+    delays = {name: parse_latency(spec, rng) for name, spec in specs.items()}
+    canned = dict(DEFAULT_CANNED, **(canned or {}))
+    transcripts = itertools.cycle(canned["transcripts"])
+    jobs: Dict[str, int] = {}
+
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await asyncio.sleep(delays["chat"]())
+        messages = body.get("messages") or []
+        system = messages[0].get("content", "") if messages else ""
+        user = messages[-1].get("content", "") if messages else ""
+
+        if "router" in system:
+            try:
+                content = json.dumps(route_by_overlap(json.loads(user)))
+            except ValueError:
+                content = json.dumps({"best_id": "NONE", "confidence": 0.0})
+        elif "Nema" in system:
+            wants_order = "order_intent flag:\nTrue" in user
+            content = json.dumps({
+                "reply": "Happy to help with that! What occasion is it for, and when would you like it?",
+                "action": "TAKE_ORDER" if wants_order else "NONE",
+            })
+        else:
+            content = json.dumps(canned["extraction"])
+
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"chatcmpl-{uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.post("/v1/audio/speech")
+    async def audio_speech(request: Request):
+        await request.body()
+        await asyncio.sleep(delays["speech"]())
+        return Response(content=SILENT_MP3, media_type="audio/mpeg")
+
+    @app.post("/v1/audio/transcriptions")
+    async def audio_transcriptions(request: Request):
+        await request.body()
+        await asyncio.sleep(delays["transcription"]())
+        return {"text": next(transcripts)}
+
+    @app.post("/v2/crawl")
+    async def crawl_start(request: Request):
+        await request.body()
+        await asyncio.sleep(delays["crawl"]())
+        job_id = uuid4().hex
+        jobs[job_id] = 0
+        return {"success": True, "id": job_id}
+
+    @app.get("/v2/crawl/{job_id}")
+    async def crawl_status(job_id: str):
+        await asyncio.sleep(delays["crawl"]())
+        polls = jobs.get(job_id)
+        if polls is None:
+            return {"status": "failed", "error": "unknown job"}
+        jobs[job_id] = polls + 1
+        pages = canned["pages"]
+        data = [
+            {"url": p["url"], "markdown": p["markdown"], "metadata": {"title": p["title"], "url": p["url"]}}
+            for p in pages
+        ]
+        status = "completed" if polls >= 1 else "scraping"
+        return {"status": status, "total": len(data), "completed": len(data), "data": data}
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", action="append", default=[], metavar="NAME=SPEC")
+    parser.add_argument("--canned", help="JSON file overriding transcripts / pages / extraction")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    latency = dict(item.split("=", 1) for item in args.latency)
+    canned = None
+    if args.canned:
+        with open(args.canned, encoding="utf-8") as f:
+            canned = json.load(f)
+
+    uvicorn.run(create_app(latency, canned, args.seed), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
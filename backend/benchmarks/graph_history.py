@@ -0,0 +1,94 @@
+"""
+Cost of graph history (GraphHistory on persistent maps).
+
+    python -m benchmarks.graph_history --nodes 100000 --commits 200
+
+Builds a synthetic graph, commits it once (full copy), then makes
+--commits small change sets (answer edits + feedback) and commits after
+each. Reports per-commit time, the memory each new version adds (traced
+allocations), and diff / rollback / snapshot times against the first
+version.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from benchmarks.synthetic import make_graph
+from graph_history import GraphHistory, diff_versions, snapshot_items
+
+
+def run(n_nodes: int, commits: int, changes_per_commit: int, seed: int = 0) -> Dict:
+    rng = random.Random(seed)
+    graph = make_graph(n_nodes, seed=seed)
+    history = GraphHistory(max_versions=commits + 10)
+
+    t0 = time.perf_counter()
+    base = history.commit(graph, "initial")
+    initial_s = time.perf_counter() - t0
+
+    # Traced from here on only: tracemalloc would dominate the full build.
+    tracemalloc.start()
+
+    answers = [n.id for n in graph.nodes.values() if n.type == "answer"]
+    edges = list(graph.edges)
+    commit_s: List[float] = []
+    mem_before = tracemalloc.get_traced_memory()[0]
+    for i in range(commits):
+        for _ in range(changes_per_commit // 2):
+            graph.update_node_text(rng.choice(answers), f"edited answer {i} {rng.random()}")
+            graph.apply_edge_feedback(rng.choice(edges), rng.choice((1, -1)))
+        t0 = time.perf_counter()
+        history.commit(graph, f"edit {i}")
+        commit_s.append(time.perf_counter() - t0)
+    per_version_bytes = (tracemalloc.get_traced_memory()[0] - mem_before) / commits
+    tracemalloc.stop()
+
+    latest = history.latest()
+    t0 = time.perf_counter()
+    diff = diff_versions(base, latest)
+    diff_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    snapshot_items(base)
+    snapshot_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    _, counts = history.rollback(graph, base.version)
+    rollback_s = time.perf_counter() - t0
+
+    commit_s.sort()
+    return {
+        "nodes": len(graph.nodes),
+        "edges": len(graph.edges),
+        "initial_commit_s": round(initial_s, 3),
+        "commit_median_ms": round(commit_s[len(commit_s) // 2] * 1e3, 3),
+        "bytes_per_version": round(per_version_bytes),
+        "bytes_per_changed_item": round(per_version_bytes / changes_per_commit),
+        "diff_ms": round(diff_s * 1e3, 2),
+        "diff_changed": len(diff["nodes"]["changed"]) + len(diff["edges"]["changed"]),
+        "snapshot_ms": round(snapshot_s * 1e3, 1),
+        "rollback_ms": round(rollback_s * 1e3, 2),
+        "rollback": counts,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=100000)
+    parser.add_argument("--commits", type=int, default=200)
+    parser.add_argument("--changes", type=int, default=10, help="changed items per commit")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = run(args.nodes, args.commits, args.changes)
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Tail latency of upstream chat calls with and without hedging, against the
+local stand-in (started in-process unless --base points at a running one).
+
+    python -m benchmarks.hedging --requests 400 --latency lognormal:300:0.8
+
+Each mode issues the same number of router-sized chat completions through a
+ResilientCaller; the hedged mode first warms up so its hedge delay is the
+observed p95 rather than the default.
+"""
+import argparse
+import json
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from openai import OpenAI
+
+from benchmarks.loadgen import percentile
+from resilience import (
+    HEDGED_CALLS,
+    CallPolicy,
+    CircuitBreaker,
+    ResilientCaller,
+    UpstreamUnavailable,
+)
+
+MESSAGES = [
+    {"role": "system", "content": "You are a router for a knowledge graph of Q&A."},
+    {
+        "role": "user",
+        "content": json.dumps(
+            {
+                "user_question": "Do you offer same-day delivery?",
+                "candidates": [{"id": "q-1", "question": "Do you offer same-day delivery?"}],
+            }
+        ),
+    },
+]
+
+
+def start_stand_in(latency: str) -> str:
+    """Serve benchmarks.fake_upstream on a free local port; returns its /v1 base URL."""
+    import uvicorn
+
+    from benchmarks.fake_upstream import create_app
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    config = uvicorn.Config(
+        create_app({"chat": latency}), host="127.0.0.1", port=port, log_level="warning"
+    )
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}/v1"
+
+
+def run_mode(
+    base_url: str,
+    kind: str,
+    hedge: bool,
+    requests: int,
+    concurrency: int,
+    timeout: float,
+    warmup: int = 0,
+) -> Dict:
+    client = OpenAI(api_key="bench", base_url=base_url)
+    caller = ResilientCaller(
+        breaker=CircuitBreaker(kind, failure_threshold=10**9),
+        policies={kind: CallPolicy(timeout=timeout, hedge=hedge)},
+        max_workers=concurrency * 2,
+    )
+
+    def one(_: int) -> Optional[float]:
+        t0 = time.perf_counter()
+        try:
+            caller.call(
+                kind,
+                lambda t: client.with_options(timeout=t, max_retries=0).chat.completions.create(
+                    model="gpt-4.1-mini", messages=MESSAGES, temperature=0.0, max_tokens=256
+                ),
+            )
+        except UpstreamUnavailable:
+            return None
+        return (time.perf_counter() - t0) * 1000.0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(warmup)))
+        fired_before = HEDGED_CALLS.value(kind=kind, outcome="fired")
+        won_before = HEDGED_CALLS.value(kind=kind, outcome="won")
+        t0 = time.perf_counter()
+        results = list(pool.map(one, range(requests)))
+        elapsed = time.perf_counter() - t0
+
+    latencies: List[float] = sorted(r for r in results if r is not None)
+    return {
+        "mode": "hedged" if hedge else "plain",
+        "requests": requests,
+        "timeouts": sum(1 for r in results if r is None),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 1),
+        "p95_ms": round(percentile(latencies, 0.95), 1),
+        "p99_ms": round(percentile(latencies, 0.99), 1),
+        "hedge_delay_ms": round(caller.hedge_delay(kind) * 1000.0, 1) if hedge else None,
+        "hedges_fired": int(HEDGED_CALLS.value(kind=kind, outcome="fired") - fired_before),
+        "hedges_won": int(HEDGED_CALLS.value(kind=kind, outcome="won") - won_before),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base", help="OpenAI-compatible base URL (default: start the stand-in)")
+    parser.add_argument("--latency", default="lognormal:300:0.8", help="stand-in chat latency spec")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-call cap, seconds")
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    base_url = args.base or start_stand_in(args.latency)
+    report = {
+        "latency": None if args.base else args.latency,
+        "modes": [
+            run_mode(base_url, "bench_plain", False, args.requests, args.concurrency, args.timeout),
+            run_mode(
+                base_url, "bench_hedged", True, args.requests, args.concurrency, args.timeout,
+                warmup=args.warmup,
+            ),
+        ],
+    }
+    for r in report["modes"]:
+        print(
+            f"{r['mode']:<7} n={r['requests']:<5} p50={r['p50_ms']:8.1f}ms "
+            f"p95={r['p95_ms']:8.1f}ms p99={r['p99_ms']:8.1f}ms timeouts={r['timeouts']}"
+            + (
+                f" hedge_delay={r['hedge_delay_ms']}ms fired={r['hedges_fired']} won={r['hedges_won']}"
+                if r["hedge_delay_ms"] is not None
+                else ""
+            )
+        )
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
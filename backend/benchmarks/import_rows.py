@@ -0,0 +1,111 @@
+"""
+Throughput of POST /api/graph/import, in rows/sec.
+
+    python -m benchmarks.import_rows --rows 10000,50000 --out import.json
+
+Each run imports a fresh FAQ-style sheet (unique questions and answers,
+shared clues and actions) into an empty graph, once as CSV and once as
+NDJSON, and then re-imports the same sheet, which is all merges.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.stub_openai import StubOpenAI
+
+CLUES = 200
+ACTIONS = ("Take order", "Book pickup", "Call the shop", "")
+
+
+def make_rows(n: int) -> List[Dict[str, str]]:
+    return [
+        {
+            "clue": f"Topic {i % CLUES}",
+            "question": f"Imported question number {i} about topic {i % CLUES}?",
+            "answer": f"Imported answer number {i}: details for topic {i % CLUES}.",
+            "action": ACTIONS[i % len(ACTIONS)],
+        }
+        for i in range(n)
+    ]
+
+
+def to_csv(rows: List[Dict[str, str]]) -> bytes:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    return buf.getvalue().encode("utf-8")
+
+
+def to_ndjson(rows: List[Dict[str, str]]) -> bytes:
+    return "".join(json.dumps(r) + "\n" for r in rows).encode("utf-8")
+
+
+def run(sizes: List[int]) -> Dict:
+    from fastapi.testclient import TestClient
+    import app as app_module
+    from graph_model import MemoryGraph
+
+    app_module.get_openai_client = lambda: StubOpenAI()
+    client = TestClient(app_module.app)
+    results = []
+    for n in sizes:
+        rows = make_rows(n)
+        for fmt, body, content_type in (
+            ("csv", to_csv(rows), "text/csv"),
+            ("ndjson", to_ndjson(rows), "application/x-ndjson"),
+        ):
+            app_module.GRAPH = MemoryGraph()
+            for phase in ("fresh", "re-import"):
+                t0 = time.perf_counter()
+                r = client.post("/api/graph/import", content=body, headers={"Content-Type": content_type})
+                elapsed = time.perf_counter() - t0
+                assert r.status_code == 200, r.text
+                summary = r.json()
+                results.append(
+                    {
+                        "rows": n,
+                        "format": fmt,
+                        "phase": phase,
+                        "bytes": len(body),
+                        "seconds": round(elapsed, 3),
+                        "rows_per_second": round(n / elapsed, 1),
+                        "apply_rows_per_second": summary["rows_per_second"],
+                        "nodes": len(app_module.GRAPH.nodes),
+                        "edges": len(app_module.GRAPH.edges),
+                    }
+                )
+    return {"results": results}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="10000,50000", help="comma-separated row counts")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    # Keep the real memory_graph.json out of reach of save_graph / seed_core_actions.
+    scratch = tempfile.mkdtemp(prefix="nema-bench-")
+    os.environ["NEMA_GRAPH_FILE"] = os.path.join(scratch, "memory_graph.json")
+
+    report = run([int(s) for s in args.rows.split(",") if s.strip()])
+    for r in report["results"]:
+        print(
+            f"{r['rows']:>8} rows {r['format']:<6} {r['phase']:<9} "
+            f"{r['rows_per_second']:>10.1f} rows/s end-to-end "
+            f"({r['apply_rows_per_second']:.1f} rows/s upsert) nodes={r['nodes']} edges={r['edges']}"
+        )
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
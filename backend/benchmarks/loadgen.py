@@ -0,0 +1,167 @@
+"""
+Open-loop load generator for the backend's live-call endpoints.
+
+    python -m benchmarks.loadgen --base http://127.0.0.1:8000 --rps 20 --duration 60 \
+        --mix chat=1,context=2,voice=1 --out load.json
+
+Requests are issued on a fixed schedule (target RPS) regardless of how fast
+responses come back, so queueing shows up in the latency percentiles.
+"""
+import argparse
+import itertools
+import json
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.fake_upstream import SILENT_MP3
+
+DEFAULT_UTTERANCES = [
+    "Do you offer same-day delivery?",
+    "How much do bouquets cost?",
+    "What are your hours?",
+    "I would like to place an order",
+    "Can I pick up my flowers tomorrow?",
+]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    i = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[i]
+
+
+class Scenario:
+    def __init__(self, client: httpx.Client, utterances: List[str]):
+        self.client = client
+        self.utterances = itertools.cycle(utterances)
+        self._lock = threading.Lock()
+
+    def _next_utterance(self) -> str:
+        with self._lock:
+            return next(self.utterances)
+
+    def chat(self, i: int) -> httpx.Response:
+        return self.client.post(
+            "/api/nema/chat", json={"sessionId": f"load-{i % 50}", "message": self._next_utterance()}
+        )
+
+    def context(self, i: int) -> httpx.Response:
+        return self.client.post("/api/tools/get-graph-context", json={"question": self._next_utterance()})
+
+    def voice(self, i: int) -> httpx.Response:
+        files = {"file": ("utterance.webm", SILENT_MP3, "audio/webm")}
+        return self.client.post("/api/voice/qa-tts", files=files)
+
+
+def parse_mix(spec: str) -> List[str]:
+    """'chat=1,context=2' -> weighted round-robin schedule of scenario names."""
+    schedule: List[str] = []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        schedule.extend([name.strip()] * int(weight or 1))
+    return schedule
+
+
+def run(
+    base_url: str,
+    rps: float,
+    duration: float,
+    mix: str,
+    utterances: List[str],
+    max_workers: int = 256,
+    timeout: float = 30.0,
+) -> Dict:
+    schedule = parse_mix(mix)
+    samples: Dict[str, List[Tuple[float, bool]]] = {name: [] for name in set(schedule)}
+    lock = threading.Lock()
+
+    limits = httpx.Limits(max_connections=max_workers, max_keepalive_connections=max_workers)
+    with httpx.Client(base_url=base_url, timeout=timeout, limits=limits) as client:
+        scenario = Scenario(client, utterances)
+
+        def fire(i: int, name: str) -> None:
+            t0 = time.perf_counter()
+            ok = False
+            try:
+                resp = getattr(scenario, name)(i)
+                ok = resp.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            elapsed = (time.perf_counter() - t0) * 1000.0
+            with lock:
+                samples[name].append((elapsed, ok))
+
+        total = int(rps * duration)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for i in range(total):
+                due = started + i / rps
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(fire, i, schedule[i % len(schedule)])
+        wall = time.perf_counter() - started
+
+    report: Dict = {"target_rps": rps, "duration_s": wall, "endpoints": {}}
+    all_ok: List[float] = []
+    for name, rows in samples.items():
+        lat = sorted(ms for ms, ok in rows if ok)
+        all_ok.extend(lat)
+        report["endpoints"][name] = {
+            "requests": len(rows),
+            "errors": sum(1 for _, ok in rows if not ok),
+            "throughput_rps": len(lat) / wall if wall else 0.0,
+            "p50_ms": percentile(lat, 0.50),
+            "p95_ms": percentile(lat, 0.95),
+            "p99_ms": percentile(lat, 0.99),
+            "mean_ms": statistics.fmean(lat) if lat else 0.0,
+        }
+    all_ok.sort()
+    report["overall"] = {
+        "requests": sum(len(r) for r in samples.values()),
+        "throughput_rps": len(all_ok) / wall if wall else 0.0,
+        "p50_ms": percentile(all_ok, 0.50),
+        "p95_ms": percentile(all_ok, 0.95),
+        "p99_ms": percentile(all_ok, 0.99),
+    }
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base", default="http://127.0.0.1:8000")
+    parser.add_argument("--rps", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--mix", default="chat=1,context=1,voice=1")
+    parser.add_argument("--utterances", help="text file, one utterance per line")
+    parser.add_argument("--workers", type=int, default=256)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    utterances = DEFAULT_UTTERANCES
+    if args.utterances:
+        with open(args.utterances, encoding="utf-8") as f:
+            utterances = [line.strip() for line in f if line.strip()]
+
+    report = run(args.base, args.rps, args.duration, args.mix, utterances, max_workers=args.workers)
+    for name, r in sorted(report["endpoints"].items()) + [("overall", report["overall"])]:
+        print(
+            f"{name:<10} n={r['requests']:<6} rps={r['throughput_rps']:7.2f} "
+            f"p50={r['p50_ms']:8.1f}ms p95={r['p95_ms']:8.1f}ms p99={r['p99_ms']:8.1f}ms"
+            + (f" errors={r['errors']}" if "errors" in r else "")
+        )
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
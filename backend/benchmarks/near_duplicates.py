@@ -0,0 +1,131 @@
+"""
+Cost of the MinHash/LSH near-duplicate index in MemoryGraph.
+
+    python -m benchmarks.near_duplicates --sizes 10000,100000,1000000
+
+For each size: N distinct questions are added to a graph, then
+  - build:   first find_similar() indexes all of them (per-question insert cost)
+  - query:   find_similar() for paraphrases of existing questions (should hit)
+             and for unseen questions (should miss)
+  - create:  find_or_create_question() for a mix of both, as ingest calls it
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+from graph_model import MemoryGraph, Node
+
+SUBJECTS = [
+    "roses", "tulips", "orchids", "peonies", "lilies", "sunflowers", "succulents",
+    "wedding bouquets", "funeral wreaths", "gift cards", "vases", "chocolates",
+    "balloons", "corsages", "centerpieces", "plant subscriptions",
+]
+ASKS = [
+    "do you {v} {s} {w}",
+    "can I {v} {s} {w}",
+    "is it possible to {v} {s} {w}",
+    "how do I {v} {s} {w}",
+    "what does it cost to {v} {s} {w}",
+]
+VERBS = ["order", "deliver", "pick up", "return", "customize", "ship", "reserve", "gift wrap"]
+PARAPHRASE_PREFIX = {"do you": "can you", "can I": "could I", "how do I": "how can I"}
+
+
+def question(i: int, rng: random.Random) -> str:
+    # 16 * 5 * 8 templates x a numbered qualifier -> every question is distinct
+    s = SUBJECTS[i % len(SUBJECTS)]
+    ask = ASKS[(i // len(SUBJECTS)) % len(ASKS)]
+    v = VERBS[(i // (len(SUBJECTS) * len(ASKS))) % len(VERBS)]
+    w = f"for order {i} {rng.choice(['today', 'this weekend', 'next week', 'in store'])}"
+    return ask.format(v=v, s=s, w=w) + "?"
+
+
+def paraphrase(text: str) -> str:
+    for a, b in PARAPHRASE_PREFIX.items():
+        if text.startswith(a):
+            return b + text[len(a):].rstrip("?") + " please"
+    return "please tell me " + text.rstrip("?")
+
+
+def time_each(fn, items) -> Dict[str, float]:
+    samples = []
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    samples.sort()
+    return {
+        "median_us": round(statistics.median(samples), 1),
+        "p95_us": round(samples[int(0.95 * (len(samples) - 1))], 1),
+    }
+
+
+def run_size(n: int, probes: int, seed: int = 0) -> Dict:
+    rng = random.Random(seed)
+    g = MemoryGraph()
+    texts: List[str] = []
+    for i in range(n):
+        text = question(i, rng)
+        texts.append(text)
+        g.add_node(Node(id=f"q-{i}", type="question", label=text[:60], text=text))
+
+    t0 = time.perf_counter()
+    g.find_similar("question", "warm up")
+    build_s = time.perf_counter() - t0
+
+    sample = rng.sample(range(n), min(probes, n))
+    paraphrases = [paraphrase(texts[i]) for i in sample]
+    unseen = [question(n + k, rng) for k in range(len(sample))]
+
+    def matched(text: str, i: int) -> bool:
+        node = g.find_similar("question", text)
+        return node is not None and node.id == f"q-{i}"
+
+    hits = sum(1 for p, i in zip(paraphrases, sample) if matched(p, i))
+    false_hits = sum(1 for u in unseen if g.find_similar("question", u) is not None)
+    before = len(g.nodes)
+    create = time_each(lambda t: g.find_or_create_question(t, None), paraphrases[: probes // 2] + unseen[: probes // 2])
+    return {
+        "questions": n,
+        "build_s": round(build_s, 2),
+        "insert_us_per_question": round(build_s / n * 1e6, 1),
+        "query_paraphrase": time_each(lambda t: g.find_similar("question", t), paraphrases),
+        "query_unseen": time_each(lambda t: g.find_similar("question", t), unseen),
+        "find_or_create": create,
+        "paraphrase_recall": round(hits / len(sample), 3),
+        "unseen_false_merges": false_hits,
+        "nodes_created": len(g.nodes) - before,
+        "lsh_buckets": sum(len(b) for b in g._similar["question"]._buckets),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--probes", type=int, default=2000)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = {"results": []}
+    for n in (int(s) for s in args.sizes.split(",") if s.strip()):
+        r = run_size(n, args.probes)
+        report["results"].append(r)
+        print(
+            f"{n:>9} questions: insert {r['insert_us_per_question']}us/q (build {r['build_s']}s), "
+            f"query hit {r['query_paraphrase']['median_us']}us p95 {r['query_paraphrase']['p95_us']}us, "
+            f"miss {r['query_unseen']['median_us']}us p95 {r['query_unseen']['p95_us']}us, "
+            f"find_or_create {r['find_or_create']['median_us']}us, "
+            f"recall {r['paraphrase_recall']}, false merges {r['unseen_false_merges']}"
+        )
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Clue derivation / order-intent detection over a bulk ingest of Q/A pairs:
+the compiled phrase tables vs the substring-scan chains they replaced.
+
+    python -m benchmarks.phrase_rules --pairs 100000
+
+Both sides label the same pairs; any disagreement is reported (there
+should be none, the tables encode the same phrases and precedence).
+The built-in tables are small enough that short-circuiting `in` scans
+stay competitive; the scaling runs use synthetic per-business tables of
+--table-sizes phrases, where the chains grow linearly and the single
+compiled scan barely does.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from phrase_rules import PhraseRules, load_phrase_tables
+
+SUBJECTS = [
+    "roses", "a wedding bouquet", "sympathy flowers", "an orchid", "a gift card",
+    "succulents", "the designer's choice arrangement", "balloons", "a plant subscription",
+]
+QUESTIONS = [
+    "Do you deliver {s} to my zip code?",
+    "Can I get {s} same day if I order by 12pm?",
+    "How much does {s} cost?",
+    "Can I pick up {s} tomorrow?",
+    "What time do you open on Sundays?",
+    "How do I place an order for {s}?",
+    "Is there a warranty or refund on {s}?",
+    "Can you make a custom version of {s}?",
+    "What is the best way to reach you about {s}?",
+    "Tell me more about {s}.",
+]
+ANSWERS = [
+    "Yes, we cover most of the greater Seattle area.",
+    "Orders placed before noon PST go out the same afternoon.",
+    "Prices start at $45 and depend on the season.",
+    "Our shop hours are 9 to 6, Monday through Saturday.",
+    "Just give us a call or send an email and we will help.",
+    "Every arrangement is made fresh by our florists.",
+    "We are happy to help with that.",
+]
+MESSAGES = [
+    "hi there", "I would like to place an order", "what are your hours",
+    "can I buy some flowers for my mom", "do you deliver on sunday", "I want to order roses",
+]
+
+
+def make_pairs(n: int, seed: int = 0) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    return [
+        (rng.choice(QUESTIONS).format(s=rng.choice(SUBJECTS)), rng.choice(ANSWERS))
+        for _ in range(n)
+    ]
+
+
+# ----- the chains replaced in app.py, kept here for comparison -----
+
+def legacy_question_clue(q_text: str) -> str:
+    q = q_text.lower()
+    if "delivery" in q or "ship" in q or "shipping" in q:
+        return "Delivery & shipping"
+    if "price" in q or "cost" in q or "discount" in q:
+        return "Pricing & discounts"
+    if "refund" in q or "return" in q or "warranty" in q:
+        return "Refunds & warranty"
+    if "custom" in q or "bespoke" in q:
+        return "Custom orders"
+    return "General offering"
+
+
+def legacy_website_clue(q_text: str, a_text: str) -> str:
+    t = f"{q_text} {a_text}".lower()
+    if any(k in t for k in ["same-day", "same day", "delivery", "deliver", "zip", "zipcode", "area", "seattle", "p.s.t", "pst", "cutoff"]):
+        if "same-day" in t or "same day" in t or "cutoff" in t or "by 12" in t or "12pm" in t:
+            return "Same-Day Delivery"
+        return "Delivery Area"
+    if any(k in t for k in ["place an order", "order", "buy", "purchase", "pickup", "pick up", "schedule", "book"]):
+        if "pickup" in t or "pick up" in t:
+            return "Pickup"
+        return "Ordering Process"
+    if any(k in t for k in ["hours", "open", "close", "closing", "opening"]):
+        return "Store Hours"
+    if any(k in t for k in ["contact", "call", "phone", "email", "hotmail", "reach you"]):
+        return "Contact"
+    if any(k in t for k in ["price", "$", "cost", "range", "budget"]):
+        return "Pricing"
+    if any(k in t for k in ["bouquet", "arrangement", "flowers", "roses", "orchid", "carnation", "chrysanthemum", "designer’s choice", "designer's choice", "teleflora"]):
+        return "Products & Bouquets"
+    return ""
+
+
+def legacy_order_intent(message: str) -> bool:
+    low_msg = message.lower()
+    return any(
+        phrase in low_msg
+        for phrase in [
+            "order flowers", "place an order", "buy flowers", "buy some flowers",
+            "i want to order", "i would like to order", "i would like to place an order",
+            "can i place an order",
+        ]
+    )
+
+
+def synthetic_table(n_phrases: int, n_groups: int = 10, seed: int = 0) -> Dict:
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    groups = {
+        f"g{i}": ["".join(rng.choice(letters) for _ in range(rng.randint(4, 9))) for _ in range(n_phrases // n_groups)]
+        for i in range(n_groups)
+    }
+    groups["g0"].append("roses")  # something real text actually hits
+    return {"groups": groups, "rules": [[f"Label {i}", [f"g{i}"]] for i in range(n_groups)], "default": ""}
+
+
+def legacy_chain(table: Dict) -> Callable[[str], str]:
+    """The `any(k in t for k in [...])` shape, one chain per rule."""
+    chains = [(label, [table["groups"][g] for g in required]) for label, required in table["rules"]]
+
+    def label(text: str) -> str:
+        t = text.lower()
+        for name, groups in chains:
+            if all(any(k in t for k in phrases) for phrases in groups):
+                return name
+        return table["default"]
+
+    return label
+
+
+def timed(fn: Callable, items: List) -> Tuple[float, List]:
+    t0 = time.perf_counter()
+    out = [fn(*item) for item in items]
+    return time.perf_counter() - t0, out
+
+
+def run(n: int, table_sizes: List[int], rules_file: Optional[str] = None) -> Dict:
+    tables = load_phrase_tables(rules_file)
+    pairs = make_pairs(n)
+    questions = [(q,) for q, _ in pairs]
+    messages = [(random.Random(i).choice(MESSAGES),) for i in range(n)]
+    cases = [
+        ("website_clue", pairs, legacy_website_clue, lambda q, a: tables["website_clue"].label(f"{q} {a}")),
+        ("question_clue", questions, legacy_question_clue, tables["question_clue"].label),
+        ("order_intent", messages, legacy_order_intent, tables["order_intent"].test),
+    ]
+    joined = [(f"{q} {a}",) for q, a in pairs]
+    for size in table_sizes:
+        table = synthetic_table(size)
+        cases.append((f"{size}_phrases", joined, legacy_chain(table), PhraseRules.from_dict(table).label))
+    results = []
+    for name, items, legacy, compiled in cases:
+        legacy_s, expected = timed(legacy, items)
+        compiled_s, got = timed(compiled, items)
+        results.append(
+            {
+                "table": name,
+                "items": n,
+                "legacy_us": round(legacy_s / n * 1e6, 2),
+                "compiled_us": round(compiled_s / n * 1e6, 2),
+                "speedup": round(legacy_s / compiled_s, 2),
+                "disagreements": sum(1 for a, b in zip(expected, got) if a != b),
+            }
+        )
+    return {"pairs": n, "results": results}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=100000)
+    parser.add_argument("--table-sizes", default="100,1000", help="synthetic table sizes to scale to")
+    parser.add_argument("--rules-file", help="phrase_rules.json to load instead of the defaults")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.table_sizes.split(",") if s.strip()]
+    report = run(args.pairs, sizes, args.rules_file)
+    for r in report["results"]:
+        print(
+            f"{r['table']:<14} {r['items']} items: legacy {r['legacy_us']}us, "
+            f"compiled {r['compiled_us']}us ({r['speedup']}x), disagreements {r['disagreements']}"
+        )
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
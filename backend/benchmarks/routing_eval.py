@@ -0,0 +1,329 @@
+"""
+Routing accuracy vs cost for the question router, offline.
+
+    python -m benchmarks.routing_eval --labels labels.jsonl            # backend/memory_graph.json
+    python -m benchmarks.routing_eval --graph saved.json --labels labels.jsonl --backends llm,shortlist-llm
+    python -m benchmarks.routing_eval --synthetic-nodes 5000 --utterances 500
+
+Labels are JSONL, one {"utterance": "...", "expected": "<question id>" | null}
+per line; null means nothing in the graph matches and the router should
+answer NONE. Without --labels a deterministic set is generated from the
+graph (perturbed question texts plus off-topic utterances); --write-labels
+saves it for reuse.
+
+Backends (--backends, comma separated):
+  lexical         token-overlap index; the app's fallback when the LLM is down
+  llm             the production router prompt over every question node
+  shortlist-llm   the same prompt over only the lexical top --shortlist
+
+LLM backends call --llm stub (default): a deterministic token-overlap stand-in
+with no network, whose latency is simulated from --stub-latency plus
+--stub-ms-per-1k-tokens of prompt. --llm openai calls the real API
+(OPENAI_API_KEY / OPENAI_BASE_URL). Prompt tokens come from the API's usage
+when reported, else are estimated at 4 chars/token.
+
+Per backend: top-1 accuracy (a correct NONE counts), top-k accuracy over
+answerable utterances, NONE precision / recall, latency p50/p95/p99 and
+prompt tokens per query.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.fake_upstream import parse_latency, route_by_overlap
+from benchmarks.synthetic import make_graph
+from context_pack import estimate_tokens
+from graph_context import GraphContextIndex
+from graph_model import MemoryGraph, graph_file_path, load_graph
+from question_router import parse_router_reply, router_request
+
+LEXICAL_MIN_SCORE = 0.35   # app.ROUTE_FALLBACK_MIN_SCORE
+
+OFF_TOPIC = [
+    "what's the weather going to be like tomorrow",
+    "can you tell me a joke",
+    "who won the game last night",
+    "how do I reset my wifi router password",
+    "what is the capital of australia",
+    "recommend a good movie for tonight",
+    "how tall is mount everest",
+    "translate good morning into french",
+    "what time is it in tokyo right now",
+    "is the stock market open on saturday",
+]
+PREFIXES = ["hey, ", "hi there, ", "quick question: ", "um, ", "i was wondering ", "so "]
+SWAPS = [("do you", "do you guys"), ("can i", "could i"), ("how much", "what's the price"),
+         ("what are", "tell me"), ("is ", "is there ")]
+
+
+@dataclass
+class LabeledUtterance:
+    utterance: str
+    expected: Optional[str]   # question id; None = should route to NONE
+
+
+@dataclass
+class Routed:
+    ranked: List[str]                 # question ids, best first; empty = NONE
+    prompt_tokens: int = 0
+    simulated_s: float = 0.0          # stub LLM latency, added to the measured time
+
+
+# ---------- labeled sets ----------
+
+
+def read_labels(path: str) -> List[LabeledUtterance]:
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                raw = json.loads(line)
+                items.append(LabeledUtterance(raw["utterance"], raw.get("expected") or None))
+    return items
+
+
+def write_labels(path: str, items: List[LabeledUtterance]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for item in items:
+            f.write(json.dumps({"utterance": item.utterance, "expected": item.expected}, ensure_ascii=False) + "\n")
+
+
+def perturb(text: str, rng: random.Random) -> str:
+    """How a caller might say a known question: case, punctuation, filler and wording drift."""
+    words = re.sub(r"[^\w\s'#]", " ", text.lower()).split()
+    out = " ".join(words)
+    for a, b in SWAPS:
+        if out.startswith(a) and rng.random() < 0.5:
+            out = b + out[len(a):]
+            break
+    words = out.split()
+    if len(words) > 4 and rng.random() < 0.5:
+        del words[rng.randrange(1, len(words))]
+    out = " ".join(words)
+    if rng.random() < 0.5:
+        out = rng.choice(PREFIXES) + out
+    return out
+
+
+def synthesize_labels(graph: MemoryGraph, n: int, none_fraction: float, seed: int) -> List[LabeledUtterance]:
+    rng = random.Random(seed)
+    questions = sorted(graph.query_nodes(type="question"), key=lambda q: q.id)
+    n_none = round(n * none_fraction) if questions else n
+    picked = [rng.choice(questions) for _ in range(n - n_none)] if questions else []
+    items = [LabeledUtterance(perturb(q.text or q.label, rng), q.id) for q in picked]
+    items += [LabeledUtterance(rng.choice(OFF_TOPIC), None) for _ in range(n_none)]
+    rng.shuffle(items)
+    return items
+
+
+# ---------- router backends ----------
+
+
+class StubRouterLLM:
+    """
+    Deterministic chat.completions stand-in for router prompts: picks the
+    best token-overlap candidate (fake_upstream.route_by_overlap) and
+    reports a simulated latency instead of sleeping.
+    """
+
+    def __init__(self, latency: Callable[[], float], ms_per_1k_tokens: float, threshold: float):
+        self.latency = latency
+        self.ms_per_1k_tokens = ms_per_1k_tokens
+        self.threshold = threshold
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **params):
+        user = params["messages"][-1]["content"]
+        reply = route_by_overlap(json.loads(user), threshold=self.threshold)
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in params["messages"])
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(reply)))],
+            usage=SimpleNamespace(prompt_tokens=prompt_tokens),
+            simulated_s=self.latency() + prompt_tokens / 1000.0 * self.ms_per_1k_tokens / 1000.0,
+        )
+
+
+class LexicalRouter:
+    def __init__(self, graph: MemoryGraph, min_score: float = LEXICAL_MIN_SCORE):
+        self.graph = graph
+        self.min_score = min_score
+        self.index = GraphContextIndex()
+        self.index.top_questions(graph, "warm up", 1)  # build the index outside the timed loop
+
+    def route(self, utterance: str, k: int) -> Routed:
+        top = self.index.top_questions(self.graph, utterance, k)
+        if not top or top[0][0] < self.min_score:
+            return Routed([])
+        return Routed([question_id for _, question_id in top])
+
+
+class LLMRouter:
+    """The production prompt (question_router) over all questions, or a lexical shortlist of them."""
+
+    def __init__(self, graph: MemoryGraph, client, shortlist: int = 0):
+        self.graph = graph
+        self.client = client
+        self.shortlist = shortlist
+        self.lexical = LexicalRouter(graph, min_score=0.0) if shortlist else None
+        self.questions = graph.query_nodes(type="question")
+
+    def route(self, utterance: str, k: int) -> Routed:
+        if self.lexical is not None:
+            shortlist = self.lexical.route(utterance, self.shortlist).ranked
+            questions = [self.graph.nodes[question_id] for question_id in shortlist]
+        else:
+            shortlist, questions = [], self.questions
+        if not questions:
+            return Routed([])
+        params = router_request(utterance, questions)
+        resp = self.client.chat.completions.create(**params)
+        best = parse_router_reply(resp.choices[0].message.content or "")
+        usage = getattr(resp, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", None) or sum(
+            estimate_tokens(m["content"]) for m in params["messages"]
+        )
+        simulated_s = getattr(resp, "simulated_s", 0.0)
+        if best is None or best not in self.graph.nodes:
+            return Routed([], prompt_tokens, simulated_s)
+        # The LLM names one id; the rest of the shortlist gives top-k its runners-up.
+        ranked = [best] + [question_id for question_id in shortlist if question_id != best]
+        return Routed(ranked, prompt_tokens, simulated_s)
+
+
+def llm_client(args: argparse.Namespace):
+    if args.llm == "openai":
+        from openai import OpenAI
+
+        return OpenAI(base_url=os.environ.get("OPENAI_BASE_URL"))
+    rng = random.Random(args.seed)
+    return StubRouterLLM(parse_latency(args.stub_latency, rng), args.stub_ms_per_1k_tokens, args.stub_threshold)
+
+
+# name -> factory(graph, args); add a backend here to evaluate it
+BACKENDS: Dict[str, Callable[[MemoryGraph, argparse.Namespace], object]] = {
+    "lexical": lambda graph, args: LexicalRouter(graph, args.lexical_min_score),
+    "llm": lambda graph, args: LLMRouter(graph, llm_client(args)),
+    "shortlist-llm": lambda graph, args: LLMRouter(graph, llm_client(args), shortlist=args.shortlist),
+}
+
+
+# ---------- evaluation ----------
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def evaluate(router, items: List[LabeledUtterance], k: int) -> Dict:
+    latencies: List[float] = []
+    tokens: List[int] = []
+    top1 = topk = answerable = 0
+    predicted_none = correct_none = expected_none = 0
+    for item in items:
+        t0 = time.perf_counter()
+        routed = router.route(item.utterance, k)
+        latencies.append((time.perf_counter() - t0 + routed.simulated_s) * 1000.0)
+        tokens.append(routed.prompt_tokens)
+        best = routed.ranked[0] if routed.ranked else None
+        top1 += best == item.expected
+        if item.expected is None:
+            expected_none += 1
+        else:
+            answerable += 1
+            topk += item.expected in routed.ranked[:k]
+        if best is None:
+            predicted_none += 1
+            correct_none += item.expected is None
+    latencies.sort()
+    tokens.sort()
+    return {
+        "utterances": len(items),
+        "top1_accuracy": round(top1 / max(1, len(items)), 4),
+        f"top{k}_accuracy": round(topk / max(1, answerable), 4),
+        "none_precision": round(correct_none / predicted_none, 4) if predicted_none else None,
+        "none_recall": round(correct_none / expected_none, 4) if expected_none else None,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 3),
+            "p95": round(percentile(latencies, 0.95), 3),
+            "p99": round(percentile(latencies, 0.99), 3),
+        },
+        "prompt_tokens": {
+            "mean": round(sum(tokens) / max(1, len(tokens)), 1),
+            "p95": percentile(tokens, 0.95),
+        },
+    }
+
+
+def load_eval_graph(args: argparse.Namespace) -> MemoryGraph:
+    if args.synthetic_nodes:
+        return make_graph(args.synthetic_nodes, seed=args.seed)
+    os.environ["NEMA_GRAPH_FILE"] = args.graph or graph_file_path()
+    return load_graph()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--graph", help="saved memory_graph.json (default: the app's graph file)")
+    parser.add_argument("--synthetic-nodes", type=int, help="evaluate on benchmarks.synthetic.make_graph instead")
+    parser.add_argument("--labels", help="JSONL of {utterance, expected}; generated from the graph if omitted")
+    parser.add_argument("--write-labels", help="save the (generated) labeled set here")
+    parser.add_argument("--utterances", type=int, default=300, help="size of a generated set")
+    parser.add_argument("--none-fraction", type=float, default=0.2, help="off-topic share of a generated set")
+    parser.add_argument("--backends", default="lexical,llm,shortlist-llm")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--shortlist", type=int, default=20)
+    parser.add_argument("--lexical-min-score", type=float, default=LEXICAL_MIN_SCORE)
+    parser.add_argument("--llm", choices=("stub", "openai"), default="stub")
+    parser.add_argument("--stub-latency", default="lognormal:300:0.2", help="fake_upstream latency spec (ms)")
+    parser.add_argument("--stub-ms-per-1k-tokens", type=float, default=30.0)
+    parser.add_argument("--stub-threshold", type=float, default=0.3, help="stub router's NONE cutoff")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    graph = load_eval_graph(args)
+    if args.labels:
+        items = read_labels(args.labels)
+    else:
+        items = synthesize_labels(graph, args.utterances, args.none_fraction, args.seed)
+    if args.write_labels:
+        write_labels(args.write_labels, items)
+    unknown = [item for item in items if item.expected is not None and item.expected not in graph.nodes]
+    if unknown:
+        print(f"⚠️  {len(unknown)} labels name question ids missing from the graph; they count as misses")
+
+    report = {
+        "questions": len(graph.query_nodes(type="question")),
+        "utterances": len(items),
+        "llm": args.llm,
+        "results": {},
+    }
+    for name in (b.strip() for b in args.backends.split(",") if b.strip()):
+        if name not in BACKENDS:
+            parser.error(f"unknown backend {name!r}; choose from {', '.join(BACKENDS)}")
+        result = evaluate(BACKENDS[name](graph, args), items, args.k)
+        report["results"][name] = result
+        lat = result["latency_ms"]
+        print(
+            f"{name:>14}: top1 {result['top1_accuracy']:.3f}  top{args.k} {result[f'top{args.k}_accuracy']:.3f}  "
+            f"NONE p/r {result['none_precision']}/{result['none_recall']}  "
+            f"latency p50 {lat['p50']}ms p95 {lat['p95']}ms p99 {lat['p99']}ms  "
+            f"prompt tokens {result['prompt_tokens']['mean']}"
+        )
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Time graph_model operations and app endpoints over synthetic graphs.
+
+    python -m benchmarks.run                       # 1k, 10k, 100k, 1M nodes
+    python -m benchmarks.run --sizes 1000,10000 --out results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.synthetic import make_graph, question_text
+from benchmarks.stub_openai import StubOpenAI
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+
+def time_op(fn: Callable[[int], object], iters: int) -> Dict[str, float]:
+    samples: List[float] = []
+    for i in range(iters):
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    samples.sort()
+    return {
+        "iters": iters,
+        "min_ms": samples[0],
+        "median_ms": statistics.median(samples),
+        "mean_ms": statistics.fmean(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "max_ms": samples[-1],
+    }
+
+
+def iterations(n_nodes: int, budget: int = 200_000) -> int:
+    """Fewer repetitions for O(n) operations on big graphs."""
+    return max(3, min(200, budget // n_nodes))
+
+
+def bench_graph_model(n_nodes: int) -> Dict[str, Dict[str, float]]:
+    from graph_model import Edge, load_graph, save_graph
+
+    g = make_graph(n_nodes)
+    n_questions = sum(1 for n in g.nodes.values() if n.type == "question")
+    iters = iterations(n_nodes)
+    out: Dict[str, Dict[str, float]] = {}
+
+    # Spread hits across the graph so linear scans are not flattered by early matches.
+    spread = lambda i: (i * 7919) % n_questions
+    out["find_or_create_question.hit"] = time_op(
+        lambda i: g.find_or_create_question(question_text(spread(i)), "sales-agent"), iters
+    )
+    out["find_or_create_answer.hit"] = time_op(
+        lambda i: g.find_or_create_answer(g.nodes[f"a-{spread(i)}"].text, "sales-agent"), iters
+    )
+    out["find_or_create_clue.hit"] = time_op(lambda i: g.find_or_create_clue("Clue 0", "sales-agent"), iters)
+    out["find_or_create_action.hit"] = time_op(lambda i: g.find_or_create_action("Take order"), iters)
+    out["find_or_create_question.miss"] = time_op(
+        lambda i: g.find_or_create_question(f"brand new question {i}?", "sales-agent"), iters
+    )
+    out["add_edge"] = time_op(
+        lambda i: g.add_edge(Edge(id=f"bench-{i}", source="q-0", target=f"a-{i % n_questions}", type="related")),
+        1000,
+    )
+    out["upsert_edge.repeat"] = time_op(
+        lambda i: g.upsert_edge(Edge(id=f"bench-up-{i}", source="q-0", target="a-0", type="answers")), 1000
+    )
+    out["apply_edge_feedback"] = time_op(
+        lambda i: g.apply_edge_feedback(f"qa-{i % n_questions}", 1 if i % 3 else -1), 1000
+    )
+
+    io_iters = 3 if n_nodes <= 100_000 else 1
+    out["save_graph"] = time_op(lambda i: save_graph(g), io_iters)
+    out["load_graph"] = time_op(lambda i: load_graph(), io_iters)
+    return out
+
+
+def bench_app(n_nodes: int) -> Dict[str, Dict[str, float]]:
+    from fastapi.testclient import TestClient
+    import app as app_module
+    from graph_payload import GraphPayloadCache
+
+    app_module.get_openai_client = lambda: StubOpenAI()
+    app_module.GRAPH = make_graph(n_nodes)
+    client = TestClient(app_module.app)
+    iters = iterations(n_nodes, budget=100_000)
+    n_questions = sum(1 for n in app_module.GRAPH.nodes.values() if n.type == "question")
+    out: Dict[str, Dict[str, float]] = {}
+
+    def qa(i: int):
+        r = client.post("/api/graph/qa-answer", json={"question": question_text((i * 7919) % n_questions)})
+        assert r.status_code == 200 and r.json()["answer"], r.text
+
+    def tasks_page(i: int):
+        r = client.get("/api/graph/tasks", params={"limit": 50})
+        assert r.status_code == 200, r.text
+
+    def tasks_all(i: int):
+        r = client.get("/api/graph/tasks")
+        assert r.status_code == 200, r.text
+
+    def graph(i: int):
+        r = client.get("/api/graph")
+        assert r.status_code == 200, r.text
+
+    def graph_cold(i: int):
+        # Fresh cache: pays serialization, as the first poll after a mutation does.
+        app_module.GRAPH_PAYLOADS = GraphPayloadCache()
+        graph(i)
+
+    def graph_gzip(i: int):
+        r = client.get("/api/graph", headers={"Accept-Encoding": "gzip"})
+        assert r.status_code == 200, r.text
+
+    out["POST /api/graph/qa-answer"] = time_op(qa, iters)
+    out["GET /api/graph/tasks?limit=50"] = time_op(tasks_page, iters)
+    heavy_iters = 3 if n_nodes <= 100_000 else 1
+    out["GET /api/graph/tasks"] = time_op(tasks_all, heavy_iters)
+    out["GET /api/graph (new version)"] = time_op(graph_cold, heavy_iters)
+    out["GET /api/graph"] = time_op(graph, iters)
+    out["GET /api/graph gzip"] = time_op(graph_gzip, iters)
+    return out
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="comma-separated node counts")
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--skip-app", action="store_true", help="only time graph_model operations")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    # Keep the real memory_graph.json out of reach of save_graph / seed_core_actions.
+    scratch = tempfile.mkdtemp(prefix="nema-bench-")
+    os.environ["NEMA_GRAPH_FILE"] = os.path.join(scratch, "memory_graph.json")
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+        },
+        "results": {},
+    }
+    for n in sizes:
+        print(f"== {n} nodes")
+        results = bench_graph_model(n)
+        if not args.skip_app:
+            results.update(bench_app(n))
+        for name, r in results.items():
+            print(f"   {name:<36} median {r['median_ms']:10.3f} ms   p95 {r['p95_ms']:10.3f} ms")
+        report["results"][str(n)] = results
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import json
+from types import SimpleNamespace
+
+
+def _completion(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class _ChatCompletions:
+    def create(self, **kwargs):
+        messages = kwargs.get("messages") or []
+        system = messages[0]["content"] if messages else ""
+        user = messages[-1]["content"] if messages else ""
+
+        if "router" in system:
+            # Exact-text match without parsing the (large) candidate payload.
+            payload_q = json.loads(user[: user.index(', "candidates"')] + "}")["user_question"]
+            needle = '"question": ' + json.dumps(payload_q, ensure_ascii=False)
+            pos = user.find(needle, len(payload_q))
+            best_id = "NONE"
+            if pos != -1:
+                id_pos = user.rfind('"id": "', 0, pos) + len('"id": "')
+                best_id = user[id_pos: user.index('"', id_pos)]
+            return _completion(json.dumps({"best_id": best_id, "confidence": 0.9}))
+
+        if "Nema" in system:
+            return _completion(json.dumps({"reply": "Happy to help! What occasion is it for, and when do you need it?",
+                                           "action": "NONE"}))
+
+        return _completion(json.dumps({"Clues": [], "qas": []}))
+
+
+class _Speech:
+    def create(self, **kwargs):
+        return b"ID3" + (kwargs.get("input") or "").encode("utf-8")[:256]
+
+
+class _Transcriptions:
+    def create(self, **kwargs):
+        return SimpleNamespace(text="Do you offer delivery on monday? (#0)")
+
+
+class StubOpenAI:
+    """Deterministic, in-process stand-in for the parts of the OpenAI client app.py uses."""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=_ChatCompletions())
+        self.audio = SimpleNamespace(speech=_Speech(), transcriptions=_Transcriptions())
+
+    def with_options(self, **kwargs):
+        return self
@@ -0,0 +1,81 @@
+import random
+import time
+from typing import Optional
+
+from graph_model import Edge, MemoryGraph, Node
+
+TOPICS = [
+    "delivery", "pickup", "pricing", "roses", "orchids", "weddings", "funerals",
+    "subscriptions", "store hours", "refunds", "custom bouquets", "gift cards",
+]
+QUESTION_TEMPLATES = [
+    "Do you offer {t} on {d}?",
+    "How much does {t} cost for {d}?",
+    "Can I get {t} before {d}?",
+    "What are your options for {t} on {d}?",
+    "Is {t} available for {d} orders?",
+]
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+ACTION_LABELS = ["Take order", "Book pickup time", "Update order ledger"]
+QUESTIONS_PER_CLUE = 25
+
+
+def question_text(i: int) -> str:
+    t = TOPICS[i % len(TOPICS)]
+    d = DAYS[(i // len(TOPICS)) % len(DAYS)]
+    tmpl = QUESTION_TEMPLATES[(i // (len(TOPICS) * len(DAYS))) % len(QUESTION_TEMPLATES)]
+    return f"{tmpl.format(t=t, d=d)} (#{i})"
+
+
+def answer_text(i: int) -> str:
+    return f"Yes, we can help with that. Details for request {i}: call us or order online."
+
+
+def make_graph(n_nodes: int, seed: int = 0, intent_id: Optional[str] = "sales-agent") -> MemoryGraph:
+    """
+    Build a clue -> question -> answer -> action graph with about `n_nodes` nodes.
+
+    Nodes and edges are inserted directly with deterministic ids so generation
+    stays O(n) even where the find_or_create_* helpers would be O(n) per call.
+    """
+    rng = random.Random(seed)
+    g = MemoryGraph()
+    now = time.time()
+
+    actions = []
+    for label in ACTION_LABELS:
+        actions.append(
+            g.add_node(Node(id=f"act-{label}", type="action", label=label, text=label, intent_id=intent_id))
+        )
+
+    remaining = max(n_nodes - len(actions), 3)
+    n_clues = max(1, remaining // (2 * QUESTIONS_PER_CLUE + 1))
+    n_questions = max(1, (remaining - n_clues) // 2)
+
+    clues = [
+        g.add_node(
+            Node(id=f"clue-{c}", type="clue", label=f"Clue {c}", text=f"Clue {c}", intent_id=intent_id)
+        )
+        for c in range(n_clues)
+    ]
+
+    for i in range(n_questions):
+        q = g.add_node(
+            Node(id=f"q-{i}", type="question", label=question_text(i)[:60], text=question_text(i),
+                 intent_id=intent_id, metadata={"created_at": now})
+        )
+        a = g.add_node(
+            Node(id=f"a-{i}", type="answer", label=answer_text(i)[:60], text=answer_text(i),
+                 intent_id=intent_id, metadata={"created_at": now})
+        )
+        clue = clues[i % n_clues]
+        meta = {"created_at": now, "intent_id": intent_id, "source": "synthetic"}
+        g.add_edge(Edge(id=f"cq-{i}", source=clue.id, target=q.id, type="describes_context",
+                        metadata=dict(meta)))
+        g.add_edge(Edge(id=f"qa-{i}", source=q.id, target=a.id, type="answers",
+                        confidence=rng.random(), metadata=dict(meta)))
+        if rng.random() < 0.3:
+            act = actions[rng.randrange(len(actions))]
+            g.add_edge(Edge(id=f"an-{i}", source=a.id, target=act.id, type="next_step",
+                            metadata=dict(meta)))
+    return g
@@ -42,7 +42,7 @@ def build_graph_from_session(
                 confidence=0.5,
                 metadata={"created_at": time.time(), "intent_id": intent_id},
             )
-            graph.add_edge(edge)
+            graph.upsert_edge(edge)
 
             # Reset until we see the next user question
             pending_q_node = None
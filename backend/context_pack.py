@@ -0,0 +1,129 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from graph_model import MemoryGraph
+
+CHARS_PER_TOKEN = 4  # rough estimate; good enough for budgeting prompts
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@dataclass
+class ContextPack:
+    graph_version: str
+    etag: str
+    text: str
+    token_estimate: int
+    included_qas: int
+    total_qas: int
+
+    @property
+    def truncated(self) -> bool:
+        return self.included_qas < self.total_qas
+
+
+def _clean(text: str) -> str:
+    return " ".join((text or "").split())
+
+
+def build_context_pack(graph: MemoryGraph, max_tokens: int) -> ContextPack:
+    """
+    Deterministic, compact text rendering of the whole knowledge base:
+
+        ACTIONS: Take order; Book pickup time
+        ## Same-Day Delivery
+        Q: ... A: ... [Take order]
+
+    When over budget, the lowest-confidence Q/As are dropped first; what is
+    kept is still grouped by clue in label order.
+
+    The text, and the ETag hashed from it, depend on content only: the same
+    knowledge base gives the same pack across restarts, workers and writes
+    that don't change it. graph_version is informational.
+    """
+    actions = sorted(
+        {_clean(n.label or n.text) for n in graph.query_nodes(type="action")}
+    )
+    header = "KNOWLEDGE BASE\n"
+    if actions:
+        header += "ACTIONS: " + "; ".join(actions) + "\n"
+
+    # (confidence, clue label, question, rendered line)
+    rows: List[Tuple[float, str, str, str]] = []
+    for q in graph.query_nodes(type="question"):
+        answer_edge = None
+        for e in graph.edges_from(q.id, "answers"):
+            if e.target in graph.nodes and (answer_edge is None or e.confidence > answer_edge.confidence):
+                answer_edge = e
+        if answer_edge is None:
+            continue
+        a = graph.nodes[answer_edge.target]
+        clue_labels = sorted(
+            _clean(graph.nodes[e.source].label)
+            for e in graph.edges_to(q.id, "describes_context")
+            if e.source in graph.nodes
+        )
+        clue = clue_labels[0] if clue_labels else "General"
+        action_labels = sorted(
+            _clean(graph.nodes[e.target].label)
+            for e in graph.edges_from(a.id, "next_step")
+            if e.target in graph.nodes
+        )
+        line = f"Q: {_clean(q.text)} A: {_clean(a.text)}"
+        if action_labels:
+            line += f" [{', '.join(action_labels)}]"
+        rows.append((answer_edge.confidence, clue, _clean(q.text), line))
+
+    budget = max_tokens * CHARS_PER_TOKEN - len(header)
+    kept: Dict[str, List[Tuple[str, str]]] = {}
+    for confidence, clue, question, line in sorted(rows, key=lambda r: (-r[0], r[1], r[2])):
+        cost = len(line) + 1 + (0 if clue in kept else len(clue) + 4)
+        if cost > budget:
+            continue
+        budget -= cost
+        kept.setdefault(clue, []).append((question, line))
+
+    parts = [header]
+    for clue in sorted(kept):
+        parts.append(f"## {clue}\n")
+        for _, line in sorted(kept[clue]):
+            parts.append(line + "\n")
+    text = "".join(parts)
+
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+    return ContextPack(
+        graph_version=f"{graph.uid[:8]}-{graph.version}",
+        etag=f'"{digest}"',
+        text=text,
+        token_estimate=estimate_tokens(text),
+        included_qas=sum(len(v) for v in kept.values()),
+        total_qas=len(rows),
+    )
+
+
+class ContextPackCache:
+    """Built packs keyed by (graph uid, graph version, token budget)."""
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._packs: "OrderedDict[Tuple[str, int, int], ContextPack]" = OrderedDict()
+
+    def get(self, graph: MemoryGraph, max_tokens: int) -> ContextPack:
+        key = (graph.uid, graph.version, max_tokens)
+        with self._lock:
+            pack = self._packs.get(key)
+            if pack is not None:
+                self._packs.move_to_end(key)
+                return pack
+        pack = build_context_pack(graph, max_tokens)
+        with self._lock:
+            self._packs[key] = pack
+            while len(self._packs) > self.max_entries:
+                self._packs.popitem(last=False)
+        return pack
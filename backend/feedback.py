@@ -0,0 +1,84 @@
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from graph_model import MemoryGraph
+
+
+class FeedbackAccumulator:
+    """
+    Applies edge feedback in memory and persists the graph on an interval.
+
+    Events are grouped per edge so each edge's confidence is recomputed once per
+    batch, and disk writes happen at most once per `flush_interval` seconds
+    instead of once per thumbs-up/down.
+    """
+
+    def __init__(
+        self,
+        get_graph: Callable[[], MemoryGraph],
+        save: Callable[[MemoryGraph], None],
+        flush_interval: float = 5.0,
+    ):
+        self.get_graph = get_graph
+        self.save = save
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, events: Iterable[Tuple[str, int]]) -> Tuple[int, List[str]]:
+        """
+        events: (edge_id, +1 | -1) pairs.
+        Returns (number of events applied, edge ids that were not found).
+        """
+        counts: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        for edge_id, value in events:
+            counts[edge_id][0 if value > 0 else 1] += 1
+
+        graph = self.get_graph()
+        applied = 0
+        unknown: List[str] = []
+        with self._lock:
+            for edge_id, (pos, neg) in counts.items():
+                if edge_id not in graph.edges:
+                    unknown.append(edge_id)
+                    continue
+                graph.apply_edge_feedback_counts(edge_id, pos=pos, neg=neg)
+                applied += pos + neg
+            if applied:
+                self._dirty = True
+        return applied, unknown
+
+    def flush(self) -> bool:
+        """Persist the graph if feedback arrived since the last flush."""
+        with self._lock:
+            if not self._dirty:
+                return False
+            self._dirty = False
+            try:
+                self.save(self.get_graph())
+            except Exception as e:
+                self._dirty = True
+                print("Feedback flush error:", repr(e))
+                return False
+        return True
+
+    # ----- background flusher -----
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="nema-bg-feedback-flush", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
@@ -0,0 +1,87 @@
+import hashlib
+import os
+import threading
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from metrics import STAGE_SECONDS
+
+
+class FillerClips:
+    """
+    Short "let me check" clips, synthesized once per (model, voice, text)
+    and kept as mp3 files under `directory`, so playing one never costs an
+    upstream call. A missing clip is generated in the background on first
+    request (that caller goes without one).
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        model: str,
+        text: str,
+        synthesize: Callable[[str, str], bytes],
+    ):
+        self.directory = directory
+        self.model = model
+        self.text = text
+        self.synthesize = synthesize  # (text, voice) -> mp3 bytes
+        self._lock = threading.Lock()
+        self._clips: Dict[str, bytes] = {}
+        self._generating: Set[str] = set()
+
+    def path(self, voice: str) -> str:
+        digest = hashlib.sha256(f"{self.model}\x00{voice}\x00{self.text}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, f"{voice}-{digest}.mp3")
+
+    def get(self, voice: str) -> Optional[bytes]:
+        """The clip for `voice`, or None (generation started) if it isn't on disk yet."""
+        with self._lock:
+            clip = self._clips.get(voice)
+        if clip is not None:
+            return clip
+        try:
+            with open(self.path(voice), "rb") as f:
+                clip = f.read()
+        except FileNotFoundError:
+            self.prepare(voice)
+            return None
+        with self._lock:
+            self._clips[voice] = clip
+        return clip
+
+    def prepare(self, voice: str) -> None:
+        """Generate the clip for `voice` in the background unless it exists or is in progress."""
+        with self._lock:
+            if voice in self._clips or voice in self._generating:
+                return
+            self._generating.add(voice)
+        threading.Thread(target=self._generate, args=(voice,), name="nema-bg-filler", daemon=True).start()
+
+    def _generate(self, voice: str) -> None:
+        try:
+            path = self.path(voice)
+            if not os.path.exists(path):
+                clip = self.synthesize(self.text, voice)
+                os.makedirs(self.directory, exist_ok=True)
+                tmp = f"{path}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(clip)
+                os.replace(tmp, path)
+            with open(path, "rb") as f:
+                clip = f.read()
+            with self._lock:
+                self._clips[voice] = clip
+        except Exception as e:
+            print("Filler clip generation error:", repr(e))
+        finally:
+            with self._lock:
+                self._generating.discard(voice)
+
+
+def projected_seconds(stages: Tuple[str, ...], defaults: Dict[str, float], q: float = 0.5) -> float:
+    """Sum of each stage's observed q-quantile (nema_stage_seconds), or its default before any samples."""
+    total = 0.0
+    for name in stages:
+        observed = STAGE_SECONDS.quantile(q, stage=name)
+        total += observed if observed is not None else defaults.get(name, 0.0)
+    return total
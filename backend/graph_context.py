@@ -0,0 +1,180 @@
+import heapq
+import math
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from graph_model import MemoryGraph
+from text_norm import tokenize
+
+
+def question_text(node) -> str:
+    """Question text plus its aliases (paraphrases folded into the node)."""
+    return " ".join([node.text or ""] + list(node.metadata.get("aliases") or ()))
+
+
+@dataclass
+class QAEntry:
+    question_id: str
+    question: str
+    answer: Optional[str]
+    confidence: float
+    action_ids: List[str] = field(default_factory=list)
+
+
+class GraphContextIndex:
+    """
+    Retrieval structures for get-graph-context:
+
+      - an inverted token index over question text for top-k lexical matches
+      - per-clue neighborhoods (sibling Q/As and their actions), computed on
+        first use and invalidated only for clues touched by a graph change
+    """
+
+    def __init__(self, neighborhood_size: int = 12):
+        self.neighborhood_size = neighborhood_size
+        self._lock = threading.RLock()
+        self._graph: Optional[MemoryGraph] = None
+        self._version = 0
+        self._postings: Dict[str, Set[str]] = {}
+        self._q_tokens: Dict[str, Set[str]] = {}
+        self._neighborhoods: Dict[str, List[QAEntry]] = {}
+
+    # ----- queries -----
+
+    def top_questions(self, graph: MemoryGraph, text: str, k: int) -> List[Tuple[float, str]]:
+        """(score, question id) for the k best token-overlap matches, best first."""
+        with self._lock:
+            self.sync(graph)
+            query = tokenize(text)
+            if not query:
+                return []
+            n = max(1, len(self._q_tokens))
+            scores: Dict[str, float] = {}
+            for tok in query:
+                posting = self._postings.get(tok)
+                if not posting:
+                    continue
+                idf = math.log(1.0 + n / len(posting))
+                for qid in posting:
+                    scores[qid] = scores.get(qid, 0.0) + idf
+            return heapq.nlargest(
+                k,
+                (
+                    (s / math.sqrt(len(query) * len(self._q_tokens[qid])), qid)
+                    for qid, s in scores.items()
+                ),
+            )
+
+    def neighborhood(self, graph: MemoryGraph, clue_id: str) -> List[QAEntry]:
+        """Q/As under a clue, highest answer confidence first (bounded)."""
+        with self._lock:
+            self.sync(graph)
+            cached = self._neighborhoods.get(clue_id)
+            if cached is None:
+                cached = self._build_neighborhood(graph, clue_id)
+                self._neighborhoods[clue_id] = cached
+            return cached
+
+    def entry(self, graph: MemoryGraph, question_id: str) -> Optional[QAEntry]:
+        q = graph.nodes.get(question_id)
+        if q is None or q.type != "question":
+            return None
+        answer_text = None
+        confidence = 0.0
+        action_ids: List[str] = []
+        for e in graph.edges_from(question_id, "answers"):
+            a = graph.nodes.get(e.target)
+            if a is None:
+                continue
+            answer_text = a.text
+            confidence = e.confidence
+            action_ids = [
+                ns.target for ns in graph.edges_from(a.id, "next_step") if ns.target in graph.nodes
+            ]
+            break
+        return QAEntry(question_id, q.text, answer_text, confidence, action_ids)
+
+    @staticmethod
+    def clues_of(graph: MemoryGraph, question_id: str) -> List[str]:
+        return [e.source for e in graph.edges_to(question_id, "describes_context")]
+
+    # ----- maintenance -----
+
+    def sync(self, graph: MemoryGraph) -> None:
+        changes = graph.changes_since(self._version) if graph is self._graph else None
+        if changes is None:
+            self._rebuild(graph)
+            return
+        node_ids, edge_ids = changes
+        if not node_ids and not edge_ids:
+            return
+
+        dirty_clues: Set[str] = set()
+        for node_id in node_ids:
+            node = graph.nodes.get(node_id)
+            if node is None:
+                self._index_question(node_id, "")
+                self._neighborhoods.clear()
+            elif node.type == "action":
+                self._neighborhoods.clear()
+            elif node.type == "question":
+                self._index_question(node_id, question_text(node))
+                dirty_clues.update(self.clues_of(graph, node_id))
+            elif node.type == "answer":
+                dirty_clues.update(self._clues_of_answer(graph, node_id))
+            elif node.type == "clue":
+                dirty_clues.add(node_id)
+        for edge_id in edge_ids:
+            edge = graph.edges.get(edge_id)
+            if edge is None:
+                # Removed edge: endpoints unknown, drop every neighborhood.
+                self._neighborhoods.clear()
+            elif edge.type == "describes_context":
+                dirty_clues.add(edge.source)
+            elif edge.type == "answers":
+                dirty_clues.update(self.clues_of(graph, edge.source))
+            elif edge.type == "next_step":
+                dirty_clues.update(self._clues_of_answer(graph, edge.source))
+        for clue_id in dirty_clues:
+            self._neighborhoods.pop(clue_id, None)
+        self._version = graph.version
+
+    def _rebuild(self, graph: MemoryGraph) -> None:
+        self._postings = {}
+        self._q_tokens = {}
+        self._neighborhoods = {}
+        for node in graph.nodes.values():
+            if node.type == "question":
+                self._index_question(node.id, question_text(node))
+        self._graph = graph
+        self._version = graph.version
+
+    def _index_question(self, question_id: str, text: str) -> None:
+        for tok in self._q_tokens.pop(question_id, ()):
+            posting = self._postings.get(tok)
+            if posting is not None:
+                posting.discard(question_id)
+                if not posting:
+                    del self._postings[tok]
+        tokens = tokenize(text)
+        if not tokens:
+            return
+        self._q_tokens[question_id] = tokens
+        for tok in tokens:
+            self._postings.setdefault(tok, set()).add(question_id)
+
+    def _clues_of_answer(self, graph: MemoryGraph, answer_id: str) -> Set[str]:
+        out: Set[str] = set()
+        for e in graph.edges_to(answer_id, "answers"):
+            out.update(self.clues_of(graph, e.source))
+        return out
+
+    def _build_neighborhood(self, graph: MemoryGraph, clue_id: str) -> List[QAEntry]:
+        entries = []
+        for e in graph.edges_from(clue_id, "describes_context"):
+            entry = self.entry(graph, e.target)
+            if entry is not None and entry.answer:
+                entries.append(entry)
+        entries.sort(key=lambda x: (-x.confidence, x.question))
+        return entries[: self.neighborhood_size]
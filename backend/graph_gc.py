@@ -0,0 +1,326 @@
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from graph_model import Edge, MemoryGraph, Node
+from metrics import Counter, Histogram
+
+GC_REMOVED = Counter(
+    "nema_graph_gc_removed_total",
+    "Nodes and edges removed by graph compaction, by reason.",
+    ["kind", "reason"],
+)
+GC_SECONDS = Histogram(
+    "nema_graph_gc_seconds",
+    "Duration of one graph compaction pass (mark + sweep + save).",
+)
+
+# Nodes that anchor reachability: the graph is walked forward along edges
+# (clue -> question -> answer -> action) from these.
+ROOT_TYPES = ("intent", "clue", "action")
+
+
+@dataclass
+class GCReport:
+    dangling_edges: int = 0
+    duplicate_edges: int = 0
+    superseded_edges: int = 0
+    duplicate_nodes: int = 0
+    unreachable_nodes: int = 0
+    skipped: int = 0                      # candidates that changed during the sweep
+    nodes_before: int = 0
+    edges_before: int = 0
+    nodes_after: int = 0
+    edges_after: int = 0
+    memory_bytes_reclaimed: int = 0       # approximate, from the removed objects
+    disk_bytes_before: Optional[int] = None
+    disk_bytes_after: Optional[int] = None
+    seconds: float = 0.0
+    dry_run: bool = False
+    removed_node_ids: List[str] = field(default_factory=list, repr=False)
+
+    def to_dict(self) -> Dict:
+        d = {k: v for k, v in self.__dict__.items() if k != "removed_node_ids"}
+        if self.disk_bytes_before is not None and self.disk_bytes_after is not None:
+            d["disk_bytes_reclaimed"] = self.disk_bytes_before - self.disk_bytes_after
+        return d
+
+
+def approx_size(obj, _seen: Optional[Set[int]] = None) -> int:
+    """Rough deep size of a Node/Edge and the containers/strings it holds."""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approx_size(k, seen) + approx_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(approx_size(v, seen) for v in obj)
+    elif hasattr(obj, "__dict__"):
+        size += approx_size(vars(obj), seen)
+    return size
+
+
+def _is_auto_repair(edge: Edge) -> bool:
+    return edge.type == "describes_context" and (edge.metadata or {}).get("source") == "auto_repair"
+
+
+class GraphCompactor:
+    """
+    Finds and removes garbage from a MemoryGraph:
+
+      - dangling edges (an endpoint no longer exists)
+      - parallel duplicate edges (compact_duplicate_edges)
+      - superseded duplicate nodes: several nodes answering to the same
+        find_node key are folded into the oldest
+      - auto-repair "General" clue links to questions that have since got
+        a real clue
+      - unreachable nodes: anything not reachable from an intent, clue or
+        action node, or from a question that has an answer
+
+    Marking reads the graph without changing it; the sweep then removes in
+    batches of `batch_size`, re-checking each candidate first and yielding
+    the GIL between batches, so request threads reading the graph are never
+    held up for the whole pass. That is not isolation from other writers:
+    run passes when nothing is ingesting, importing or building.
+    """
+
+    def __init__(
+        self,
+        get_graph: Callable[[], MemoryGraph],
+        save: Optional[Callable[[MemoryGraph], None]] = None,
+        graph_path: Optional[Callable[[], str]] = None,
+        batch_size: int = 500,
+    ):
+        self.get_graph = get_graph
+        self.save = save
+        self.graph_path = graph_path
+        self.batch_size = batch_size
+        self.last_report: Optional[GCReport] = None
+        # One pass at a time; a scheduled run that finds one in flight skips.
+        self._running = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run(self, dry_run: bool = False) -> Optional[GCReport]:
+        """One compaction pass; None if another pass is already running."""
+        if not self._running.acquire(blocking=False):
+            return None
+        try:
+            t0 = time.perf_counter()
+            report = self._run(self.get_graph(), dry_run)
+            report.seconds = round(time.perf_counter() - t0, 3)
+            GC_SECONDS.observe(report.seconds)
+            self.last_report = report
+            return report
+        finally:
+            self._running.release()
+
+    # ----- passes -----
+
+    def _run(self, graph: MemoryGraph, dry_run: bool) -> GCReport:
+        report = GCReport(
+            nodes_before=len(graph.nodes),
+            edges_before=len(graph.edges),
+            dry_run=dry_run,
+            disk_bytes_before=self._disk_size(),
+        )
+        version = graph.version
+
+        dangling = [e.id for e in list(graph.edges.values()) if e.source not in graph.nodes or e.target not in graph.nodes]
+        superseded = self._superseded_edges(graph)
+        duplicates = self._duplicate_nodes(graph)
+        folded = {dup for dups in duplicates.values() for dup in dups}
+        unreachable = self._unreachable(graph, ignore_edges=set(dangling) | set(superseded)) - folded - set(duplicates)
+
+        if dry_run:
+            report.dangling_edges = len(dangling)
+            report.duplicate_edges = sum(
+                1 for e in list(graph.edges.values()) if graph._edge_keys.get((e.source, e.target, e.type)) != e.id
+            )
+            report.superseded_edges = len(superseded)
+            report.duplicate_nodes = len(folded)
+            report.unreachable_nodes = len(unreachable)
+            report.nodes_after, report.edges_after = report.nodes_before, report.edges_before
+            report.disk_bytes_after = report.disk_bytes_before
+            return report
+
+        for edge_id in self._batches(dangling):
+            edge = graph.edges.get(edge_id)
+            if edge is None or (edge.source in graph.nodes and edge.target in graph.nodes):
+                report.skipped += 1
+                continue
+            self._forget_edge(graph, edge_id, "dangling", report)
+            report.dangling_edges += 1
+
+        # Parallel edges are merged into the kept one, not lost.
+        report.duplicate_edges = graph.compact_duplicate_edges()
+        GC_REMOVED.inc(report.duplicate_edges, kind="edge", reason="duplicate")
+
+        for edge_id in self._batches(superseded):
+            edge = graph.edges.get(edge_id)
+            if edge is None or not self._has_real_clue(graph, edge.target):
+                report.skipped += 1
+                continue
+            self._forget_edge(graph, edge_id, "superseded", report)
+            report.superseded_edges += 1
+
+        for keep_id, dup_ids in duplicates.items():
+            for dup_id in dup_ids:
+                if keep_id not in graph.nodes or dup_id not in graph.nodes:
+                    report.skipped += 1
+                    continue
+                report.memory_bytes_reclaimed += approx_size(graph.nodes[dup_id])
+                graph.merge_node(keep_id, dup_id)
+                report.duplicate_nodes += 1
+                report.removed_node_ids.append(dup_id)
+                GC_REMOVED.inc(kind="node", reason="duplicate")
+            self._yield()
+
+        for node_id in self._batches(sorted(unreachable)):
+            node = graph.nodes.get(node_id)
+            # Something reachable may have linked to it since marking.
+            if node is None or not self._still_unreachable(graph, node, unreachable):
+                report.skipped += 1
+                continue
+            for edge in graph.edges_from(node_id) + graph.edges_to(node_id):
+                report.memory_bytes_reclaimed += approx_size(edge)
+            report.memory_bytes_reclaimed += approx_size(node)
+            graph.remove_node(node_id)
+            report.unreachable_nodes += 1
+            report.removed_node_ids.append(node_id)
+            GC_REMOVED.inc(kind="node", reason="unreachable")
+
+        report.nodes_after = len(graph.nodes)
+        report.edges_after = len(graph.edges)
+        if graph.version != version and self.save is not None:
+            self.save(graph)
+            report.disk_bytes_after = self._disk_size()
+        else:
+            report.disk_bytes_after = report.disk_bytes_before
+        return report
+
+    def _superseded_edges(self, graph: MemoryGraph) -> List[str]:
+        return [
+            e.id
+            for e in graph.query_edges(type="describes_context", source="auto_repair")
+            if _is_auto_repair(e) and e.target in graph.nodes and self._has_real_clue(graph, e.target)
+        ]
+
+    @staticmethod
+    def _has_real_clue(graph: MemoryGraph, question_id: str) -> bool:
+        return any(not _is_auto_repair(e) for e in graph.edges_to(question_id, "describes_context"))
+
+    @staticmethod
+    def _duplicate_nodes(graph: MemoryGraph) -> Dict[str, List[str]]:
+        """Oldest node id -> later nodes sharing a find_node key with it."""
+        parent: Dict[str, str] = {}
+
+        def find(x: str) -> str:
+            while parent.get(x, x) != x:
+                x = parent[x]
+            return x
+
+        for ids in list(graph._node_keys.values()):
+            live = [i for i in ids if i in graph.nodes]
+            for other in live[1:]:
+                a, b = find(live[0]), find(other)
+                if a != b:
+                    parent[b] = a
+        groups: Dict[str, List[str]] = {}
+        for x in parent:
+            groups.setdefault(find(x), [])
+        for x in parent:
+            root = find(x)
+            if x != root:
+                groups[root].append(x)
+        return {root: dups for root, dups in groups.items() if dups}
+
+    @staticmethod
+    def _unreachable(graph: MemoryGraph, ignore_edges: Set[str]) -> Set[str]:
+        nodes = list(graph.nodes.values())
+        stack = [
+            n.id
+            for n in nodes
+            if n.type in ROOT_TYPES or (n.type == "question" and graph.edges_from(n.id, "answers"))
+        ]
+        seen: Set[str] = set(stack)
+        while stack:
+            node_id = stack.pop()
+            for edge_id in list(graph._out_edges.get(node_id, ())):
+                edge = graph.edges.get(edge_id)
+                if edge is None or edge_id in ignore_edges or edge.target not in graph.nodes:
+                    continue
+                if edge.target not in seen:
+                    seen.add(edge.target)
+                    stack.append(edge.target)
+        # An empty clue anchors nothing.
+        empty_clues = {
+            n.id for n in nodes
+            if n.type == "clue" and not any(e not in ignore_edges for e in graph._out_edges.get(n.id, ()))
+        }
+        return {n.id for n in nodes if n.id not in seen} | empty_clues
+
+    @staticmethod
+    def _still_unreachable(graph: MemoryGraph, node: Node, garbage: Set[str]) -> bool:
+        if node.type in ("intent", "action"):
+            return False
+        if node.type == "clue":
+            return not graph.edges_from(node.id)
+        if node.type == "question" and graph.edges_from(node.id, "answers"):
+            return False
+        return all(e.source in garbage for e in graph.edges_to(node.id) if e.source != node.id)
+
+    # ----- helpers -----
+
+    def _batches(self, items: List[str]) -> Iterable[str]:
+        for i, item in enumerate(items):
+            if i and i % self.batch_size == 0:
+                self._yield()
+            yield item
+
+    @staticmethod
+    def _yield() -> None:
+        time.sleep(0)  # let request threads in between batches
+
+    @staticmethod
+    def _forget_edge(graph: MemoryGraph, edge_id: str, reason: str, report: GCReport) -> None:
+        edge = graph.remove_edge(edge_id)
+        if edge is not None:
+            report.memory_bytes_reclaimed += approx_size(edge)
+            GC_REMOVED.inc(kind="edge", reason=reason)
+
+    def _disk_size(self) -> Optional[int]:
+        if self.graph_path is None:
+            return None
+        try:
+            return os.path.getsize(self.graph_path())
+        except OSError:
+            return None
+
+    # ----- schedule -----
+
+    def start(self, interval: float) -> None:
+        if self._thread is not None or interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._schedule, args=(interval,), name="nema-bg-graph-gc", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _schedule(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                report = self.run()
+                if report is not None and report.removed_node_ids:
+                    print(f"🧹 Graph GC: {report.to_dict()}")
+            except Exception as e:
+                print("Graph GC error:", repr(e))
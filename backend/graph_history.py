@@ -0,0 +1,218 @@
+import gc
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from graph_model import Edge, MemoryGraph, Node
+from pmap import MISSING, PMap
+
+
+@dataclass(frozen=True)
+class GraphVersion:
+    version: int
+    created_at: float
+    reason: str
+    graph_uid: str
+    graph_version: int      # MemoryGraph.version when committed
+    nodes: PMap             # node id -> frozen Node
+    edges: PMap             # edge id -> frozen Edge
+    changed: int            # nodes + edges that differ from the previous version
+
+    def meta(self) -> Dict:
+        return {
+            "version": self.version,
+            "created_at": self.created_at,
+            "reason": self.reason,
+            "graph_version": self.graph_version,
+            "nodes": len(self.nodes),
+            "edges": len(self.edges),
+            "changed": self.changed,
+        }
+
+
+def _copy_data(value):
+    if isinstance(value, dict):
+        return {k: _copy_data(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_data(v) for v in value]
+    return value
+
+
+def freeze(item):
+    """Copy of a Node/Edge that later in-place mutations of the live one can't reach."""
+    if isinstance(item, Node):
+        return Node(
+            item.id, item.type, item.label, item.text, item.intent_id,
+            _copy_data(item.metadata), dict(item.stats),
+        )
+    return Edge(
+        item.id, item.source, item.target, item.type, item.weight, item.confidence,
+        _copy_data(item.metadata),
+    )
+
+
+class GraphHistory:
+    """
+    Versioned history of a MemoryGraph on persistent maps. A commit folds
+    the graph's changelog since the previous commit into new node/edge
+    maps (one O(log n) path copy per changed item; everything else is
+    shared with the previous version), so memory grows with the number of
+    changes, not with graph size x versions.
+
+    Items are stored frozen: the live graph mutates nodes/edges in place,
+    so each changed one is copied at commit time. Replacing the graph
+    object (ingest, reset) is detected by uid and diffed in full.
+    """
+
+    def __init__(self, max_versions: int = 1000):
+        self.max_versions = max_versions
+        self._lock = threading.Lock()
+        self._versions: List[GraphVersion] = []
+        self._next = 1
+        self._uid: Optional[str] = None
+        self._graph_version = 0
+
+    def commit(self, graph: MemoryGraph, reason: str = "save") -> Optional[GraphVersion]:
+        """Record the graph's current state; None if nothing changed since the last commit."""
+        with self._lock:
+            latest = self._versions[-1] if self._versions else None
+            nodes = latest.nodes if latest else PMap()
+            edges = latest.edges if latest else PMap()
+            changes = graph.changes_since(self._graph_version) if graph.uid == self._uid else None
+            if changes is None:
+                # A full rebuild allocates ~1M small containers; with the
+                # cyclic GC running it rescans the heap over and over (3x slower).
+                gc_was_enabled = gc.isenabled()
+                gc.disable()
+                try:
+                    nodes, n_changed = _rebuild(nodes, graph.nodes)
+                    edges, e_changed = _rebuild(edges, graph.edges)
+                finally:
+                    if gc_was_enabled:
+                        gc.enable()
+            else:
+                nodes, n_changed = _fold(nodes, graph.nodes, changes[0])
+                edges, e_changed = _fold(edges, graph.edges, changes[1])
+            self._uid, self._graph_version = graph.uid, graph.version
+            if latest is not None and not (n_changed or e_changed):
+                return None
+            version = GraphVersion(
+                version=self._next,
+                created_at=time.time(),
+                reason=reason,
+                graph_uid=graph.uid,
+                graph_version=graph.version,
+                nodes=nodes,
+                edges=edges,
+                changed=n_changed + e_changed,
+            )
+            self._next += 1
+            self._versions.append(version)
+            if len(self._versions) > self.max_versions:
+                del self._versions[: len(self._versions) - self.max_versions]
+            return version
+
+    def versions(self) -> List[GraphVersion]:
+        with self._lock:
+            return list(self._versions)
+
+    def get(self, version: int) -> Optional[GraphVersion]:
+        with self._lock:
+            if not self._versions:
+                return None
+            i = version - self._versions[0].version
+            return self._versions[i] if 0 <= i < len(self._versions) else None
+
+    def latest(self) -> Optional[GraphVersion]:
+        with self._lock:
+            return self._versions[-1] if self._versions else None
+
+    def rollback(self, graph: MemoryGraph, version: int) -> Optional[Tuple[GraphVersion, Dict[str, int]]]:
+        """
+        Make `graph` match `version` by applying only the items that differ,
+        and commit the result as a new version. None if `version` is unknown.
+        """
+        target = self.get(version)
+        if target is None:
+            return None
+        self.commit(graph, reason="before rollback")
+        current = self.latest()
+        node_diff = current.nodes.diff(target.nodes)
+        edge_diff = current.edges.diff(target.edges)
+        counts = {"nodes_restored": 0, "nodes_removed": 0, "edges_restored": 0, "edges_removed": 0}
+
+        # Nodes first so restored edges have endpoints; stale edges go
+        # before restored ones so (source, target, type) keys stay unique.
+        for _, _, node in node_diff:
+            if node is not MISSING:
+                graph.put_node(freeze(node))
+                counts["nodes_restored"] += 1
+        for edge_id, _, edge in edge_diff:
+            if edge is MISSING:
+                graph.remove_edge(edge_id)
+                counts["edges_removed"] += 1
+        for _, _, edge in edge_diff:
+            if edge is not MISSING:
+                graph.put_edge(freeze(edge))
+                counts["edges_restored"] += 1
+        for node_id, _, node in node_diff:
+            if node is MISSING:
+                graph.remove_node(node_id)
+                counts["nodes_removed"] += 1
+        committed = self.commit(graph, reason=f"rollback to {version}")
+        return committed or self.latest(), counts
+
+
+def _fold(current: PMap, live: Dict, ids) -> Tuple[PMap, int]:
+    changed = 0
+    for item_id in ids:
+        item = live.get(item_id)
+        old = current.get(item_id, MISSING)
+        if item is None:
+            if old is not MISSING:
+                current = current.delete(item_id)
+                changed += 1
+            continue
+        # Touched-but-equal items keep their old frozen copy (and subtree).
+        if old is not MISSING and old == item:
+            continue
+        current = current.set(item_id, freeze(item))
+        changed += 1
+    return current, changed
+
+
+def _rebuild(current: PMap, live: Dict) -> Tuple[PMap, int]:
+    """Full resync (new graph object, or changelog trimmed): one O(n) build."""
+    items = []
+    for item_id, item in list(live.items()):
+        old = current.get(item_id, MISSING)
+        items.append((item_id, old if old is not MISSING and old == item else freeze(item)))
+    rebuilt = PMap.from_items(items)
+    return rebuilt, len(current.diff(rebuilt)) if len(current) else len(rebuilt)
+
+
+def diff_versions(older: GraphVersion, newer: GraphVersion) -> Dict:
+    """What changed from `older` to `newer`: added / removed / changed nodes and edges."""
+
+    def section(pairs) -> Dict:
+        out = {"added": [], "removed": [], "changed": []}
+        for item_id, before, after in pairs:
+            if before is MISSING:
+                out["added"].append(after)
+            elif after is MISSING:
+                out["removed"].append(before)
+            elif before != after:
+                out["changed"].append({"id": item_id, "before": before, "after": after})
+        return out
+
+    return {
+        "from": older.version,
+        "to": newer.version,
+        "nodes": section(older.nodes.diff(newer.nodes)),
+        "edges": section(older.edges.diff(newer.edges)),
+    }
+
+
+def snapshot_items(version: GraphVersion) -> Tuple[List[Node], List[Edge]]:
+    return list(version.nodes.values()), list(version.edges.values())
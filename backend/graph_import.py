@@ -0,0 +1,269 @@
+import copy
+import csv
+import io
+import json
+import time
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict, List, Optional, Set, Tuple
+from uuid import uuid4
+
+from graph_model import Edge, MemoryGraph, Node
+
+IMPORT_FORMATS = ("ndjson", "csv")
+MAX_REPORTED_ERRORS = 20
+
+# Accepted column / key names per field, first match wins.
+FIELD_ALIASES = {
+    "clue": ("clue", "clue_label", "topic", "category", "section"),
+    "question": ("question", "q"),
+    "answer": ("answer", "a"),
+    "action": ("action", "action_label"),
+    "action_description": ("action_description",),
+}
+
+
+class ImportRowsError(ValueError):
+    """The upload had invalid rows; nothing was applied."""
+
+    def __init__(self, message: str, errors: List[Dict]):
+        super().__init__(message)
+        self.errors = errors
+
+
+@dataclass
+class ImportRow:
+    line: int
+    question: str
+    answer: str
+    clue: str = ""
+    action: str = ""
+    action_description: str = ""
+
+
+def format_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    ct = (content_type or "").split(";")[0].strip().lower()
+    if ct in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines"):
+        return "ndjson"
+    if ct in ("text/csv", "application/csv"):
+        return "csv"
+    return None
+
+
+def _clean(value) -> str:
+    return " ".join(str(value).split()) if value is not None else ""
+
+
+def to_row(line: int, raw: Dict) -> ImportRow:
+    """Map one NDJSON object / CSV record onto an ImportRow (ValueError if unusable)."""
+    lowered = {str(k).strip().lower(): v for k, v in raw.items() if k is not None}
+    values = {}
+    for name, aliases in FIELD_ALIASES.items():
+        values[name] = next((_clean(lowered[a]) for a in aliases if lowered.get(a)), "")
+    if not values["question"] or not values["answer"]:
+        raise ValueError("question and answer are required")
+    return ImportRow(line=line, **values)
+
+
+def read_rows(stream: BinaryIO, fmt: str) -> List[ImportRow]:
+    """
+    Parse an upload row by row. All problems are collected (up to
+    MAX_REPORTED_ERRORS) and raised together so a bad file changes nothing.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unknown import format {fmt!r}")
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="" if fmt == "csv" else None)
+    rows: List[ImportRow] = []
+    errors: List[Dict] = []
+    n_errors = 0
+
+    def fail(line: int, e: Exception) -> None:
+        nonlocal n_errors
+        n_errors += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line, "error": str(e)})
+
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            if not reader.fieldnames:
+                raise ImportRowsError("Empty CSV upload", [])
+            for record in reader:
+                try:
+                    rows.append(to_row(reader.line_num, record))
+                except ValueError as e:
+                    fail(reader.line_num, e)
+        else:
+            for line_no, line in enumerate(text, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    if not isinstance(record, dict):
+                        raise ValueError("each line must be a JSON object")
+                    rows.append(to_row(line_no, record))
+                except ValueError as e:
+                    fail(line_no, e)
+    except UnicodeDecodeError as e:
+        raise ImportRowsError("Upload is not valid UTF-8", [{"line": None, "error": str(e)}])
+    finally:
+        text.detach()
+
+    if n_errors:
+        raise ImportRowsError(f"{n_errors} invalid rows; nothing imported", errors)
+    return rows
+
+
+class GraphImport:
+    """
+    Upserts rows into the graph in batches as one transaction: every node
+    and edge it creates, and the prior state of every edge it merges into,
+    is recorded, and all of it is undone if anything fails part way.
+
+    Row shape mirrors website ingest:
+      clue --describes_context--> question --answers--> answer --next_step--> action
+    """
+
+    def __init__(
+        self,
+        graph: MemoryGraph,
+        intent_id: Optional[str],
+        derive_clue: Callable[[str], str],
+        batch_size: int = 1000,
+        source: str = "import",
+    ):
+        self.graph = graph
+        self.intent_id = intent_id
+        self.derive_clue = derive_clue
+        self.batch_size = batch_size
+        self.import_id = uuid4().hex
+        self.source = source
+        self.counts = {
+            "rows": 0,
+            "batches": 0,
+            "clues_created": 0,
+            "questions_created": 0,
+            "answers_created": 0,
+            "actions_created": 0,
+            "aliases_added": 0,
+            "similar_answers": 0,
+            "edges_created": 0,
+            "edges_merged": 0,
+        }
+        self._created_nodes: List[str] = []
+        self._created_edges: List[str] = []
+        self._created_edge_ids: Set[str] = set()
+        self._edge_snapshots: Dict[str, Edge] = {}
+        self._aliases: List[Tuple[str, str]] = []
+
+    def apply(self, rows: List[ImportRow]) -> Dict:
+        t0 = time.perf_counter()
+        try:
+            for start in range(0, len(rows), self.batch_size):
+                self._apply_batch(rows[start:start + self.batch_size])
+                self.counts["batches"] += 1
+        except BaseException:
+            self.rollback()
+            raise
+        seconds = time.perf_counter() - t0
+        return dict(
+            self.counts,
+            import_id=self.import_id,
+            seconds=round(seconds, 3),
+            rows_per_second=round(len(rows) / seconds, 1) if seconds > 0 else None,
+        )
+
+    def rollback(self) -> None:
+        for edge_id in reversed(self._created_edges):
+            self.graph.remove_edge(edge_id)
+        for snapshot in self._edge_snapshots.values():
+            if snapshot.id in self.graph.edges:
+                self.graph.restore_edge(snapshot)
+        for node_id in reversed(self._created_nodes):
+            self.graph.remove_node(node_id)
+        for node_id, text in reversed(self._aliases):
+            self.graph.remove_alias(node_id, text)
+
+    # ----- internals -----
+
+    def _apply_batch(self, batch: List[ImportRow]) -> None:
+        # Resolve each distinct node once per batch, then link.
+        nodes: Dict[Tuple[str, str], Node] = {}
+
+        def node(type: str, text: str, description: str = "") -> Node:
+            key = (type, text.lower())
+            found = nodes.get(key)
+            if found is None:
+                found = self._node(type, text, description)
+                nodes[key] = found
+            return found
+
+        for row in batch:
+            clue_label = row.clue or self.derive_clue(row.question)
+            clue = node("clue", clue_label)
+            question = node("question", row.question)
+            answer = node("answer", row.answer)
+            self._edge(clue.id, question.id, "describes_context", confidence=0.6 if row.clue else 0.3)
+            self._edge(question.id, answer.id, "answers", confidence=0.5)
+            if row.action:
+                action = node("action", row.action, row.action_description)
+                self._edge(answer.id, action.id, "next_step", confidence=0.5)
+            self.counts["rows"] += 1
+
+    def _node(self, type: str, text: str, description: str) -> Node:
+        existing = self.graph.find_node(type, text)
+        if existing is not None:
+            return existing
+        if type == "answer" and self.graph.find_similar("answer", text) is not None:
+            # Reported, not folded: near-identical answers can still disagree.
+            self.counts["similar_answers"] += 1
+        n_before = len(self.graph.nodes)
+        if type == "question":
+            created = self.graph.find_or_create_question(text, self.intent_id)
+        elif type == "answer":
+            created = self.graph.find_or_create_answer(text, self.intent_id)
+        elif type == "clue":
+            created = self.graph.find_or_create_clue(text, self.intent_id)
+        else:
+            created = self.graph.find_or_create_action(text, description, self.intent_id)
+        if len(self.graph.nodes) == n_before:
+            # Folded into a near-duplicate question as an alias.
+            self._aliases.append((created.id, text))
+            self.counts["aliases_added"] += 1
+            return created
+        created = self.graph.update_node_metadata(created.id, source=self.source, import_id=self.import_id)
+        self._created_nodes.append(created.id)
+        self.counts[f"{type}s_created"] += 1
+        return created
+
+    def _edge(self, source: str, target: str, type: str, confidence: float) -> Edge:
+        existing = self.graph.get_edge(source, target, type)
+        if (
+            existing is not None
+            and existing.id not in self._created_edge_ids
+            and existing.id not in self._edge_snapshots
+        ):
+            self._edge_snapshots[existing.id] = copy.deepcopy(existing)
+        edge = self.graph.upsert_edge(
+            Edge(
+                id=str(uuid4()),
+                source=source,
+                target=target,
+                type=type,
+                weight=0.5,
+                confidence=confidence,
+                metadata={
+                    "created_at": time.time(),
+                    "intent_id": self.intent_id,
+                    "source": self.source,
+                    "import_id": self.import_id,
+                },
+            )
+        )
+        if existing is None:
+            self._created_edges.append(edge.id)
+            self._created_edge_ids.add(edge.id)
+            self.counts["edges_created"] += 1
+        else:
+            self.counts["edges_merged"] += 1
+        return edge
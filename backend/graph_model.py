@@ -1,13 +1,28 @@
+import bisect
 import json
+import math
 import os
 import time
 from dataclasses import dataclass, field, asdict
-from typing import Dict, Literal, Optional
+from typing import Dict, List, Literal, Optional, Set, Tuple
 from uuid import uuid4
 
+from minhash import MinHashLSH, features, jaccard, negated, question_words, same_numbers
+
 NodeType = Literal["intent", "clue", "question", "answer", "action"]
+EdgeKey = Tuple[str, str, str]  # (source, target, type)
+NodeKey = Tuple[str, str]       # (type, normalized text, alias or label)
+AttrKey = Tuple[str, str]       # ("type" | "intent_id" | "source", value)
 
 GRAPH_FILE_NAME = "memory_graph.json"
+CHANGELOG_MAX = 100_000
+# find_or_create_question folds text whose feature Jaccard with an existing
+# question reaches this into that node as an alias (metadata["aliases"]).
+# Answers are never folded (one negation flips their meaning at high
+# similarity); their threshold only serves find_similar() for reporting.
+NEAR_DUPLICATE_THRESHOLDS = {"question": 0.7, "answer": 0.85}
+NEAR_DUPLICATE_MAX_CANDIDATES = 32   # LSH candidates verified per lookup, most band hits first
+MAX_ALIASES = 50
 
 
 @dataclass
@@ -38,6 +53,50 @@ class Edge:
 class MemoryGraph:
     nodes: Dict[str, Node] = field(default_factory=dict)
     edges: Dict[str, Edge] = field(default_factory=dict)
+    # Bumped on every mutation; derived indexes/caches key off (uid, version).
+    version: int = 0
+    uid: str = field(default_factory=lambda: uuid4().hex, repr=False, compare=False)
+    # (type, normalized text/label/alias) -> ids of nodes with it, oldest first (find_or_create_*)
+    _node_keys: Dict[NodeKey, List[str]] = field(default_factory=dict, repr=False)
+    # node type -> MinHash LSH over text and aliases; built on the first find_similar()
+    _similar: Dict[str, MinHashLSH] = field(default_factory=dict, repr=False)
+    # (source, target, type) -> id of the canonical edge for that triple
+    _edge_keys: Dict[EdgeKey, str] = field(default_factory=dict, repr=False)
+    # node type / intent_id / metadata source -> ids of nodes with it (query_nodes)
+    _nodes_by: Dict[AttrKey, Dict[str, None]] = field(default_factory=dict, repr=False)
+    # edge type / metadata intent_id / metadata source -> ids of edges with it (query_edges)
+    _edges_by: Dict[AttrKey, Dict[str, None]] = field(default_factory=dict, repr=False)
+    # node id -> ids of edges leaving / entering it, in insertion order (edges_from/to
+    # callers take the first "answers" edge, so the order must not vary by process)
+    _out_edges: Dict[str, Dict[str, None]] = field(default_factory=dict, repr=False)
+    _in_edges: Dict[str, Dict[str, None]] = field(default_factory=dict, repr=False)
+    # (version, "node" | "edge", id), oldest first
+    _changelog: List[Tuple[int, str, str]] = field(default_factory=list, repr=False)
+    _changelog_floor: int = field(default=0, repr=False)
+
+    # ----- Change tracking -----
+
+    def _touch(self, kind: str, item_id: str) -> None:
+        self.version += 1
+        self._changelog.append((self.version, kind, item_id))
+        if len(self._changelog) > CHANGELOG_MAX:
+            cut = len(self._changelog) // 2
+            self._changelog_floor = self._changelog[cut - 1][0]
+            del self._changelog[:cut]
+
+    def changes_since(self, version: int) -> Optional[Tuple[Set[str], Set[str]]]:
+        """
+        (node ids, edge ids) touched after `version`, or None if the log no
+        longer reaches back that far and the caller must rebuild from scratch.
+        """
+        if version < self._changelog_floor:
+            return None
+        start = bisect.bisect_right(self._changelog, (version, "\uffff", ""))
+        node_ids: Set[str] = set()
+        edge_ids: Set[str] = set()
+        for _, kind, item_id in self._changelog[start:]:
+            (node_ids if kind == "node" else edge_ids).add(item_id)
+        return node_ids, edge_ids
 
     # ----- Node helpers -----
 
@@ -45,13 +104,194 @@ class MemoryGraph:
         if node.id in self.nodes:
             return self.nodes[node.id]
         self.nodes[node.id] = node
+        self._index_node(node)
+        _add_ids(self._nodes_by, node.id, _node_attrs(node))
+        self._touch("node", node.id)
+        return node
+
+    def put_node(self, node: Node) -> Node:
+        """Add `node`, or replace the node with its id (edges are kept)."""
+        old = self.nodes.get(node.id)
+        if old is None:
+            return self.add_node(node)
+        self._unindex_node(old)
+        _drop_ids(self._nodes_by, old.id, _node_attrs(old))
+        self.nodes[node.id] = node
+        self._index_node(node)
+        _add_ids(self._nodes_by, node.id, _node_attrs(node))
+        self._touch("node", node.id)
+        return node
+
+    def update_node_text(self, node_id: str, text: str) -> Node:
+        node = self.nodes[node_id]
+        self._unindex_node(node)
+        node.text = text
+        node.label = text[:60]
+        self._index_node(node)
+        self._touch("node", node_id)
         return node
 
-    def find_or_create_question(self, text: str, intent_id: Optional[str]) -> Node:
+    def update_node_metadata(self, node_id: str, **fields) -> Node:
+        node = self.nodes[node_id]
+        _drop_ids(self._nodes_by, node_id, _node_attrs(node))
+        node.metadata.update(fields)
+        _add_ids(self._nodes_by, node_id, _node_attrs(node))
+        self._touch("node", node_id)
+        return node
+
+    def remove_node(self, node_id: str) -> Optional[Node]:
+        """Remove a node together with every edge touching it."""
+        node = self.nodes.get(node_id)
+        if node is None:
+            return None
+        for edge_id in list(self._out_edges.get(node_id, ())) + list(self._in_edges.get(node_id, ())):
+            self.remove_edge(edge_id)
+        del self.nodes[node_id]
+        self._out_edges.pop(node_id, None)
+        self._in_edges.pop(node_id, None)
+        self._unindex_node(node)
+        _drop_ids(self._nodes_by, node_id, _node_attrs(node))
+        self._touch("node", node_id)
+        return node
+
+    def find_node(self, type: NodeType, text: str) -> Optional[Node]:
+        """
+        Node of `type` whose text (questions, answers; aliases included) or
+        label (clues, actions) matches `text` ignoring case and surrounding
+        whitespace.
+        """
+        ids = self._node_keys.get((type, text.strip().lower()))
+        return self.nodes.get(ids[0]) if ids else None
+
+    def query_nodes(
+        self, type: Optional[str] = None, intent_id: Optional[str] = None, source: Optional[str] = None
+    ) -> List[Node]:
+        """Nodes matching every given filter; costs O(size of the smallest matching index)."""
+        ids = _query(self._nodes_by, type, intent_id, source)
+        return list(self.nodes.values()) if ids is None else [self.nodes[i] for i in ids]
+
+    def find_similar(self, type: NodeType, text: str) -> Optional[Node]:
+        """
+        Most similar question/answer whose text or an alias reaches the
+        NEAR_DUPLICATE_THRESHOLDS Jaccard for `type`, via the LSH index.
+        """
+        threshold = NEAR_DUPLICATE_THRESHOLDS.get(type)
+        feats = features(text)
+        if threshold is None or not feats:
+            return None
+        negative, asks = negated(text), question_words(text)
+        best, best_score = None, threshold
+        index = self._similarity_index(type)
+        for node_id in index.candidates(feats, limit=NEAR_DUPLICATE_MAX_CANDIDATES):
+            node = self.nodes.get(node_id)
+            if node is None:
+                continue
+            for t in _node_texts(node):
+                other = features(t)
+                score = jaccard(feats, other)
+                if score < best_score or (score == best_score and best is not None):
+                    continue
+                if same_numbers(feats, other) and negated(t) == negative and question_words(t) == asks:
+                    best, best_score = node, score
+        return best
+
+    def add_alias(self, node_id: str, text: str) -> Node:
+        """Record `text` as another phrasing of the node; exact and similar lookups find it."""
+        node = self.nodes[node_id]
         norm = text.strip().lower()
-        for n in self.nodes.values():
-            if n.type == "question" and n.text.strip().lower() == norm:
-                return n
+        if any(t.strip().lower() == norm for t in _node_texts(node)):
+            return node
+        aliases = node.metadata.setdefault("aliases", [])
+        if len(aliases) >= MAX_ALIASES:
+            return node
+        aliases.append(text)
+        self._index_text(node, text)
+        self._touch("node", node_id)
+        return node
+
+    def remove_alias(self, node_id: str, text: str) -> None:
+        node = self.nodes.get(node_id)
+        aliases = node.metadata.get("aliases") if node is not None else None
+        if not aliases or text not in aliases:
+            return
+        self._unindex_node(node)
+        aliases.remove(text)
+        if not aliases:
+            del node.metadata["aliases"]
+        self._index_node(node)
+        self._touch("node", node_id)
+
+    def merge_node(self, into_id: str, other_id: str) -> Node:
+        """
+        Fold `other` into `into`: its edges are re-pointed (merging into any
+        parallel edge `into` already has), its text and aliases become
+        aliases, its stats are summed, and it is removed.
+        """
+        into = self.nodes[into_id]
+        other = self.nodes[other_id]
+        for edge in self.edges_from(other_id) + self.edges_to(other_id):
+            source = into_id if edge.source == other_id else edge.source
+            target = into_id if edge.target == other_id else edge.target
+            self.remove_edge(edge.id)
+            if source == target:
+                continue
+            edge.source, edge.target = source, target
+            self.upsert_edge(edge)
+        self.remove_node(other_id)
+        if into.type in ("question", "answer"):
+            for text in _node_texts(other):
+                self.add_alias(into_id, text)
+        for k, v in other.stats.items():
+            into.stats[k] = into.stats.get(k, 0.0) + v
+        created = [n.metadata["created_at"] for n in (into, other) if "created_at" in n.metadata]
+        if created:
+            into.metadata["created_at"] = min(created)
+        self._touch("node", into_id)
+        return into
+
+    def _similarity_index(self, type: str) -> MinHashLSH:
+        lsh = self._similar.get(type)
+        if lsh is None:
+            lsh = MinHashLSH()
+            for node in self.nodes.values():
+                if node.type == type:
+                    for text in _node_texts(node):
+                        lsh.add(node.id, features(text))
+            self._similar[type] = lsh
+        return lsh
+
+    def _index_text(self, node: Node, text: str) -> None:
+        self._node_keys.setdefault((node.type, text.strip().lower()), []).append(node.id)
+        lsh = self._similar.get(node.type)
+        if lsh is not None:
+            lsh.add(node.id, features(text))
+
+    def _index_node(self, node: Node) -> None:
+        for text in _node_texts(node):
+            self._index_text(node, text)
+
+    def _unindex_node(self, node: Node) -> None:
+        lsh = self._similar.get(node.type)
+        for text in _node_texts(node):
+            key = (node.type, text.strip().lower())
+            ids = self._node_keys.get(key)
+            if ids and node.id in ids:
+                ids.remove(node.id)
+                if not ids:
+                    del self._node_keys[key]
+            if lsh is not None:
+                lsh.remove(node.id, features(text))
+
+    def find_or_create_question(
+        self, text: str, intent_id: Optional[str], merge_similar: bool = True
+    ) -> Node:
+        existing = self.find_node("question", text)
+        if existing is not None:
+            return existing
+        if merge_similar:
+            similar = self.find_similar("question", text)
+            if similar is not None:
+                return self.add_alias(similar.id, text)
         node = Node(
             id=str(uuid4()),
             type="question",
@@ -63,10 +303,9 @@ class MemoryGraph:
         return self.add_node(node)
 
     def find_or_create_answer(self, text: str, intent_id: Optional[str]) -> Node:
-        norm = text.strip().lower()
-        for n in self.nodes.values():
-            if n.type == "answer" and n.text.strip().lower() == norm:
-                return n
+        existing = self.find_node("answer", text)
+        if existing is not None:
+            return existing
         node = Node(
             id=str(uuid4()),
             type="answer",
@@ -78,10 +317,10 @@ class MemoryGraph:
         return self.add_node(node)
 
     def find_or_create_clue(self, label: str, intent_id: Optional[str]) -> Node:
-        norm = label.strip().lower()
-        for n in self.nodes.values():
-            if n.type == "clue" and n.label.strip().lower() == norm:
-                return n
+        # Labels are stored truncated to 60 chars, so match on the same prefix.
+        existing = self.find_node("clue", label[:60])
+        if existing is not None:
+            return existing
         node = Node(
             id=str(uuid4()),
             type="clue",
@@ -95,10 +334,10 @@ class MemoryGraph:
     def find_or_create_action(
         self, label: str, description: str = "", intent_id: Optional[str] = None
     ) -> Node:
-        norm = label.strip().lower()
-        for n in self.nodes.values():
-            if n.type == "action" and n.label.strip().lower() == norm:
-                return n
+        # Labels are stored truncated to 60 chars, so match on the same prefix.
+        existing = self.find_node("action", label[:60])
+        if existing is not None:
+            return existing
         node = Node(
             id=str(uuid4()),
             type="action",
@@ -115,39 +354,231 @@ class MemoryGraph:
         if edge.id in self.edges:
             return self.edges[edge.id]
         self.edges[edge.id] = edge
+        self._edge_keys.setdefault(_edge_key(edge), edge.id)
+        _add_ids(self._edges_by, edge.id, _edge_attrs(edge))
+        self._out_edges.setdefault(edge.source, {})[edge.id] = None
+        self._in_edges.setdefault(edge.target, {})[edge.id] = None
+        self._touch("edge", edge.id)
         return edge
 
+    def remove_edge(self, edge_id: str) -> Optional[Edge]:
+        edge = self.edges.pop(edge_id, None)
+        if edge is None:
+            return None
+        key = _edge_key(edge)
+        if self._edge_keys.get(key) == edge_id:
+            del self._edge_keys[key]
+        _drop_ids(self._edges_by, edge_id, _edge_attrs(edge))
+        self._out_edges.get(edge.source, {}).pop(edge_id, None)
+        self._in_edges.get(edge.target, {}).pop(edge_id, None)
+        self._touch("edge", edge_id)
+        return edge
+
+    def edges_from(self, node_id: str, type: Optional[str] = None) -> List[Edge]:
+        edges = [self.edges[i] for i in self._out_edges.get(node_id, ())]
+        return [e for e in edges if type is None or e.type == type]
+
+    def edges_to(self, node_id: str, type: Optional[str] = None) -> List[Edge]:
+        edges = [self.edges[i] for i in self._in_edges.get(node_id, ())]
+        return [e for e in edges if type is None or e.type == type]
+
+    def query_edges(
+        self, type: Optional[str] = None, intent_id: Optional[str] = None, source: Optional[str] = None
+    ) -> List[Edge]:
+        """Edges matching every given filter (intent_id/source from metadata)."""
+        ids = _query(self._edges_by, type, intent_id, source)
+        return list(self.edges.values()) if ids is None else [self.edges[i] for i in ids]
+
+    def get_edge(self, source: str, target: str, type: str) -> Optional[Edge]:
+        edge_id = self._edge_keys.get((source, target, type))
+        return self.edges.get(edge_id) if edge_id else None
+
+    def upsert_edge(self, edge: Edge) -> Edge:
+        """
+        Add `edge` unless an edge with the same (source, target, type) exists,
+        in which case the two are merged and the existing edge is returned.
+        """
+        existing = self.get_edge(edge.source, edge.target, edge.type)
+        if existing is None:
+            return self.add_edge(edge)
+        if existing is not edge:
+            self._merge_into(existing, edge)
+        return existing
+
+    def put_edge(self, edge: Edge) -> Edge:
+        """Add `edge`, or replace the edge with its id (endpoints may differ)."""
+        if edge.id in self.edges:
+            self.remove_edge(edge.id)
+        return self.add_edge(edge)
+
+    def restore_edge(self, snapshot: Edge) -> Edge:
+        """Put an edge back to an earlier copy of itself (same id and endpoints)."""
+        edge = self.edges[snapshot.id]
+        _drop_ids(self._edges_by, edge.id, _edge_attrs(edge))
+        edge.weight = snapshot.weight
+        edge.confidence = snapshot.confidence
+        edge.metadata = snapshot.metadata
+        _add_ids(self._edges_by, edge.id, _edge_attrs(edge))
+        self._touch("edge", edge.id)
+        return edge
+
+    def compact_duplicate_edges(self) -> int:
+        """
+        Fold parallel edges (same source, target and type) into one, merging
+        their stats. Returns the number of edges removed.
+        """
+        removed = 0
+        for edge_id, edge in list(self.edges.items()):
+            key = _edge_key(edge)
+            keep_id = self._edge_keys.get(key)
+            if keep_id is None or keep_id not in self.edges:
+                self._edge_keys[key] = edge_id
+                continue
+            if keep_id == edge_id:
+                continue
+            self._merge_into(self.edges[keep_id], edge)
+            self.remove_edge(edge_id)
+            removed += 1
+        return removed
+
+    def _merge_into(self, into: Edge, other: Edge) -> None:
+        # Merging can fill in metadata (intent_id, source) the edge lacked.
+        _drop_ids(self._edges_by, into.id, _edge_attrs(into))
+        _merge_edge(into, other)
+        _add_ids(self._edges_by, into.id, _edge_attrs(into))
+        self._touch("edge", into.id)
+
     def apply_edge_feedback(self, edge_id: str, value: int):
         """
         value: +1 (good), -1 (bad)
         Adjust edge.confidence using a squashed score from feedback.
         """
+        if value > 0:
+            self.apply_edge_feedback_counts(edge_id, pos=1, neg=0)
+        else:
+            self.apply_edge_feedback_counts(edge_id, pos=0, neg=1)
+
+    def apply_edge_feedback_counts(self, edge_id: str, pos: int, neg: int):
+        """
+        Apply `pos` thumbs-up and `neg` thumbs-down to one edge at once, so a
+        batch of events costs a single confidence update per edge.
+        """
         edge = self.edges[edge_id]
         stats = edge.metadata.setdefault(
             "feedback", {"pos": 0.0, "neg": 0.0, "views": 0.0}
         )
-        if value > 0:
-            stats["pos"] += 1.0
-        else:
-            stats["neg"] += 1.0
-        stats["views"] += 1.0
+        stats["pos"] += float(pos)
+        stats["neg"] += float(neg)
+        stats["views"] += float(pos + neg)
+
+        edge.confidence = _confidence_from_feedback(stats)
+        self._touch("edge", edge_id)
+
+
+def _node_texts(node: Node) -> List[str]:
+    """What find_node matches on: question/answer text plus aliases, clue/action label."""
+    if node.type in ("question", "answer"):
+        return [node.text or ""] + list(node.metadata.get("aliases") or ())
+    if node.type in ("clue", "action"):
+        return [node.label or ""]
+    return []
+
+
+def _edge_key(edge: Edge) -> EdgeKey:
+    return (edge.source, edge.target, edge.type)
 
-        score = (stats["pos"] - stats["neg"]) / max(1.0, stats["views"])
-        import math
 
-        edge.confidence = 1.0 / (1.0 + math.exp(-3 * score))
+def _attrs(type: str, intent_id: Optional[str], metadata: Optional[Dict]) -> List[AttrKey]:
+    keys = [("type", type)]
+    if intent_id:
+        keys.append(("intent_id", intent_id))
+    source = (metadata or {}).get("source")
+    if source:
+        keys.append(("source", source))
+    return keys
+
+
+def _node_attrs(node: Node) -> List[AttrKey]:
+    return _attrs(node.type, node.intent_id, node.metadata)
+
+
+def _edge_attrs(edge: Edge) -> List[AttrKey]:
+    return _attrs(edge.type, (edge.metadata or {}).get("intent_id"), edge.metadata)
+
+
+def _add_ids(index: Dict[AttrKey, Dict[str, None]], item_id: str, keys: List[AttrKey]) -> None:
+    for key in keys:
+        index.setdefault(key, {})[item_id] = None
+
+
+def _drop_ids(index: Dict[AttrKey, Dict[str, None]], item_id: str, keys: List[AttrKey]) -> None:
+    for key in keys:
+        ids = index.get(key)
+        if ids is not None:
+            ids.pop(item_id, None)
+            if not ids:
+                del index[key]
+
+
+def _query(
+    index: Dict[AttrKey, Dict[str, None]], type: Optional[str], intent_id: Optional[str], source: Optional[str]
+) -> Optional[List[str]]:
+    """Ids in every requested bucket, scanning the smallest one; None if nothing was filtered on."""
+    wanted = [(k, v) for k, v in (("type", type), ("intent_id", intent_id), ("source", source)) if v]
+    if not wanted:
+        return None
+    buckets = sorted((index.get(key, {}) for key in wanted), key=len)
+    first, rest = buckets[0], buckets[1:]
+    return [i for i in first if all(i in b for b in rest)]
+
+
+def _confidence_from_feedback(stats: Dict[str, float]) -> float:
+    score = (stats["pos"] - stats["neg"]) / max(1.0, stats["views"])
+    return 1.0 / (1.0 + math.exp(-3 * score))
+
+
+def _merge_edge(into: Edge, other: Edge) -> None:
+    """Fold `other` into `into`: keep the stronger weight, sum feedback."""
+    into.weight = max(into.weight, other.weight)
+
+    other_fb = other.metadata.get("feedback")
+    if other_fb:
+        stats = into.metadata.setdefault(
+            "feedback", {"pos": 0.0, "neg": 0.0, "views": 0.0}
+        )
+        for k in ("pos", "neg", "views"):
+            stats[k] = stats.get(k, 0.0) + other_fb.get(k, 0.0)
+
+    stats = into.metadata.get("feedback")
+    if stats and stats.get("views"):
+        into.confidence = _confidence_from_feedback(stats)
+    else:
+        into.confidence = max(into.confidence, other.confidence)
+
+    for k, v in other.metadata.items():
+        if k == "feedback":
+            continue
+        if k == "created_at" and k in into.metadata:
+            into.metadata[k] = min(into.metadata[k], v)
+        else:
+            into.metadata.setdefault(k, v)
+    into.metadata["updated_at"] = time.time()
 
 
 # ---------- disk persistence ----------
 
 
-def _graph_path() -> str:
+def graph_file_path() -> str:
+    # NEMA_GRAPH_FILE lets benchmarks/tools point at a scratch copy.
+    override = os.environ.get("NEMA_GRAPH_FILE")
+    if override:
+        return override
     here = os.path.dirname(os.path.abspath(__file__))
     return os.path.join(here, GRAPH_FILE_NAME)
 
 
 def save_graph(graph: MemoryGraph) -> None:
-    path = _graph_path()
+    path = graph_file_path()
     data = {
         "nodes": [asdict(n) for n in graph.nodes.values()],
         "edges": [asdict(e) for e in graph.edges.values()],
@@ -157,7 +588,7 @@ def save_graph(graph: MemoryGraph) -> None:
 
 
 def load_graph() -> MemoryGraph:
-    path = _graph_path()
+    path = graph_file_path()
     g = MemoryGraph()
     if not os.path.exists(path):
         return g
@@ -0,0 +1,196 @@
+import base64
+import bisect
+import threading
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from graph_model import MemoryGraph
+
+LOW_CONFIDENCE = 0.5   # answers edges below this count as low-confidence
+
+QuestionKey = Tuple[str, str]  # (lowercased label, question id): drill-down order
+
+
+@dataclass
+class ClueStats:
+    id: str
+    label: str
+    questions: int = 0
+    answered: int = 0              # questions with at least one answer
+    answer_edges: int = 0
+    mean_confidence: Optional[float] = None
+    low_confidence: int = 0        # answer edges below LOW_CONFIDENCE
+    actions: int = 0               # distinct actions reachable via next_step
+    action_edges: int = 0
+
+
+def encode_cursor(key: QuestionKey) -> str:
+    return base64.urlsafe_b64encode(f"{key[0]}\x00{key[1]}".encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> QuestionKey:
+    label, question_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("\x00", 1)
+    return label, question_id
+
+
+class GraphOverviewIndex:
+    """
+    Per-clue aggregates for the dashboard (clue -> question -> answer ->
+    action), kept in sync through MemoryGraph.changes_since: a change only
+    re-aggregates the clues it can affect, found through the edges each
+    clue read last time (`_edge_clues`) and the changed edge's new position.
+
+    Each clue also keeps its question ids sorted for paged drill-down.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._graph: Optional[MemoryGraph] = None
+        self._version = 0
+        self._stats: Dict[str, Dict] = {}                # clue id -> ClueStats as a dict
+        self._sorted: Optional[List[Dict]] = None        # _stats in label order, until a clue changes
+        self._questions: Dict[str, List[QuestionKey]] = {}
+        self._edge_clues: Dict[str, Set[str]] = {}     # edge id -> clues whose aggregates read it
+        self._clue_edges: Dict[str, Set[str]] = {}     # clue id -> edge ids it read
+        self._type_counts: Dict[str, int] = {}
+        self._node_types: Dict[str, str] = {}
+
+    def overview(self, graph: MemoryGraph) -> Dict:
+        with self._lock:
+            self._sync(graph)
+            if self._sorted is None:
+                self._sorted = sorted(self._stats.values(), key=lambda s: (s["label"].lower(), s["id"]))
+            return {
+                "graph_version": graph.version,
+                "summary": {
+                    "clues": self._type_counts.get("clue", 0),
+                    "questions": self._type_counts.get("question", 0),
+                    "answers": self._type_counts.get("answer", 0),
+                    "actions": self._type_counts.get("action", 0),
+                    "edges": len(graph.edges),
+                },
+                "clues": self._sorted,
+            }
+
+    def page(
+        self, graph: MemoryGraph, clue_id: str, limit: int, cursor: Optional[str] = None
+    ) -> Optional[Tuple[List[str], Optional[str]]]:
+        """(question ids, next cursor) under `clue_id`; None if there is no such clue."""
+        with self._lock:
+            self._sync(graph)
+            keys = self._questions.get(clue_id)
+            if keys is None:
+                return None
+            start = bisect.bisect_right(keys, decode_cursor(cursor)) if cursor else 0
+            chunk = keys[start:start + limit]
+            next_cursor = encode_cursor(chunk[-1]) if chunk and start + limit < len(keys) else None
+            return [question_id for _, question_id in chunk], next_cursor
+
+    # ----- maintenance -----
+
+    def _sync(self, graph: MemoryGraph) -> None:
+        changes = graph.changes_since(self._version) if graph is self._graph else None
+        if changes is None:
+            self._rebuild(graph)
+            return
+        node_ids, edge_ids = changes
+        dirty: Set[str] = set()
+        for node_id in node_ids:
+            self._count_node(graph, node_id)
+            if node_id in self._stats or self._node_types.get(node_id) == "clue":
+                dirty.add(node_id)
+            elif self._node_types.get(node_id) == "question":
+                # Relabelled questions move within their clues' drill-down order.
+                dirty |= {e.source for e in graph.edges_to(node_id, "describes_context")}
+        for edge_id in edge_ids:
+            dirty |= self._edge_clues.get(edge_id, set())
+            edge = graph.edges.get(edge_id)
+            if edge is not None:
+                dirty |= self._clues_of_edge(graph, edge)
+        for clue_id in dirty:
+            self._aggregate(graph, clue_id)
+        if dirty:
+            self._sorted = None
+        self._version = graph.version
+
+    def _rebuild(self, graph: MemoryGraph) -> None:
+        self._stats, self._questions, self._sorted = {}, {}, None
+        self._edge_clues, self._clue_edges = {}, {}
+        self._type_counts, self._node_types = {}, {}
+        for node in list(graph.nodes.values()):
+            self._node_types[node.id] = node.type
+            self._type_counts[node.type] = self._type_counts.get(node.type, 0) + 1
+            if node.type == "clue":
+                self._aggregate(graph, node.id)
+        self._graph = graph
+        self._version = graph.version
+
+    def _count_node(self, graph: MemoryGraph, node_id: str) -> None:
+        old = self._node_types.pop(node_id, None)
+        if old is not None:
+            self._type_counts[old] -= 1
+        node = graph.nodes.get(node_id)
+        if node is not None:
+            self._node_types[node_id] = node.type
+            self._type_counts[node.type] = self._type_counts.get(node.type, 0) + 1
+
+    @staticmethod
+    def _clues_of_edge(graph: MemoryGraph, edge) -> Set[str]:
+        """Clues whose aggregates the edge feeds where it sits now."""
+        if edge.type == "describes_context":
+            return {edge.source}
+        if edge.type == "answers":
+            questions = [edge.source]
+        elif edge.type == "next_step":
+            questions = [e.source for e in graph.edges_to(edge.source, "answers")]
+        else:
+            return set()
+        return {e.source for q in questions for e in graph.edges_to(q, "describes_context")}
+
+    def _forget(self, clue_id: str) -> None:
+        for edge_id in self._clue_edges.pop(clue_id, ()):
+            clues = self._edge_clues.get(edge_id)
+            if clues is not None:
+                clues.discard(clue_id)
+                if not clues:
+                    del self._edge_clues[edge_id]
+        self._stats.pop(clue_id, None)
+        self._questions.pop(clue_id, None)
+
+    def _aggregate(self, graph: MemoryGraph, clue_id: str) -> None:
+        self._forget(clue_id)
+        clue = graph.nodes.get(clue_id)
+        if clue is None or clue.type != "clue":
+            return
+        stats = ClueStats(id=clue.id, label=clue.label or clue.text)
+        read: Set[str] = set()
+        keys: List[QuestionKey] = []
+        actions: Set[str] = set()
+        confidence_sum = 0.0
+        for de in graph.edges_from(clue_id, "describes_context"):
+            read.add(de.id)
+            q = graph.nodes.get(de.target)
+            if q is None or q.type != "question":
+                continue
+            keys.append(((q.label or q.text).lower(), q.id))
+            answers = graph.edges_from(q.id, "answers")
+            stats.questions += 1
+            stats.answered += 1 if answers else 0
+            for ae in answers:
+                read.add(ae.id)
+                stats.answer_edges += 1
+                confidence_sum += ae.confidence
+                stats.low_confidence += 1 if ae.confidence < LOW_CONFIDENCE else 0
+                for ne in graph.edges_from(ae.target, "next_step"):
+                    read.add(ne.id)
+                    stats.action_edges += 1
+                    actions.add(ne.target)
+        if stats.answer_edges:
+            stats.mean_confidence = round(confidence_sum / stats.answer_edges, 4)
+        stats.actions = len(actions)
+        keys.sort()
+        self._stats[clue_id] = asdict(stats)
+        self._questions[clue_id] = keys
+        self._clue_edges[clue_id] = read
+        for edge_id in read:
+            self._edge_clues.setdefault(edge_id, set()).add(clue_id)
@@ -0,0 +1,263 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+REGISTRY: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, v in sorted(self._values.items()):
+            lines.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_value(v)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> (per-bucket counts, sum, count)
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = ([0] * len(self.buckets), [0.0, 0.0])
+                self._series[key] = series
+            counts, totals = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            totals[0] += value
+            totals[1] += 1
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return int(series[1][1]) if series else 0
+
+    def quantile(self, q: float, **labels: str) -> Optional[float]:
+        """Estimate the q-quantile from bucket counts (None if no samples)."""
+        series = self._series.get(self._key(labels))
+        if not series or not series[1][1]:
+            return None
+        counts, totals = series
+        rank = q * totals[1]
+        seen = 0
+        lower = 0.0
+        for bound, n in zip(self.buckets, counts):
+            if n and seen + n >= rank:
+                if bound == float("inf"):
+                    return lower
+                return lower + (bound - lower) * ((rank - seen) / n)
+            seen += n
+            if bound != float("inf"):
+                lower = bound
+        return lower
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, (counts, totals) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = f'le="{_fmt_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_fmt_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _fmt_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_fmt_value(totals[0])}")
+            lines.append(f"{self.name}_count{labels} {int(totals[1])}")
+        return lines
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+STAGE_SECONDS = Histogram(
+    "nema_stage_seconds",
+    "Time spent in one hot-path stage (whisper, route, graph, reply_llm, tts, save_graph, ...).",
+    ["stage"],
+)
+REQUEST_SECONDS = Histogram(
+    "nema_request_seconds",
+    "End-to-end HTTP request latency.",
+    ["method", "route", "status"],
+)
+
+
+# ---------- per-request stage timing ----------
+
+
+@dataclass
+class Span:
+    name: str
+    start: float     # seconds since the request started
+    duration: float  # seconds
+
+
+@dataclass
+class RequestTiming:
+    started: float = field(default_factory=time.perf_counter)
+    spans: List[Span] = field(default_factory=list)
+
+    def totals(self) -> Dict[str, float]:
+        """Stage name -> summed seconds, in order of first occurrence."""
+        out: Dict[str, float] = {}
+        for s in self.spans:
+            out[s.name] = out.get(s.name, 0.0) + s.duration
+        return out
+
+
+_CURRENT: contextvars.ContextVar[Optional[RequestTiming]] = contextvars.ContextVar(
+    "nema_request_timing", default=None
+)
+
+
+def current_timing() -> Optional[RequestTiming]:
+    return _CURRENT.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block: feeds nema_stage_seconds and the request's Server-Timing."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        timing = _CURRENT.get()
+        if timing is not None:
+            timing.spans.append(Span(name, t0 - timing.started, elapsed))
+
+
+def server_timing_header(timing: RequestTiming, total: float) -> str:
+    parts = [f"{name};dur={secs * 1000.0:.1f}" for name, secs in timing.totals().items()]
+    parts.append(f"total;dur={total * 1000.0:.1f}")
+    return ", ".join(parts)
+
+
+class TimingMiddleware:
+    """
+    ASGI middleware: opens a RequestTiming for each HTTP request, adds a
+    Server-Timing header with the stage breakdown and records request latency.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = _CURRENT.set(timing)
+        status = {"code": 500}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                total = time.perf_counter() - timing.started
+                headers = list(message.get("headers") or [])
+                headers.append(
+                    (b"server-timing", server_timing_header(timing, total).encode("latin-1"))
+                )
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _CURRENT.reset(token)
+            route = scope.get("route")
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - timing.started,
+                method=scope.get("method", ""),
+                route=getattr(route, "path", "unmatched"),
+                status=str(status["code"]),
+            )
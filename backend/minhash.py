@@ -0,0 +1,117 @@
+import hashlib
+import re
+import struct
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+from text_norm import content_terms, words
+
+# One 64-byte blake2b digest per feature gives 16 independent 32-bit hashes,
+# i.e. up to 16 MinHash permutations without a per-permutation Python loop.
+SIGNATURE_SIZE = 16
+_UNPACK = struct.Struct(f"<{SIGNATURE_SIZE}I").unpack
+
+
+def features(text: str) -> Set[str]:
+    """Stemmed content words plus adjacent pairs, so word order still counts a bit."""
+    terms = content_terms(text)
+    return set(terms) | {f"{a} {b}" for a, b in zip(terms, terms[1:])}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def _numbers(feats: Set[str]) -> Set[str]:
+    return {f for f in feats if (f[0].isdigit() or f[0] == "$") and " " not in f}
+
+
+def same_numbers(a: Set[str], b: Set[str]) -> bool:
+    """Texts quoting different numbers ($45 vs $55, 5 vs 10 miles) are never duplicates."""
+    return _numbers(a) == _numbers(b)
+
+
+_NEGATION = re.compile(r"\b(?:not|no|never|none|nothing|nobody|nowhere|without|cannot|\w+n['\u2019]t)\b")
+
+
+def negated(text: str) -> bool:
+    """Odd number of negations: "Do you offer X?" and "Do you not offer X?" are never duplicates."""
+    return len(_NEGATION.findall((text or "").lower())) % 2 == 1
+
+
+INTERROGATIVES = frozenset({"what", "when", "where", "which", "who", "whom", "whose", "why", "how"})
+
+
+def question_words(text: str) -> FrozenSet[str]:
+    """
+    Interrogatives in `text`. They are stopwords to features(), so "When do
+    you deliver?" and "Where do you deliver?" look identical there; texts
+    asking with different ones are never duplicates.
+    """
+    return frozenset(w for w in words(text) if w in INTERROGATIVES)
+
+
+class MinHashLSH:
+    """
+    Banded MinHash index over feature sets. Items whose Jaccard similarity
+    is above roughly (1/bands) ** (1/rows) share at least one band bucket
+    with high probability; callers verify candidates exactly.
+
+    Buckets stop growing at `bucket_cap` so templated text (thousands of
+    questions differing in one word) can't turn a lookup into a scan.
+    Signatures are not stored: removal recomputes them from the features.
+    """
+
+    def __init__(self, bands: int = 5, rows: int = 3, bucket_cap: int = 256):
+        if bands * rows > SIGNATURE_SIZE:
+            raise ValueError(f"bands * rows must be <= {SIGNATURE_SIZE}")
+        self.bands = bands
+        self.rows = rows
+        self.bucket_cap = bucket_cap
+        self._buckets: List[Dict[int, List[str]]] = [{} for _ in range(bands)]
+        self.size = 0  # feature sets indexed
+
+    @staticmethod
+    def signature(feats: Iterable[str]) -> List[int]:
+        columns = [
+            _UNPACK(hashlib.blake2b(f.encode("utf-8"), digest_size=64).digest()) for f in feats
+        ]
+        return [min(col) for col in zip(*columns)]
+
+    def _band_keys(self, feats: Set[str]) -> List[int]:
+        sig = self.signature(feats)
+        r = self.rows
+        return [hash(tuple(sig[i * r:(i + 1) * r])) for i in range(self.bands)]
+
+    def add(self, item_id: str, feats: Set[str]) -> None:
+        if not feats:
+            return
+        for buckets, key in zip(self._buckets, self._band_keys(feats)):
+            members = buckets.setdefault(key, [])
+            if len(members) < self.bucket_cap and item_id not in members:
+                members.append(item_id)
+        self.size += 1
+
+    def remove(self, item_id: str, feats: Set[str]) -> None:
+        if not feats:
+            return
+        for buckets, key in zip(self._buckets, self._band_keys(feats)):
+            members = buckets.get(key)
+            if members and item_id in members:
+                members.remove(item_id)
+                if not members:
+                    del buckets[key]
+        self.size -= 1
+
+    def candidates(self, feats: Set[str], limit: Optional[int] = None) -> List[str]:
+        """Item ids sharing a band with `feats`, most shared bands first."""
+        if not feats:
+            return []
+        hits: Dict[str, int] = {}
+        for buckets, key in zip(self._buckets, self._band_keys(feats)):
+            for item_id in buckets.get(key, ()):
+                hits[item_id] = hits.get(item_id, 0) + 1
+        ranked = sorted(hits, key=hits.__getitem__, reverse=True)
+        return ranked[:limit] if limit is not None else ranked
@@ -0,0 +1,244 @@
+import hashlib
+import math
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+from text_norm import STOPWORDS
+
+BOILERPLATE_PAGE_RATIO = 0.5   # on at least this share of pages (and 2+) = boilerplate
+NEAR_DUP_JACCARD = 0.7         # on word-bigram shingles
+SHINGLE_SIZE = 2
+MIN_WORDS = 4                  # shorter lines survive only if they carry a fact
+
+_WORD = re.compile(r"[a-z0-9$%']+")
+_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_MARKUP = re.compile(r"[#>*_`|]+")
+_FACT = re.compile(
+    r"\$\s?\d"                                   # prices
+    r"|\b\d{1,2}(:\d{2})?\s?(am|pm)\b"           # times
+    r"|\b\d{3}[-.\s]\d{3,4}([-.\s]\d{4})?\b"     # phone numbers
+    r"|[\w.+-]+@[\w-]+\.[\w.]+"                  # emails
+    r"|\b\d+(\.\d+)?\s?(%|percent|days?|hours?|miles?|minutes?)\b",
+    re.IGNORECASE,
+)
+_NOISE = re.compile(
+    r"\b(cookies?|privacy policy|terms of (use|service)|all rights reserved|copyright|"
+    r"subscribe|newsletter|sign in|log in|add to cart|skip to (main )?content)\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class Paragraph:
+    page: int          # index into the page list, -1 = site-wide
+    position: int      # order within its page
+    text: str
+    score: float = 0.0
+
+
+@dataclass
+class CleanedPages:
+    pages: List[Dict]
+    site_wide: List[str] = field(default_factory=list)
+    stats: Dict[str, int] = field(default_factory=dict)
+
+
+def strip_markup(text: str) -> str:
+    text = _LINK.sub(lambda m: m.group(1), text)
+    return re.sub(r"\s+", " ", _MARKUP.sub(" ", text)).strip()
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def paragraph_hash(text: str) -> str:
+    """Hash of the normalized words, so markup/case/spacing differences collide."""
+    return hashlib.sha1(" ".join(_words(strip_markup(text))).encode("utf-8")).hexdigest()
+
+
+def shingles(words: List[str], size: int = SHINGLE_SIZE) -> Set[Tuple[str, ...]]:
+    if len(words) < size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def fact_count(text: str) -> int:
+    return len(_FACT.findall(text))
+
+
+def density(text: str) -> float:
+    """
+    Unique content words per token, boosted for concrete facts (prices, times,
+    phone numbers, ...) and penalized for site chrome. 0 = not worth sending.
+    """
+    words = _words(text)
+    if not words:
+        return 0.0
+    facts = fact_count(text)
+    if len(words) < MIN_WORDS and not facts:
+        return 0.0
+    content = {w for w in words if w not in STOPWORDS and len(w) > 1}
+    score = len(content) / math.sqrt(len(words)) + facts
+    if _NOISE.search(text):
+        score *= 0.2
+    return score
+
+
+def clean_pages(pages: List[Dict]) -> CleanedPages:
+    """
+    Crawl-wide cleanup of pages in crawl_site_with_firecrawl_v2's shape:
+
+      - boilerplate: paragraphs (hashed after normalization) found on many
+        pages - nav bars, footers, cookie banners - are cut to one copy;
+        the ones carrying a fact (a phone number in the footer) are kept as
+        site-wide, other repeated content (not site chrome, non-zero density)
+        where it first appears, and chrome is removed everywhere
+      - near-duplicates: paragraphs whose word shingles mostly overlap an
+        earlier one are collapsed into it
+      - the rest is scored by density() and low-value lines are dropped
+    """
+    n_pages = len(pages)
+    per_page: List[List[str]] = []
+    pages_with: Dict[str, Set[int]] = defaultdict(set)
+    first_text: Dict[str, str] = {}
+    for i, page in enumerate(pages):
+        paras = page.get("paragraphs") or []
+        if not isinstance(paras, list):
+            paras = []
+        texts = [strip_markup(p) for p in paras if isinstance(p, str)]
+        texts = [t for t in texts if t]
+        per_page.append(texts)
+        for t in texts:
+            h = paragraph_hash(t)
+            pages_with[h].add(i)
+            first_text.setdefault(h, t)
+
+    threshold = max(2, math.ceil(BOILERPLATE_PAGE_RATIO * n_pages))
+    boilerplate = {h for h, seen in pages_with.items() if len(seen) >= threshold}
+    stats = {
+        "paragraphs_in": sum(len(t) for t in per_page),
+        "boilerplate": 0,
+        "near_duplicates": 0,
+        "low_density": 0,
+    }
+
+    shingle_index: Dict[Tuple[str, ...], List[int]] = defaultdict(list)
+    kept_shingles: List[Set[Tuple[str, ...]]] = []
+
+    def is_new(text: str) -> bool:
+        sh = shingles(_words(text))
+        if _near_duplicate(sh, shingle_index, kept_shingles):
+            return False
+        for s in sh:
+            shingle_index[s].append(len(kept_shingles))
+        kept_shingles.append(sh)
+        return True
+
+    # Site-wide lines that still carry information are kept once.
+    site_wide = []
+    site_wide_hashes: Set[str] = set()
+    for h in sorted(boilerplate, key=lambda h: min(pages_with[h])):
+        text = first_text[h]
+        if density(text) > 0 and fact_count(text):
+            site_wide_hashes.add(h)
+            if is_new(text):
+                site_wide.append(text)
+
+    kept: List[Paragraph] = []
+    seen_hashes: Set[str] = set()
+    for i, texts in enumerate(per_page):
+        for pos, text in enumerate(texts):
+            h = paragraph_hash(text)
+            if h in boilerplate and (
+                h in site_wide_hashes or h in seen_hashes or _NOISE.search(text) or density(text) <= 0
+            ):
+                # Repeated content that isn't site chrome keeps its first copy below.
+                stats["boilerplate"] += 1
+                continue
+            if h in seen_hashes:
+                stats["near_duplicates"] += 1
+                continue
+            seen_hashes.add(h)
+            score = density(text)
+            if score <= 0:
+                stats["low_density"] += 1
+                continue
+            if not is_new(text):
+                stats["near_duplicates"] += 1
+                continue
+            kept.append(Paragraph(page=i, position=pos, text=text, score=score))
+
+    by_page: Dict[int, List[Paragraph]] = defaultdict(list)
+    for p in kept:
+        by_page[p.page].append(p)
+    out_pages = []
+    for i, page in enumerate(pages):
+        paras = by_page.get(i, [])
+        out_pages.append(dict(page, paragraphs=[p.text for p in paras], scores=[p.score for p in paras]))
+    stats["paragraphs_out"] = len(kept) + len(site_wide)
+    return CleanedPages(pages=out_pages, site_wide=site_wide, stats=stats)
+
+
+def _near_duplicate(
+    sh: Set[Tuple[str, ...]],
+    index: Dict[Tuple[str, ...], List[int]],
+    kept: List[Set[Tuple[str, ...]]],
+) -> bool:
+    if not sh:
+        return False
+    overlap: Dict[int, int] = defaultdict(int)
+    for s in sh:
+        for idx in index.get(s, ()):
+            overlap[idx] += 1
+    for idx, shared in overlap.items():
+        if shared / (len(sh) + len(kept[idx]) - shared) >= NEAR_DUP_JACCARD:
+            return True
+    return False
+
+
+def pack_pages(cleaned: CleanedPages, max_chars: int = 12000) -> str:
+    """
+    Prompt text for extraction: the highest-density paragraphs that fit in
+    `max_chars`, emitted per page in their original order under the title.
+    """
+    candidates: List[Paragraph] = [
+        Paragraph(page=-1, position=pos, text=text, score=float("inf"))
+        for pos, text in enumerate(cleaned.site_wide)
+    ]
+    for i, page in enumerate(cleaned.pages):
+        for pos, (text, score) in enumerate(zip(page["paragraphs"], page.get("scores") or [])):
+            candidates.append(Paragraph(page=i, position=pos, text=text, score=score))
+
+    headers: Dict[int, str] = {-1: "# Site-wide"}
+    for i, page in enumerate(cleaned.pages):
+        title = (page.get("meta_info", {}) or {}).get("page_title") or page.get("url") or f"Page {i + 1}"
+        headers[i] = f"# {title}"
+
+    separator = "\n\n---\n\n"
+    used = 0
+    chosen: List[Paragraph] = []
+    opened: Set[int] = set()
+    for p in sorted(candidates, key=lambda p: -p.score):
+        cost = len(p.text) + 1
+        if p.page not in opened:
+            cost += len(headers[p.page]) + 1 + len(separator)
+        if used + cost > max_chars:
+            continue
+        used += cost
+        opened.add(p.page)
+        chosen.append(p)
+
+    sections: List[str] = []
+    for page in sorted(opened):
+        paras = sorted((p for p in chosen if p.page == page), key=lambda p: p.position)
+        sections.append("\n".join([headers[page]] + [p.text for p in paras]))
+    return separator.join(sections)
+
+
+def packed_text(pages: List[Dict], max_chars: int = 12000) -> Tuple[str, Dict[str, int]]:
+    """clean_pages + pack_pages; returns (prompt text, cleaning stats)."""
+    cleaned = clean_pages(pages)
+    return pack_pages(cleaned, max_chars), cleaned.stats
@@ -0,0 +1,180 @@
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# A table is named phrase groups plus ordered rules over them:
+#
+#   {"groups": {"delivery": ["deliver", "shipping"], "same_day": ["same day"]},
+#    "rules": [["Same-Day Delivery", ["delivery", "same_day"]],
+#              ["Delivery Area", ["delivery"]]],
+#    "default": ""}
+#
+# A group matches when any of its phrases occurs as a substring of the
+# lowercased text (the semantics of the `any(k in t for k in [...])` chains
+# these replace). A rule matches when all of its groups do; the first
+# matching rule gives the label.
+
+DEFAULT_TABLES: Dict[str, Dict] = {
+    # Clue for a customer / imported question.
+    "question_clue": {
+        "groups": {
+            "delivery": ["delivery", "ship"],
+            "pricing": ["price", "cost", "discount"],
+            "refunds": ["refund", "return", "warranty"],
+            "custom": ["custom", "bespoke"],
+        },
+        "rules": [
+            ["Delivery & shipping", ["delivery"]],
+            ["Pricing & discounts", ["pricing"]],
+            ["Refunds & warranty", ["refunds"]],
+            ["Custom orders", ["custom"]],
+        ],
+        "default": "General offering",
+    },
+    # Clue for a website-extracted Q/A pair (question + answer text).
+    "website_clue": {
+        "groups": {
+            "delivery": [
+                "same-day", "same day", "delivery", "deliver", "zip", "zipcode", "area",
+                "seattle", "p.s.t", "pst", "cutoff",
+            ],
+            "same_day": ["same-day", "same day", "cutoff", "by 12", "12pm"],
+            "ordering": ["place an order", "order", "buy", "purchase", "pickup", "pick up", "schedule", "book"],
+            "pickup": ["pickup", "pick up"],
+            "hours": ["hours", "open", "close", "closing", "opening"],
+            "contact": ["contact", "call", "phone", "email", "hotmail", "reach you"],
+            "pricing": ["price", "$", "cost", "range", "budget"],
+            "products": [
+                "bouquet", "arrangement", "flowers", "roses", "orchid", "carnation",
+                "chrysanthemum", "designer’s choice", "designer's choice", "teleflora",
+            ],
+        },
+        "rules": [
+            ["Same-Day Delivery", ["delivery", "same_day"]],
+            ["Delivery Area", ["delivery"]],
+            ["Pickup", ["ordering", "pickup"]],
+            ["Ordering Process", ["ordering"]],
+            ["Store Hours", ["hours"]],
+            ["Contact", ["contact"]],
+            ["Pricing", ["pricing"]],
+            ["Products & Bouquets", ["products"]],
+        ],
+        "default": "",
+    },
+    # Explicit order intent in a chat message.
+    "order_intent": {
+        "groups": {
+            "order": [
+                "order flowers", "place an order", "buy flowers", "buy some flowers",
+                "i want to order", "i would like to order", "i would like to place an order",
+                "can i place an order",
+            ],
+        },
+        "rules": [["order", ["order"]]],
+        "default": "",
+    },
+}
+
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    """Alternation factored into a prefix trie, so re tries each prefix once."""
+    trie: Dict = {}
+    for p in phrases:
+        node = trie
+        for ch in p:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        ends = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 and not ends else "(?:" + "|".join(branches) + ")"
+        return body + "?" if ends else body
+
+    return build(trie)
+
+
+class PhraseClassifier:
+    """
+    All phrase groups of a table compiled into one regex. A single scan
+    (a lookahead at every offset, longest phrase first) finds every phrase
+    occurrence; each matched phrase maps to the groups of all phrases it
+    contains, so overlapping / nested phrases are not missed.
+    """
+
+    def __init__(self, groups: Dict[str, Sequence[str]]):
+        by_phrase: Dict[str, Set[str]] = {}
+        for group, phrases in groups.items():
+            for p in phrases:
+                p = p.strip().lower()
+                if p:
+                    by_phrase.setdefault(p, set()).add(group)
+        self.groups = sorted(groups)
+        self._groups_for: Dict[str, frozenset] = {
+            p: frozenset().union(*(g for q, g in by_phrase.items() if q in p))
+            for p in by_phrase
+        }
+        self._regex = re.compile("(?=(" + _trie_pattern(by_phrase) + "))") if by_phrase else None
+
+    def classify(self, text: str) -> Set[str]:
+        """Names of every group with a phrase occurring in `text`."""
+        found: Set[str] = set()
+        if self._regex is None or not text:
+            return found
+        groups_for = self._groups_for
+        for phrase in set(self._regex.findall(text.lower())):
+            found |= groups_for[phrase]
+        return found
+
+
+class PhraseRules:
+    """A PhraseClassifier plus the ordered rules turning groups into labels."""
+
+    def __init__(self, groups: Dict[str, Sequence[str]], rules: Sequence[Sequence], default: str = ""):
+        self.classifier = PhraseClassifier(groups)
+        self.rules: List[Tuple[str, frozenset]] = []
+        for label, required in rules:
+            unknown = set(required) - set(groups)
+            if unknown:
+                raise ValueError(f"rule {label!r} uses unknown groups {sorted(unknown)}")
+            self.rules.append((label, frozenset(required)))
+        self.default = default
+
+    @classmethod
+    def from_dict(cls, table: Dict) -> "PhraseRules":
+        return cls(table.get("groups") or {}, table.get("rules") or [], table.get("default", ""))
+
+    def matches(self, text: str) -> List[str]:
+        """Labels of all matching rules, in rule order."""
+        found = self.classifier.classify(text)
+        return [label for label, required in self.rules if required <= found]
+
+    def label(self, text: str) -> str:
+        found = self.classifier.classify(text)
+        for label, required in self.rules:
+            if required <= found:
+                return label
+        return self.default
+
+    def test(self, text: str) -> bool:
+        """True if any rule matches."""
+        found = self.classifier.classify(text)
+        return any(required <= found for _, required in self.rules)
+
+
+def load_phrase_tables(path: Optional[str] = None) -> Dict[str, PhraseRules]:
+    """
+    DEFAULT_TABLES, with any table named in the JSON file at `path`
+    replacing the built-in one (so a business only lists what it changes).
+    """
+    tables = dict(DEFAULT_TABLES)
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+        if not isinstance(overrides, dict):
+            raise ValueError(f"{path}: expected an object of tables")
+        tables.update(overrides)
+    return {name: PhraseRules.from_dict(table) for name, table in tables.items()}
@@ -0,0 +1,251 @@
+from typing import Any, Dict, Hashable, Iterator, List, Tuple
+
+# Persistent hash array mapped trie: every set()/delete() returns a new map
+# that shares all untouched subtrees with the old one, so a change copies
+# one path of at most HASH_BITS / BITS nodes (O(log32 n) entries each).
+BITS = 5
+WIDTH = 1 << BITS
+MASK = WIDTH - 1
+HASH_BITS = 64
+_HASH_MASK = (1 << HASH_BITS) - 1
+
+MISSING = _MISSING = object()   # the absent side of a diff entry
+
+
+def _hash(key: Hashable) -> int:
+    return hash(key) & _HASH_MASK
+
+
+class _Leaf:
+    __slots__ = ("key", "value", "hash")
+
+    def __init__(self, key, value, h: int):
+        self.key = key
+        self.value = value
+        self.hash = h
+
+
+class _Collision:
+    """Keys whose full hashes are equal, below the last trie level."""
+
+    __slots__ = ("hash", "leaves")
+
+    def __init__(self, h: int, leaves: Tuple[_Leaf, ...]):
+        self.hash = h
+        self.leaves = leaves
+
+
+class _Branch:
+    __slots__ = ("bitmap", "entries")
+
+    def __init__(self, bitmap: int, entries: Tuple):
+        self.bitmap = bitmap
+        self.entries = entries  # _Leaf | _Branch | _Collision, in bit order
+
+
+_EMPTY_BRANCH = _Branch(0, ())
+
+
+def _index(bitmap: int, bit: int) -> int:
+    return bin(bitmap & (bit - 1)).count("1")
+
+
+def _merge_leaves(a: _Leaf, b: _Leaf, shift: int):
+    if shift >= HASH_BITS:
+        return _Collision(a.hash, (a, b))
+    ia = (a.hash >> shift) & MASK
+    ib = (b.hash >> shift) & MASK
+    if ia == ib:
+        return _Branch(1 << ia, (_merge_leaves(a, b, shift + BITS),))
+    if ia < ib:
+        return _Branch((1 << ia) | (1 << ib), (a, b))
+    return _Branch((1 << ia) | (1 << ib), (b, a))
+
+
+def _set(node, leaf: _Leaf, shift: int) -> Tuple[Any, bool]:
+    """(new node, whether a key was added)."""
+    if isinstance(node, _Collision):
+        for i, old in enumerate(node.leaves):
+            if old.key == leaf.key:
+                return _Collision(node.hash, node.leaves[:i] + (leaf,) + node.leaves[i + 1:]), False
+        return _Collision(node.hash, node.leaves + (leaf,)), True
+    bit = 1 << ((leaf.hash >> shift) & MASK)
+    idx = _index(node.bitmap, bit)
+    entries = node.entries
+    if not node.bitmap & bit:
+        return _Branch(node.bitmap | bit, entries[:idx] + (leaf,) + entries[idx:]), True
+    child = entries[idx]
+    if isinstance(child, _Leaf):
+        if child.key == leaf.key:
+            new_child, added = leaf, False
+        else:
+            new_child, added = _merge_leaves(child, leaf, shift + BITS), True
+    else:
+        new_child, added = _set(child, leaf, shift + BITS)
+    return _Branch(node.bitmap, entries[:idx] + (new_child,) + entries[idx + 1:]), added
+
+
+def _delete(node, key, h: int, shift: int):
+    """New node without `key` (None if it became empty), or `node` if absent."""
+    if isinstance(node, _Collision):
+        leaves = tuple(l for l in node.leaves if l.key != key)
+        if len(leaves) == len(node.leaves):
+            return node
+        return leaves[0] if len(leaves) == 1 else _Collision(node.hash, leaves)
+    bit = 1 << ((h >> shift) & MASK)
+    if not node.bitmap & bit:
+        return node
+    idx = _index(node.bitmap, bit)
+    child = node.entries[idx]
+    if isinstance(child, _Leaf):
+        if child.key != key:
+            return node
+        new_child = None
+    else:
+        new_child = _delete(child, key, h, shift + BITS)
+        if new_child is child:
+            return node
+    if new_child is None:
+        if node.bitmap == bit:
+            return None
+        return _Branch(node.bitmap & ~bit, node.entries[:idx] + node.entries[idx + 1:])
+    # A branch left holding a single leaf collapses into that leaf.
+    if isinstance(new_child, _Branch) and len(new_child.entries) == 1 and isinstance(new_child.entries[0], _Leaf):
+        new_child = new_child.entries[0]
+    return _Branch(node.bitmap, node.entries[:idx] + (new_child,) + node.entries[idx + 1:])
+
+
+def _build(leaves: List[_Leaf], shift: int):
+    """Trie over distinct-key leaves in one pass (no per-insert path copies)."""
+    if len(leaves) == 1 and shift:
+        return leaves[0]
+    if shift >= HASH_BITS:
+        return _Collision(leaves[0].hash, tuple(leaves))
+    buckets: Dict[int, List[_Leaf]] = {}
+    for leaf in leaves:
+        buckets.setdefault((leaf.hash >> shift) & MASK, []).append(leaf)
+    bitmap = 0
+    entries = []
+    for i in sorted(buckets):
+        bitmap |= 1 << i
+        entries.append(_build(buckets[i], shift + BITS))
+    return _Branch(bitmap, tuple(entries))
+
+
+def _leaves(node) -> Iterator[_Leaf]:
+    if isinstance(node, _Leaf):
+        yield node
+    elif isinstance(node, _Collision):
+        yield from node.leaves
+    else:
+        for entry in node.entries:
+            yield from _leaves(entry)
+
+
+def _diff(a, b, out: List[Tuple[Any, Any, Any]]) -> None:
+    if a is b:
+        return
+    if isinstance(a, _Branch) and isinstance(b, _Branch):
+        if a.bitmap == b.bitmap:
+            for ea, eb in zip(a.entries, b.entries):
+                if ea is not eb:
+                    _diff(ea, eb, out)
+            return
+        bits = a.bitmap | b.bitmap
+        while bits:
+            bit = bits & -bits
+            bits ^= bit
+            ea = a.entries[_index(a.bitmap, bit)] if a.bitmap & bit else None
+            eb = b.entries[_index(b.bitmap, bit)] if b.bitmap & bit else None
+            if ea is None:
+                out.extend((l.key, _MISSING, l.value) for l in _leaves(eb))
+            elif eb is None:
+                out.extend((l.key, l.value, _MISSING) for l in _leaves(ea))
+            else:
+                _diff(ea, eb, out)
+        return
+    # Differently shaped small subtrees (leaf vs branch, collisions): compare flat.
+    old = {l.key: l.value for l in _leaves(a)} if a is not None else {}
+    new = {l.key: l.value for l in _leaves(b)} if b is not None else {}
+    for key, value in old.items():
+        other = new.get(key, _MISSING)
+        if other is not value:
+            out.append((key, value, other))
+    for key, value in new.items():
+        if key not in old:
+            out.append((key, _MISSING, value))
+
+
+class PMap:
+    """Immutable str/hashable-keyed map with O(log n) set/delete and structural diff."""
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, _root: _Branch = _EMPTY_BRANCH, _size: int = 0):
+        self._root = _root
+        self._size = _size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __iter__(self) -> Iterator:
+        return (l.key for l in _leaves(self._root))
+
+    def get(self, key, default=None):
+        h = _hash(key)
+        node, shift = self._root, 0
+        while True:
+            if isinstance(node, _Leaf):
+                return node.value if node.key == key else default
+            if isinstance(node, _Collision):
+                for l in node.leaves:
+                    if l.key == key:
+                        return l.value
+                return default
+            bit = 1 << ((h >> shift) & MASK)
+            if not node.bitmap & bit:
+                return default
+            node = node.entries[_index(node.bitmap, bit)]
+            shift += BITS
+
+    def set(self, key, value) -> "PMap":
+        root, added = _set(self._root, _Leaf(key, value, _hash(key)), 0)
+        return PMap(root, self._size + (1 if added else 0))
+
+    def delete(self, key) -> "PMap":
+        root = _delete(self._root, key, _hash(key), 0)
+        if root is self._root:
+            return self
+        return PMap(root if root is not None else _EMPTY_BRANCH, self._size - 1)
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        return ((l.key, l.value) for l in _leaves(self._root))
+
+    def values(self) -> Iterator:
+        return (l.value for l in _leaves(self._root))
+
+    def to_dict(self) -> Dict:
+        return dict(self.items())
+
+    def diff(self, other: "PMap") -> List[Tuple[Any, Any, Any]]:
+        """
+        (key, value here, value in other) for every key whose value object
+        differs; an absent side is MISSING. Shared subtrees are skipped, so
+        the cost follows the number of changes, not the map size.
+        """
+        out: List[Tuple[Any, Any, Any]] = []
+        _diff(self._root, other._root, out)
+        return out
+
+    @staticmethod
+    def from_items(items) -> "PMap":
+        """Map of (key, value) pairs built in O(n); later duplicates win."""
+        by_key = dict(items)
+        if not by_key:
+            return PMap()
+        leaves = [_Leaf(k, v, _hash(k)) for k, v in by_key.items()]
+        return PMap(_build(leaves, 0), len(leaves))
+
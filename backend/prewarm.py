@@ -0,0 +1,288 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from graph_model import MemoryGraph, Node
+from metrics import Counter
+
+WARM_CACHE_LOOKUPS = Counter(
+    "nema_warm_cache_lookups_total",
+    "TTS / routing cache lookups, by cache and result (hit | miss).",
+    ["cache", "result"],
+)
+PREWARM_ITEMS = Counter(
+    "nema_prewarm_items_total",
+    "Items handled by the pre-warm stage, by kind (tts | route) and result (warmed | cached | failed).",
+    ["kind", "result"],
+)
+
+
+class TTSCache:
+    """Synthesized audio keyed by request_key("tts", model, voice, text); LRU by total bytes."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._audio: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            audio = self._audio.get(key)
+            if audio is not None:
+                self._audio.move_to_end(key)
+        WARM_CACHE_LOOKUPS.inc(cache="tts", result="hit" if audio is not None else "miss")
+        return audio
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._audio.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._audio[key] = audio
+            self._bytes += len(audio)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._audio.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._audio), "bytes": self._bytes}
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+@dataclass
+class _Route:
+    question_id: str
+    generation: int
+    hits: int = 0
+
+
+class RouteCache:
+    """
+    Routed question id per (normalized) user question, with hit counts.
+    invalidate() marks every entry stale (the candidate set changed); stale
+    entries miss until re-routed, hottest first, by the pre-warm stage.
+    """
+
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._routes: "OrderedDict[str, _Route]" = OrderedDict()
+        self._generation = 0
+
+    def get(self, text: str, graph: MemoryGraph) -> Optional[str]:
+        key = normalize_query(text)
+        with self._lock:
+            route = self._routes.get(key)
+            if route is not None:
+                route.hits += 1
+                self._routes.move_to_end(key)
+            fresh = route is not None and route.generation == self._generation
+        node = graph.nodes.get(route.question_id) if fresh else None
+        hit = node is not None and node.type == "question"
+        WARM_CACHE_LOOKUPS.inc(cache="route", result="hit" if hit else "miss")
+        return route.question_id if hit else None
+
+    def put(self, text: str, question_id: str) -> None:
+        key = normalize_query(text)
+        with self._lock:
+            route = self._routes.get(key)
+            hits = route.hits if route is not None else 0
+            self._routes[key] = _Route(question_id, self._generation, hits)
+            self._routes.move_to_end(key)
+            while len(self._routes) > self.max_entries:
+                self._routes.popitem(last=False)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+
+    def stale(self, limit: int) -> List[str]:
+        """Normalized texts of up to `limit` stale entries, most hits first."""
+        with self._lock:
+            stale = [(r.hits, text) for text, r in self._routes.items() if r.generation != self._generation]
+        return [text for _, text in heapq.nlargest(limit, stale)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stale = sum(1 for r in self._routes.values() if r.generation != self._generation)
+            return {"entries": len(self._routes), "stale": stale}
+
+
+def hot_answers(graph: MemoryGraph, limit: int, min_views: float = 1.0) -> List[Node]:
+    """Answer nodes served at least `min_views` times, most viewed first."""
+    answers = [n for n in graph.query_nodes(type="answer") if n.stats.get("views", 0.0) >= min_views]
+    return heapq.nlargest(limit, answers, key=lambda n: n.stats.get("views", 0.0))
+
+
+@dataclass
+class PrewarmReport:
+    reason: str
+    started_at: float
+    seconds: float = 0.0
+    counts: Dict[str, int] = field(default_factory=lambda: {
+        "routes_warmed": 0, "routes_failed": 0,
+        "tts_warmed": 0, "tts_cached": 0, "tts_failed": 0,
+    })
+    aborted: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return dict(self.__dict__)
+
+
+class Prewarmer:
+    """
+    Background stage run after content changes (ingest, answer edits,
+    imports): re-routes the hottest stale routing entries, then synthesizes
+    audio for the most viewed answers that are not cached, so the first
+    live caller after a change hits warm caches.
+
+    Upstream calls are paced to `rate_per_s`; a pass stops at the first
+    failure that looks like an upstream outage instead of hammering it.
+    """
+
+    def __init__(
+        self,
+        get_graph: Callable[[], MemoryGraph],
+        tts_cache: TTSCache,
+        tts_key: Callable[[str], str],
+        synthesize: Callable[[str], bytes],
+        route_cache: RouteCache,
+        route: Callable[[str], Optional[str]],
+        top_answers: int = 50,
+        top_routes: int = 100,
+        rate_per_s: float = 2.0,
+        is_outage: Callable[[Exception], bool] = lambda e: False,
+    ):
+        self.get_graph = get_graph
+        self.tts_cache = tts_cache
+        self.tts_key = tts_key
+        self.synthesize = synthesize
+        self.route_cache = route_cache
+        self.route = route
+        self.top_answers = top_answers
+        self.top_routes = top_routes
+        self.rate_per_s = rate_per_s
+        self.is_outage = is_outage
+        self._lock = threading.Lock()
+        self._pending: List[str] = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._next_call = 0.0
+        self.last: Optional[PrewarmReport] = None
+
+    def schedule(self, reason: str, invalidate_routes: bool = False) -> None:
+        """Queue a pass; requests arriving while one runs fold into the next."""
+        if invalidate_routes:
+            self.route_cache.invalidate()
+        with self._lock:
+            self._pending.append(reason)
+        self._wake.set()
+
+    def run(self, reason: str = "manual") -> PrewarmReport:
+        report = PrewarmReport(reason=reason, started_at=time.time())
+        t0 = time.perf_counter()
+        try:
+            self._warm_routes(report)
+            self._warm_tts(report)
+        except _Abort as e:
+            report.aborted = str(e)
+        report.seconds = round(time.perf_counter() - t0, 3)
+        self.last = report
+        return report
+
+    def _warm_routes(self, report: PrewarmReport) -> None:
+        for text in self.route_cache.stale(self.top_routes):
+            self._pace()
+            try:
+                question_id = self.route(text)
+            except Exception as e:
+                self._failed(report, "route", e)
+                continue
+            if question_id:
+                self.route_cache.put(text, question_id)
+                report.counts["routes_warmed"] += 1
+                PREWARM_ITEMS.inc(kind="route", result="warmed")
+
+    def _warm_tts(self, report: PrewarmReport) -> None:
+        for answer in hot_answers(self.get_graph(), self.top_answers):
+            text = answer.text or ""
+            if not text.strip():
+                continue
+            if self.tts_key(text) in self.tts_cache:
+                report.counts["tts_cached"] += 1
+                PREWARM_ITEMS.inc(kind="tts", result="cached")
+                continue
+            self._pace()
+            try:
+                self.synthesize(text)  # fills tts_cache
+            except Exception as e:
+                self._failed(report, "tts", e)
+                continue
+            report.counts["tts_warmed"] += 1
+            PREWARM_ITEMS.inc(kind="tts", result="warmed")
+
+    def _failed(self, report: PrewarmReport, kind: str, error: Exception) -> None:
+        report.counts[f"{kind}_failed"] += 1
+        PREWARM_ITEMS.inc(kind=kind, result="failed")
+        if self.is_outage(error):
+            raise _Abort(f"{kind}: {error!r}")
+
+    def _pace(self) -> None:
+        if self.rate_per_s <= 0:
+            return
+        delay = self._next_call - time.monotonic()
+        if delay > 0 and self._stop.wait(delay):
+            raise _Abort("stopped")
+        self._next_call = max(self._next_call, time.monotonic()) + 1.0 / self.rate_per_s
+
+    # ----- background worker -----
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="nema-bg-prewarm", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def _loop(self) -> None:
+        while True:
+            self._wake.wait()
+            if self._stop.is_set():
+                return
+            self._wake.clear()
+            with self._lock:
+                reasons, self._pending = self._pending, []
+            if not reasons:
+                continue
+            try:
+                report = self.run(", ".join(dict.fromkeys(reasons)))
+                print(f"🔥 Pre-warm: {report.to_dict()}")
+            except Exception as e:
+                print("Pre-warm error:", repr(e))
+
+
+class _Abort(Exception):
+    pass
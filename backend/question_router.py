@@ -0,0 +1,56 @@
+import json
+from typing import Dict, Iterable, Optional
+
+from graph_model import Node
+
+ROUTER_MODEL = "gpt-4.1-mini"
+
+ROUTER_SYSTEM_PROMPT = """
+You are a router for a knowledge graph of Q&A.
+
+You will be given:
+- user_question: the actual question from the user
+- candidates: a list of known question nodes, each with an id and question text
+
+You MUST choose ONE of the candidate ids that best matches the user question,
+or "NONE" if none are relevant.
+
+Return STRICTLY valid JSON:
+{ "best_id": "...", "confidence": 0.0 }
+""".strip()
+
+
+def router_request(user_question: str, question_nodes: Iterable[Node]) -> Dict:
+    """chat.completions.create params for routing `user_question` among `question_nodes`."""
+    payload = {
+        "user_question": user_question,
+        "candidates": [{"id": n.id, "question": n.text or n.label or ""} for n in question_nodes],
+    }
+    return {
+        "model": ROUTER_MODEL,
+        "messages": [
+            {"role": "system", "content": ROUTER_SYSTEM_PROMPT},
+            {"role": "user", "content": json.dumps(payload, ensure_ascii=False)},
+        ],
+        "temperature": 0.0,
+        "max_tokens": 256,
+    }
+
+
+def parse_router_reply(content: str) -> Optional[str]:
+    """The chosen question id, or None for NONE / an unparseable reply."""
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        try:
+            start = content.index("{")
+            end = content.rindex("}") + 1
+            data = json.loads(content[start:end])
+        except Exception:
+            return None
+    if not isinstance(data, dict):
+        return None
+    best_id = str(data.get("best_id") or "").strip()
+    if not best_id or best_id.upper() == "NONE":
+        return None
+    return best_id
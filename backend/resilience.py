@@ -0,0 +1,308 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, Optional, TypeVar
+
+from metrics import Counter, Gauge, Histogram
+
+T = TypeVar("T")
+
+DEADLINE_HEADER = "x-request-deadline-ms"
+
+# Finer than the default buckets: the hedge delay is interpolated from these.
+UPSTREAM_BUCKETS = (
+    0.025, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0,
+    1.25, 1.5, 1.75, 2.0, 2.5, 3.0, 4.0, 5.0, 7.5, 10.0, 15.0, 30.0, 60.0,
+)
+
+UPSTREAM_SECONDS = Histogram(
+    "nema_upstream_seconds",
+    "Latency of one successful upstream attempt, by kind (feeds the hedge delay).",
+    ["kind"],
+    buckets=UPSTREAM_BUCKETS,
+)
+UPSTREAM_FAILURES = Counter(
+    "nema_upstream_failures_total",
+    "Upstream calls that failed, by kind and reason (error, deadline, circuit_open).",
+    ["kind", "reason"],
+)
+HEDGED_CALLS = Counter(
+    "nema_hedged_calls_total",
+    "Hedge attempts fired after the p95 delay, and how many of them won.",
+    ["kind", "outcome"],
+)
+CIRCUIT_STATE = Gauge(
+    "nema_circuit_state",
+    "Circuit breaker state: 0 closed, 1 half-open, 2 open.",
+    ["upstream"],
+)
+
+
+class UpstreamUnavailable(RuntimeError):
+    """The upstream call did not produce a result; callers should degrade."""
+
+
+class DeadlineExceeded(UpstreamUnavailable):
+    def __init__(self, message: str = "", caller_deadline: bool = False):
+        super().__init__(message)
+        # The time ran out on the calling request's own deadline rather than
+        # the call policy's timeout; another caller may still get an answer.
+        self.caller_deadline = caller_deadline
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    pass
+
+
+# ---------- deadlines ----------
+
+_DEADLINE: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "nema_request_deadline", default=None
+)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline (None = no deadline)."""
+    deadline = _DEADLINE.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """Narrow the current deadline to at most `seconds` from now."""
+    new = time.monotonic() + seconds
+    current = _DEADLINE.get()
+    token = _DEADLINE.set(new if current is None else min(current, new))
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware: a caller with its own budget (the voice orchestrator)
+    sends `X-Request-Deadline-Ms: <remaining ms>`; upstream calls made while
+    serving the request never wait past it.
+    """
+
+    def __init__(self, app, default_seconds: Optional[float] = None):
+        self.app = app
+        self.default_seconds = default_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        seconds = self.default_seconds
+        raw = dict(scope.get("headers") or []).get(DEADLINE_HEADER.encode("latin-1"))
+        if raw:
+            try:
+                seconds = max(0.0, float(raw) / 1000.0)
+            except ValueError:
+                pass
+
+        if seconds is None:
+            await self.app(scope, receive, send)
+            return
+        with deadline(seconds):
+            await self.app(scope, receive, send)
+
+
+# ---------- circuit breaker ----------
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and fails fast for
+    `reset_timeout` seconds; then lets a single probe through (half-open) and
+    closes again if it succeeds.
+    """
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+    _GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._set_state(self.CLOSED)
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._set_state(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self._set_state(self.CLOSED)
+
+    def record_inconclusive(self) -> None:
+        """The call told us nothing about upstream health (the caller gave up); free the probe."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        CIRCUIT_STATE.set(self._GAUGE[state], upstream=self.name)
+
+
+# ---------- hedged calls ----------
+
+
+@dataclass
+class CallPolicy:
+    timeout: float        # per-call cap in seconds, further bounded by the request deadline
+    hedge: bool = False   # safe to issue a duplicate (idempotent, cheap)
+
+
+class ResilientCaller:
+    """
+    Runs upstream calls under a deadline, hedges slow idempotent ones and
+    trips a shared circuit breaker.
+
+    `fn` receives the seconds it may still use and should pass them on as the
+    client timeout, so abandoned attempts (timed out, or a losing hedge) end
+    on their own.
+
+    Upstream errors that `counts_as_failure` accepts surface as
+    UpstreamUnavailable; others (our own bad requests) are re-raised as is.
+
+    Hedging: if the first attempt has not answered after the observed p95 for
+    its kind, a second identical attempt is fired and the first to succeed wins.
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        policies: Dict[str, CallPolicy],
+        default_policy: CallPolicy = CallPolicy(timeout=30.0),
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+        hedge_min_delay: float = 0.05,
+        hedge_default_delay: float = 1.0,
+        max_workers: int = 64,
+        counts_as_failure: Callable[[BaseException], bool] = lambda e: True,
+    ):
+        self.breaker = breaker
+        self.policies = policies
+        self.default_policy = default_policy
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_default_delay = hedge_default_delay
+        self.counts_as_failure = counts_as_failure
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nema-upstream")
+
+    def hedge_delay(self, kind: str) -> float:
+        if UPSTREAM_SECONDS.count(kind=kind) < self.hedge_min_samples:
+            return self.hedge_default_delay
+        q = UPSTREAM_SECONDS.quantile(self.hedge_quantile, kind=kind)
+        return max(self.hedge_min_delay, q if q is not None else self.hedge_default_delay)
+
+    def call(self, kind: str, fn: Callable[[float], T]) -> T:
+        policy = self.policies.get(kind, self.default_policy)
+        budget = policy.timeout
+        left = remaining()
+        # Cut short by the caller's own deadline: running out of time then is
+        # the caller's impatience, not upstream ill health, so the breaker
+        # doesn't count it.
+        caller_bound = left is not None and left < budget
+        if caller_bound:
+            budget = left
+        if budget <= 0:
+            UPSTREAM_FAILURES.inc(kind=kind, reason="deadline")
+            raise DeadlineExceeded(f"{kind}: request deadline already passed", caller_deadline=True)
+        if not self.breaker.allow():
+            UPSTREAM_FAILURES.inc(kind=kind, reason="circuit_open")
+            raise CircuitOpenError(f"{kind}: {self.breaker.name} circuit open")
+
+        end = time.monotonic() + budget
+        try:
+            result = self._run(kind, fn, end, policy.hedge)
+        except DeadlineExceeded as e:
+            UPSTREAM_FAILURES.inc(kind=kind, reason="deadline")
+            if caller_bound:
+                e.caller_deadline = True
+                self.breaker.record_inconclusive()
+            else:
+                self.breaker.record_failure()
+            raise
+        except Exception as e:
+            if caller_bound and time.monotonic() >= end:
+                # Client-side timeout at the budget we passed down, i.e. the caller's deadline.
+                UPSTREAM_FAILURES.inc(kind=kind, reason="deadline")
+                self.breaker.record_inconclusive()
+                raise DeadlineExceeded(f"{kind}: request deadline passed: {e!r}", caller_deadline=True) from e
+            UPSTREAM_FAILURES.inc(kind=kind, reason="error")
+            if not self.counts_as_failure(e):
+                self.breaker.record_success()
+                raise
+            self.breaker.record_failure()
+            raise UpstreamUnavailable(f"{kind}: {e!r}") from e
+        self.breaker.record_success()
+        return result
+
+    def _submit(self, kind: str, fn: Callable[[float], T], end: float) -> Future:
+        def attempt() -> T:
+            t0 = time.monotonic()
+            result = fn(max(0.001, end - t0))
+            UPSTREAM_SECONDS.observe(time.monotonic() - t0, kind=kind)
+            return result
+
+        return self._pool.submit(attempt)
+
+    def _run(self, kind: str, fn: Callable[[float], T], end: float, hedge: bool) -> T:
+        first = self._submit(kind, fn, end)
+        pending = {first}
+        if hedge:
+            delay = self.hedge_delay(kind)
+            if delay < end - time.monotonic():
+                done, _ = wait(pending, timeout=delay)
+                if not done:
+                    HEDGED_CALLS.inc(kind=kind, outcome="fired")
+                    pending.add(self._submit(kind, fn, end))
+
+        error: Optional[BaseException] = None
+        while pending:
+            left = end - time.monotonic()
+            if left <= 0:
+                break
+            done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None:
+                    if f is not first:
+                        HEDGED_CALLS.inc(kind=kind, outcome="won")
+                    return f.result()
+                error = f.exception()
+        if error is not None and not pending:
+            raise error
+        raise DeadlineExceeded(f"{kind}: no upstream answer within the deadline")
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+
+@dataclass
+class Session:
+    id: str
+    turns: List[Dict] = field(default_factory=list)
+    # Number of turns trimmed off the front by the per-session turn cap.
+    dropped: int = 0
+    # Absolute index of the first turn not yet built into the graph whose
+    # MemoryGraph.uid is cursor_graph; for any other graph nothing is built yet.
+    cursor: int = 0
+    cursor_graph: Optional[str] = None
+    last_access: float = field(default_factory=time.time)
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    def start(self, graph_uid: str) -> int:
+        """Absolute index of the first turn still to be built into graph `graph_uid`."""
+        cursor = self.cursor if self.cursor_graph == graph_uid else 0
+        return max(cursor, self.dropped)
+
+    def pending_turns(self, graph_uid: str) -> List[Dict]:
+        return self.turns[self.start(graph_uid) - self.dropped:]
+
+
+class SessionStore:
+    """
+    Bounded store for Build/Update Graph transcripts.
+
+      - each session keeps at most `max_turns` turns (oldest trimmed first)
+      - sessions idle for longer than `ttl_seconds` are dropped
+      - at most `max_sessions` stay in memory; the least recently used one is
+        evicted, and written to `spill_dir` first if one is configured
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        max_turns: int = 200,
+        ttl_seconds: float = 6 * 3600,
+        spill_dir: Optional[str] = None,
+    ):
+        self.max_sessions = max_sessions
+        self.max_turns = max_turns
+        self.ttl_seconds = ttl_seconds
+        self.spill_dir = spill_dir
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.RLock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    # ----- public API -----
+
+    def get(self, session_id: str) -> Optional[Session]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._load_spilled(session_id)
+                if session is None:
+                    return None
+                self._sessions[session_id] = session
+            if self._expired(session, time.time()):
+                self._drop(session_id)
+                return None
+            self._sessions.move_to_end(session_id)
+            session.last_access = time.time()
+            self._evict()
+            return session
+
+    def append(self, session_id: str, turn: Dict) -> Session:
+        with self._lock:
+            session = self.get(session_id)
+            if session is None:
+                session = Session(id=session_id)
+                self._sessions[session_id] = session
+            session.turns.append(turn)
+            overflow = len(session.turns) - self.max_turns
+            if overflow > 0:
+                del session.turns[:overflow]
+                session.dropped += overflow
+            session.last_access = time.time()
+            self._evict()
+            return session
+
+    def advance_cursor(self, session_id: str, cursor: int, graph_uid: str) -> None:
+        with self._lock:
+            session = self.get(session_id)
+            if session is None:
+                return
+            if session.cursor_graph != graph_uid:
+                session.cursor, session.cursor_graph = cursor, graph_uid
+            else:
+                session.cursor = max(session.cursor, cursor)
+
+    def clear(self) -> None:
+        with self._lock:
+            for session_id in list(self._sessions):
+                self._drop(session_id)
+            if self.spill_dir:
+                for name in os.listdir(self.spill_dir):
+                    if name.endswith(".json"):
+                        try:
+                            os.remove(os.path.join(self.spill_dir, name))
+                        except OSError:
+                            pass
+
+    # ----- eviction -----
+
+    def _expired(self, session: Session, now: float) -> bool:
+        return now - session.last_access > self.ttl_seconds
+
+    def _evict(self) -> None:
+        now = time.time()
+        # OrderedDict is kept in LRU order, so expired sessions sit at the front.
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if self._expired(session, now):
+                self._drop(session_id)
+            elif len(self._sessions) > self.max_sessions:
+                self._sessions.pop(session_id)
+                self._spill(session)
+            else:
+                break
+
+    def _drop(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+        path = self._spill_path(session_id)
+        if path and os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    # ----- disk spill -----
+
+    def _spill_path(self, session_id: str) -> Optional[str]:
+        if not self.spill_dir:
+            return None
+        digest = hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.spill_dir, f"{digest}.json")
+
+    def _spill(self, session: Session) -> None:
+        path = self._spill_path(session.id)
+        if not path:
+            return
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(session), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _load_spilled(self, session_id: str) -> Optional[Session]:
+        path = self._spill_path(session_id)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            os.remove(path)
+        except (OSError, ValueError):
+            return None
+        return Session(**data)
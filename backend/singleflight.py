@@ -0,0 +1,86 @@
+import hashlib
+import json
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, TypeVar
+
+from metrics import Counter
+from resilience import DeadlineExceeded, remaining
+
+T = TypeVar("T")
+
+UPSTREAM_CALLS = Counter(
+    "nema_upstream_calls_total",
+    "Upstream (OpenAI) calls actually issued, by kind.",
+    ["kind"],
+)
+COALESCED_CALLS = Counter(
+    "nema_coalesced_calls_total",
+    "Calls that shared an identical in-flight upstream call instead of issuing one.",
+    ["kind"],
+)
+
+
+def request_key(*parts: Any) -> str:
+    """Stable hash of a call's inputs (model, messages, voice, text, ...)."""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls: the first caller for a key runs `fn`,
+    everyone arriving while it is in flight waits for and shares its result
+    (or exception). Nothing is cached once the call completes.
+
+    Followers wait no longer than their own request deadline (resilience.remaining())
+    and then raise DeadlineExceeded; the leader's call carries on for the others.
+    A shared call that ran out of the *leader's* request deadline is not passed
+    on: followers with time left retry, one of them leading a fresh call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], T], kind: str = "call") -> T:
+        while True:
+            with self._lock:
+                future = self._inflight.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._inflight[key] = future
+            if leader:
+                break
+
+            COALESCED_CALLS.inc(kind=kind)
+            left = remaining()
+            try:
+                return future.result(timeout=None if left is None else max(0.0, left))
+            except FutureTimeout:
+                raise DeadlineExceeded(
+                    f"{kind}: request deadline passed waiting on a shared call", caller_deadline=True
+                ) from None
+            except DeadlineExceeded as e:
+                left = remaining()
+                if not e.caller_deadline or (left is not None and left <= 0):
+                    raise
+
+        UPSTREAM_CALLS.inc(kind=kind)
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future)
+            future.set_exception(e)
+            raise
+        self._finish(key, future)
+        future.set_result(result)
+        return result
+
+    def _finish(self, key: str, future: Future) -> None:
+        # Unregister before resolving, so a follower retrying after the result
+        # starts a fresh call instead of finding this finished one.
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
@@ -0,0 +1,99 @@
+import base64
+import bisect
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from graph_model import Edge, MemoryGraph
+
+TaskKey = Tuple[float, str]  # (-priority, edge_id): ascending = most valuable first
+
+
+def review_priority(edge: Edge) -> float:
+    """
+    How useful it is for the owner to review this edge, in [0, 1].
+    Uncertain (~0.5) and low-confidence edges rank first; each piece of
+    feedback already received lowers the priority.
+    """
+    c = min(max(edge.confidence, 0.0), 1.0)
+    uncertainty = 1.0 - abs(2.0 * c - 1.0)
+    views = (edge.metadata.get("feedback") or {}).get("views", 0.0)
+    return (uncertainty + (1.0 - c)) / (2.0 * (1.0 + views))
+
+
+def encode_cursor(key: TaskKey) -> str:
+    raw = f"{key[0]!r}|{key[1]}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> TaskKey:
+    raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    score, edge_id = raw.split("|", 1)
+    return float(score), edge_id
+
+
+class TaskIndex:
+    """
+    Sorted index of `answers` edges by review priority.
+
+    Kept in sync with the graph through MemoryGraph.changes_since, so feedback
+    on one edge re-slots only that edge. A page is a bisect plus a slice.
+    """
+
+    edge_type = "answers"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._graph: Optional[MemoryGraph] = None
+        self._version = 0
+        self._keys: List[TaskKey] = []
+        self._key_by_edge: Dict[str, TaskKey] = {}
+
+    def page(
+        self, graph: MemoryGraph, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Tuple[List[str], Optional[str]]:
+        """
+        Returns (edge ids, next cursor). `cursor` is the value returned by the
+        previous page; raises ValueError if it cannot be decoded.
+        """
+        with self._lock:
+            self._sync(graph)
+            start = 0
+            if cursor:
+                start = bisect.bisect_right(self._keys, decode_cursor(cursor))
+            end = len(self._keys) if limit is None else start + limit
+            keys = self._keys[start:end]
+            next_cursor = encode_cursor(keys[-1]) if keys and end < len(self._keys) else None
+            return [edge_id for _, edge_id in keys], next_cursor
+
+    # ----- maintenance -----
+
+    def _sync(self, graph: MemoryGraph) -> None:
+        changes = graph.changes_since(self._version) if graph is self._graph else None
+        if changes is None:
+            self._rebuild(graph)
+            return
+        for edge_id in changes[1]:
+            self._remove(edge_id)
+            edge = graph.edges.get(edge_id)
+            if edge is not None and edge.type == self.edge_type:
+                key = (-review_priority(edge), edge_id)
+                bisect.insort(self._keys, key)
+                self._key_by_edge[edge_id] = key
+        self._version = graph.version
+
+    def _rebuild(self, graph: MemoryGraph) -> None:
+        self._key_by_edge = {
+            e.id: (-review_priority(e), e.id)
+            for e in graph.query_edges(type=self.edge_type)
+        }
+        self._keys = sorted(self._key_by_edge.values())
+        self._graph = graph
+        self._version = graph.version
+
+    def _remove(self, edge_id: str) -> None:
+        key = self._key_by_edge.pop(edge_id, None)
+        if key is None:
+            return
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
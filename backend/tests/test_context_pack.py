@@ -0,0 +1,34 @@
+from uuid import uuid4
+
+from context_pack import build_context_pack
+from graph_model import Edge, MemoryGraph
+
+
+def _graph() -> MemoryGraph:
+    g = MemoryGraph()
+    q = g.find_or_create_question("Do you deliver on Sundays?", "sales-agent")
+    a = g.find_or_create_answer("Yes, Sunday delivery is $15.", "sales-agent")
+    g.add_edge(Edge(id=str(uuid4()), source=q.id, target=a.id, type="answers", confidence=0.8))
+    return g
+
+
+def test_pack_depends_on_content_only():
+    g = _graph()
+    first = build_context_pack(g, 2000)
+    assert g.uid[:8] not in first.text
+
+    g.uid = uuid4().hex                        # restart / rollback
+    g.update_node_metadata(next(iter(g.nodes)), reviewed=True)   # write that doesn't touch the pack
+    second = build_context_pack(g, 2000)
+    assert second.graph_version != first.graph_version
+    assert (second.text, second.etag) == (first.text, first.etag)
+
+    other = build_context_pack(_graph(), 2000)   # another worker, same knowledge base
+    assert other.etag == first.etag
+
+
+def test_pack_changes_with_content():
+    g = _graph()
+    before = build_context_pack(g, 2000)
+    g.find_or_create_action("Take order", "Collect customer details.", "sales-agent")
+    assert build_context_pack(g, 2000).etag != before.etag
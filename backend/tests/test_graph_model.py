@@ -0,0 +1,21 @@
+from uuid import uuid4
+
+from graph_model import Edge, MemoryGraph
+
+
+def _answers(g: MemoryGraph, question_id: str, answer_id: str) -> Edge:
+    return g.add_edge(Edge(id=str(uuid4()), source=question_id, target=answer_id, type="answers"))
+
+
+def test_edges_from_and_to_keep_insertion_order():
+    g = MemoryGraph()
+    q = g.find_or_create_question("Do you deliver on Sundays?", "sales-agent")
+    answers = [g.find_or_create_answer(f"Answer number {i} about Sunday delivery.", "sales-agent") for i in range(20)]
+    edges = [_answers(g, q.id, a.id) for a in answers]
+
+    assert [e.id for e in g.edges_from(q.id, "answers")] == [e.id for e in edges]
+    assert g.edges_to(answers[3].id) == [edges[3]]
+
+    g.remove_edge(edges[0].id)
+    _answers(g, q.id, answers[0].id)
+    assert [e.target for e in g.edges_from(q.id)] == [a.id for a in answers[1:]] + [answers[0].id]
@@ -0,0 +1,36 @@
+import pytest
+
+from graph_model import MemoryGraph
+
+DISTINCT_QUESTIONS = [
+    ("When do you deliver?", "Where do you deliver?"),
+    ("How do I place an order?", "When can I place an order?"),
+    ("Where is your store?", "What is your store?"),
+    ("Do you deliver?", "Where do you deliver?"),
+    ("Do you offer same day delivery in Seattle?", "Do you not offer same day delivery in Seattle?"),
+    ("Do you deliver within 5 miles?", "Do you deliver within 10 miles?"),
+]
+
+
+@pytest.mark.parametrize("first, second", DISTINCT_QUESTIONS)
+def test_distinct_questions_are_not_folded(first, second):
+    g = MemoryGraph()
+    a = g.find_or_create_question(first, "sales-agent")
+    b = g.find_or_create_question(second, "sales-agent")
+    assert a.id != b.id
+    assert "aliases" not in a.metadata
+
+
+def test_paraphrase_is_folded_into_alias():
+    g = MemoryGraph()
+    a = g.find_or_create_question("Do you offer same day delivery in Seattle?", "sales-agent")
+    b = g.find_or_create_question("do you offer same-day delivery in seattle", "sales-agent")
+    assert a.id == b.id
+    assert g.find_node("question", "do you offer same-day delivery in seattle") is a
+
+
+def test_answers_are_never_folded():
+    g = MemoryGraph()
+    a = g.find_or_create_answer("We accept returns within thirty days of purchase with a receipt.", "sales-agent")
+    b = g.find_or_create_answer("We do not accept returns within thirty days of purchase with a receipt.", "sales-agent")
+    assert a.id != b.id
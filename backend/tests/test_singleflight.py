@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+from resilience import CallPolicy, CircuitBreaker, DeadlineExceeded, ResilientCaller, deadline
+from singleflight import SingleFlight
+
+
+def _slow(seconds: float):
+    def fn(timeout: float) -> str:
+        time.sleep(min(seconds, timeout))
+        if timeout < seconds:
+            raise TimeoutError("client timeout")
+        return "answer"
+
+    return fn
+
+
+def test_leader_deadline_is_not_shared_with_followers():
+    flights = SingleFlight()
+    upstream = ResilientCaller(CircuitBreaker("test"), {"chat": CallPolicy(timeout=5.0)})
+    calls = []
+
+    def call():
+        calls.append(time.monotonic())
+        return upstream.call("chat", _slow(0.3))
+
+    results = {}
+
+    def leader():
+        with deadline(0.05):
+            try:
+                results["leader"] = flights.do("k", call, kind="chat")
+            except DeadlineExceeded as e:
+                results["leader"] = e
+
+    t = threading.Thread(target=leader)
+    t.start()
+    time.sleep(0.01)
+    results["follower"] = flights.do("k", call, kind="chat")   # no deadline of its own
+    t.join()
+
+    assert isinstance(results["leader"], DeadlineExceeded)
+    assert results["follower"] == "answer"
+    assert len(calls) == 2
+
+
+def test_follower_gives_up_at_its_own_deadline():
+    flights = SingleFlight()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        time.sleep(0.3)
+        return "answer"
+
+    t = threading.Thread(target=lambda: flights.do("k", slow))
+    t.start()
+    started.wait()
+    t0 = time.monotonic()
+    with deadline(0.05), pytest.raises(DeadlineExceeded):
+        flights.do("k", slow)
+    assert time.monotonic() - t0 < 0.2
+    t.join()
+
+
+def test_policy_timeout_is_shared_without_retry():
+    flights = SingleFlight()
+    upstream = ResilientCaller(CircuitBreaker("test"), {"chat": CallPolicy(timeout=0.05)})
+    calls = []
+
+    def call():
+        calls.append(1)
+        return upstream.call("chat", lambda timeout: time.sleep(0.3))
+
+    errors = []
+
+    def leader():
+        try:
+            flights.do("k", call, kind="chat")
+        except DeadlineExceeded as e:
+            errors.append(e)
+
+    t = threading.Thread(target=leader)
+    t.start()
+    time.sleep(0.01)
+    with pytest.raises(DeadlineExceeded) as follower_error:
+        flights.do("k", call, kind="chat")
+    t.join()
+
+    assert len(calls) == 1
+    assert len(errors) == 1 and not errors[0].caller_deadline
+    assert not follower_error.value.caller_deadline
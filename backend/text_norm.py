@@ -0,0 +1,25 @@
+import re
+from typing import List, Set
+
+STOPWORDS = {
+    "a", "an", "and", "any", "are", "at", "be", "can", "do", "does", "for", "have",
+    "how", "i", "in", "is", "it", "me", "my", "of", "on", "or", "the", "to", "we",
+    "what", "when", "where", "which", "with", "you", "your",
+}
+
+STEM_CHARS = 6  # crude prefix stemming: deliver / delivery / delivering match
+
+_WORD = re.compile(r"[a-z0-9$]+")
+
+
+def words(text: str) -> List[str]:
+    return _WORD.findall((text or "").lower())
+
+
+def tokenize(text: str) -> Set[str]:
+    return {t[:STEM_CHARS] for t in words(text) if t not in STOPWORDS}
+
+
+def content_terms(text: str) -> List[str]:
+    """Stemmed non-stopwords in order."""
+    return [t[:STEM_CHARS] for t in words(text) if t not in STOPWORDS]
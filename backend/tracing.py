@@ -0,0 +1,277 @@
+import heapq
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter as TallyCounter
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from metrics import current_timing
+
+PROFILE_HEADER = "x-debug-profile"
+# Backend daemon threads (flushers, workers) use this prefix and are never sampled.
+BACKGROUND_THREAD_PREFIX = "nema-bg-"
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# ---------- slow-request ring buffer ----------
+
+
+@dataclass
+class Trace:
+    id: str
+    method: str
+    path: str
+    status: int
+    started_at: float
+    duration_ms: float
+    spans: List[Dict] = field(default_factory=list)
+    profile_id: Optional[str] = None
+
+
+class SlowTraceBuffer:
+    """
+    Keeps the `capacity` slowest requests seen in the last `window_s` seconds,
+    each with its stage waterfall.
+    """
+
+    def __init__(self, capacity: int = 50, window_s: float = 3600.0):
+        self.capacity = capacity
+        self.window_s = window_s
+        self._heap: List = []  # min-heap of (duration_ms, seq, Trace)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, trace: Trace) -> None:
+        with self._lock:
+            self._expire(time.time())
+            item = (trace.duration_ms, next(self._seq), trace)
+            if len(self._heap) < self.capacity:
+                heapq.heappush(self._heap, item)
+            elif trace.duration_ms > self._heap[0][0]:
+                heapq.heapreplace(self._heap, item)
+
+    def snapshot(self) -> List[Trace]:
+        """Slowest first."""
+        with self._lock:
+            self._expire(time.time())
+            return [t for _, _, t in sorted(self._heap, reverse=True)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._heap.clear()
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window_s
+        if self._heap and min(t.started_at for _, _, t in self._heap) < cutoff:
+            self._heap = [item for item in self._heap if item[2].started_at >= cutoff]
+            heapq.heapify(self._heap)
+
+
+# ---------- on-demand sampling profiler ----------
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of all threads every `interval` seconds while
+    running and tallies them in collapsed ("folded") form.
+
+    Sync endpoints run on a threadpool worker we cannot name up front, so every
+    thread is sampled and only stacks passing through backend code are kept.
+    Requests that overlap a profiled one can show up in its profile.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: TallyCounter = TallyCounter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=BACKGROUND_THREAD_PREFIX + "stack-sampler", daemon=True)
+
+    def __enter__(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            skip = {me} | {
+                t.ident for t in threading.enumerate() if t.name.startswith(BACKGROUND_THREAD_PREFIX)
+            }
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in skip:
+                    continue
+                stack = []
+                ours = False
+                while frame is not None:
+                    code = frame.f_code
+                    if code.co_filename.startswith(BACKEND_DIR):
+                        ours = True
+                    stack.append(
+                        f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}"
+                    )
+                    frame = frame.f_back
+                if ours:
+                    self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+
+class ProfileStore:
+    """Folded-stack profile dumps on disk, newest `keep` retained."""
+
+    def __init__(self, directory: str, keep: int = 100):
+        self.directory = directory
+        self.keep = keep
+
+    def path(self, profile_id: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.folded")
+
+    def save(self, profile_id: str, sampler: StackSampler) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path(profile_id), "w", encoding="utf-8") as f:
+            f.write(sampler.folded())
+        self._prune()
+
+    def load(self, profile_id: str) -> Optional[str]:
+        if os.path.basename(profile_id) != profile_id:
+            return None
+        try:
+            with open(self.path(profile_id), "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _prune(self) -> None:
+        files = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".folded")
+        ]
+        if len(files) <= self.keep:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[: len(files) - self.keep]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+@dataclass
+class ProfilingToggle:
+    """Admin switch: profile the next `remaining` requests under `path_prefix`."""
+
+    enabled: bool = False
+    path_prefix: str = "/api/"
+    remaining: Optional[int] = None  # None = until switched off
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def set(self, enabled: bool, path_prefix: str = "/api/", remaining: Optional[int] = None) -> None:
+        with self._lock:
+            self.enabled = enabled
+            self.path_prefix = path_prefix
+            self.remaining = remaining
+
+    def take(self, path: str) -> bool:
+        with self._lock:
+            if not self.enabled or not path.startswith(self.path_prefix):
+                return False
+            if self.remaining is not None:
+                self.remaining -= 1
+                if self.remaining <= 0:
+                    self.enabled = False
+            return True
+
+
+# ---------- middleware ----------
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware, installed inside TimingMiddleware so the request's stage
+    spans are available when it finishes. Records every request into the slow
+    trace buffer, and runs the stack sampler when the request carries
+    `X-Debug-Profile: 1` or the admin toggle selects it.
+    """
+
+    def __init__(self, app, buffer: SlowTraceBuffer, store: ProfileStore, toggle: ProfilingToggle):
+        self.app = app
+        self.buffer = buffer
+        self.store = store
+        self.toggle = toggle
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope.get("path", "")
+        if path.startswith("/api/debug"):
+            # The debug endpoints themselves are neither traced nor profiled.
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        profile = headers.get(PROFILE_HEADER.encode("latin-1"), b"") in (b"1", b"true")
+        profile = profile or self.toggle.take(path)
+
+        started_at = time.time()
+        t0 = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        sampler = StackSampler() if profile else None
+        try:
+            if sampler is not None:
+                with sampler:
+                    await self.app(scope, receive, send_with_status)
+            else:
+                await self.app(scope, receive, send_with_status)
+        finally:
+            duration_ms = (time.perf_counter() - t0) * 1000.0
+            timing = current_timing()
+            spans = []
+            if timing is not None:
+                offset = t0 - timing.started
+                spans = [
+                    {
+                        "name": s.name,
+                        "start_ms": round((s.start - offset) * 1000.0, 3),
+                        "duration_ms": round(s.duration * 1000.0, 3),
+                    }
+                    for s in timing.spans
+                ]
+            trace = Trace(
+                id=uuid4().hex,
+                method=scope.get("method", ""),
+                path=path,
+                status=status["code"],
+                started_at=started_at,
+                duration_ms=round(duration_ms, 3),
+                spans=spans,
+            )
+            if sampler is not None:
+                trace.profile_id = trace.id
+                try:
+                    self.store.save(trace.id, sampler)
+                except OSError as e:
+                    print("Profile save error:", repr(e))
+            self.buffer.add(trace)
+
+
+def trace_to_dict(trace: Trace) -> Dict:
+    return asdict(trace)
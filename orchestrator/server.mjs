@@ -62,7 +62,9 @@ async function fetchWithTimeout(url, opts = {}, timeoutMs = 6000) {
   const ac = new AbortController();
   const id = setTimeout(() => ac.abort(), timeoutMs);
   try {
-    return await fetch(url, { ...opts, signal: ac.signal });
+    // Tell the backend our budget so its upstream calls give up in time.
+    const headers = { ...(opts.headers || {}), "X-Request-Deadline-Ms": String(timeoutMs) };
+    return await fetch(url, { ...opts, headers, signal: ac.signal });
   } finally {
     clearTimeout(id);
   }
@@ -101,7 +103,11 @@ async function getGraphContext(question, sessionId) {
     let data = null;
     try { data = JSON.parse(text); } catch {}
 
-    slog("[graph-context]", { status: res.status, q: (question || "").slice(0, 80) });
+    slog("[graph-context]", {
+      status: res.status,
+      q: (question || "").slice(0, 80),
+      timing: res.headers.get("server-timing"),
+    });
 
     if (!res.ok) {
       console.error("[graph-context] BAD", { status: res.status, body: text.slice(0, 200) });
@@ -115,6 +121,29 @@ async function getGraphContext(question, sessionId) {
   }
 }
 
+// Whole-KB context pack, revalidated with If-None-Match so an unchanged graph costs a 304.
+let contextPackCache = null; // { etag, pack }
+
+async function getContextPack(sessionId) {
+  const url = `${BACKEND_BASE_URL}/api/graph/context-pack`;
+  try {
+    const headers = backendHeaders(sessionId);
+    if (contextPackCache?.etag) headers["If-None-Match"] = contextPackCache.etag;
+    const res = await fetchWithTimeout(url, { method: "GET", headers }, 3500);
+    if (res.status === 304 && contextPackCache) return contextPackCache.pack;
+    if (!res.ok) {
+      slog("[context-pack] non-200", { status: res.status });
+      return contextPackCache?.pack || null;
+    }
+    const pack = await res.json();
+    contextPackCache = { etag: res.headers.get("etag"), pack };
+    return pack;
+  } catch (err) {
+    slog("[context-pack] exception", String(err));
+    return contextPackCache?.pack || null;
+  }
+}
+
 async function getBusinessProfile(sessionId) {
   const url = `${BACKEND_BASE_URL}/api/business/profile`;
   try {
@@ -379,9 +408,18 @@ wss.on("connection", (twilioWs) => {
     slog("[call-summary]", { label, sessionId, streamSid, twilioMediaFrames, oaiAudioFrames });
   };
 
+  // When the whole KB fits in the prompt, answer from it and skip per-turn tool calls.
+  let inlineKb = false;
+
   oaiWs.on("open", async () => {
     slog("[oaiWs] open", { sessionId });
 
+    const pack = await getContextPack(sessionId);
+    inlineKb = Boolean(pack?.text) && !pack.truncated;
+    const kbInstructions = pack?.text
+      ? "\nUse this KNOWLEDGE BASE as your factual grounding:\n" + pack.text
+      : "";
+
     sendToOAI({
       type: "session.update",
       session: {
@@ -396,7 +434,9 @@ wss.on("connection", (twilioWs) => {
           "You will receive JSON with {user_question, graph_context}.\n" +
           "If graph_context.facts is non-empty, answer using ONLY those facts.\n" +
           "If empty, ask ONE clarifying question.\n" +
-          "Keep responses 1–2 sentences.\n",
+          "If graph_context is null, answer from the KNOWLEDGE BASE below.\n" +
+          "Keep responses 1–2 sentences.\n" +
+          kbInstructions,
       },
     });
 
@@ -455,9 +495,13 @@ wss.on("connection", (twilioWs) => {
       slog("[whisper]", transcript.slice(0, 120));
 
       postSessionMessage(sessionId, "customer", transcript).catch(() => {});
-      const ctx = await getGraphContext(transcript, sessionId);
+      const ctx = inlineKb ? null : await getGraphContext(transcript, sessionId);
 
-      slog("[ctx]", { factsLen: Array.isArray(ctx?.facts) ? ctx.facts.length : 0, reason: ctx?.reason });
+      slog("[ctx]", {
+        inlineKb,
+        factsLen: Array.isArray(ctx?.facts) ? ctx.facts.length : 0,
+        reason: ctx?.reason,
+      });
 
       sendToOAI({
         type: "conversation.item.create",
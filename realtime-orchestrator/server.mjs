@@ -63,7 +63,29 @@ async function getGraphContext(question) {
   }
 }
 
-function callRealtimeWithGraph(question, graphContext) {
+// Whole-KB context pack, revalidated with If-None-Match so an unchanged graph costs a 304.
+let contextPackCache = null; // { etag, pack }
+
+async function getContextPack() {
+  try {
+    const headers = {};
+    if (contextPackCache?.etag) headers["If-None-Match"] = contextPackCache.etag;
+    const res = await fetch(`${BACKEND_BASE_URL}/api/graph/context-pack`, { headers });
+    if (res.status === 304 && contextPackCache) return contextPackCache.pack;
+    if (!res.ok) {
+      console.error("[context-pack] backend error:", res.status);
+      return contextPackCache?.pack || null;
+    }
+    const pack = await res.json();
+    contextPackCache = { etag: res.headers.get("etag"), pack };
+    return pack;
+  } catch (err) {
+    console.error("[context-pack] error:", err?.message || err);
+    return contextPackCache?.pack || null;
+  }
+}
+
+function callRealtimeWithGraph(question, graphContext, contextPack) {
   return new Promise((resolve, reject) => {
     const url = `wss://api.openai.com/v1/realtime?model=${encodeURIComponent(
       REALTIME_MODEL
@@ -92,7 +114,10 @@ function callRealtimeWithGraph(question, graphContext) {
       const instructions =
         "You are Nema, a warm, concise sales assistant.\n" +
         "Use graph_context as your factual grounding. Don’t invent policies.\n" +
-        "If graph_context is weak, ask one short clarifying question.\n";
+        "If graph_context is weak, ask one short clarifying question.\n" +
+        (contextPack?.text
+          ? "If graph_context is null, use this KNOWLEDGE BASE instead:\n" + contextPack.text
+          : "");
 
       // Configure session
       rtWs.send(
@@ -207,20 +232,22 @@ wsServer.on("connection", (client) => {
     const question = (msg.text || "").trim();
     if (!question) return;
 
-    // 1) get graph context
-    const graphContext = await getGraphContext(question);
+    // 1) get graph context (skipped when the whole KB fits in the prompt)
+    const contextPack = await getContextPack();
+    const graphContext =
+      contextPack?.text && !contextPack.truncated ? null : await getGraphContext(question);
 
     // 2) call OpenAI Realtime
     let reply = "";
     try {
-      reply = await callRealtimeWithGraph(question, graphContext);
+      reply = await callRealtimeWithGraph(question, graphContext, contextPack);
     } catch (e) {
       console.error("[realtime-orchestrator] Realtime call failed:", e?.message || e);
     }
 
     if (!reply) {
       reply =
-        graphContext.reason ||
+        graphContext?.reason ||
         "I’m not sure yet—can you share a bit more about what you need?";
     }
 